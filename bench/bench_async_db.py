@@ -0,0 +1,111 @@
+"""
+Benchmark: GET /recordings under high concurrency, sync Session vs AsyncSession.
+
+The API runs under uvicorn in-process on a seeded database, and
+``--concurrency`` clients request a page of recordings at the same time,
+``--rounds`` times. Alongside them, GET /recording/status probes (no
+database access) show how responsive the server stays. Each mode runs in
+its own process with DB_ASYNC set, and the read cache is disabled. The
+clients run in a separate process so they do not compete with the server
+for the GIL.
+
+Usage:
+    python -m bench.bench_async_db --concurrency 500 --rounds 5 --rows 10000
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from bench.utils import percentiles, serve_app
+
+async def load(base_url: str, concurrency: int, rounds: int) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency + 10, max_keepalive_connections=concurrency + 10)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def timed(path: str, samples: list) -> None:
+            started = time.perf_counter()
+            (await client.get(path)).raise_for_status()
+            samples.append(time.perf_counter() - started)
+
+        async def probe(samples: list, stop: asyncio.Event) -> None:
+            while not stop.is_set():
+                await timed("/recording/status", samples)
+                await asyncio.sleep(0.01)
+
+        # Warm up connections and the pool
+        await asyncio.gather(*(timed("/recordings?limit=50", []) for _ in range(concurrency)))
+
+        samples, probes = [], []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(probes, stop))
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*(timed("/recordings?limit=50", samples) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await prober
+
+    return {"requests_per_second": len(samples) / elapsed, "latency": percentiles(samples), "probe": percentiles(probes)}
+
+def run_clients(base_url: str, concurrency: int, rounds: int) -> dict:
+    return asyncio.run(load(base_url, concurrency, rounds))
+
+def run_single(concurrency: int, rounds: int, rows: int) -> dict:
+    from src.api.main import app
+    from src.database import init_db, Recording, RecordingStatus
+    from src.database.connection import engine
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(Recording.__table__.insert(), [
+            {"id": uuid.uuid4(), "filename": f"seed_{i}.mp4", "size_bytes": i, "status": RecordingStatus.COMPLETED}
+            for i in range(rows)
+        ])
+
+    with serve_app(app) as base_url:
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as clients:
+            return clients.submit(run_clients, base_url, concurrency, rounds).result()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--url", help="Database URL (default: a temporary SQLite file)")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.concurrency, args.rounds, args.rows)))
+        return
+
+    print(f"{'mode':<6} {'req/s':>8} {'p50':>9} {'p99':>9} {'probe p50':>10} {'probe p99':>10}")
+    for mode in ("sync", "async"):
+        url = args.url or f"sqlite:///{tempfile.mkdtemp()}/bench_async.db"
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.bench_async_db", "--single", "--concurrency", str(args.concurrency),
+             "--rounds", str(args.rounds), "--rows", str(args.rows)],
+            env={
+                **os.environ, "DATABASE_URL": url, "DB_ASYNC": str(mode == "async").lower(),
+                "CRUD_CACHE_TTL": "0", "LOG_LEVEL": "WARNING", "DRIVER_WARMUP": "", "MOCK_MODE": "true",
+            },
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:<6} {result['requests_per_second']:>8.0f} "
+            f"{result['latency']['p50'] * 1000:>7.0f}ms {result['latency']['p99'] * 1000:>7.0f}ms "
+            f"{result['probe']['p50'] * 1000:>8.1f}ms {result['probe']['p99'] * 1000:>8.1f}ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: batch endpoints vs one HTTP call per device or recording.
+
+The API runs under uvicorn in-process with MockDriver devices. For each
+device count, a cycle of start, stop, download and delete is run once the
+way the CI orchestrator does it today (one call per device or file, in
+sequence) and once through the batch endpoints: POST
+/devices/recording/start and /stop, GET /recordings/archive.zip and
+DELETE /recordings with a filter. The peak RSS of the server process while
+the archive streams is reported against the total payload it contains.
+
+Usage:
+    python -m bench.bench_batch --devices 8 32 --payload 5M
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from bench.utils import current_rss, format_size, parse_size, peak_rss, reset_peak_rss, serve_app
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+def check(response) -> "object":
+    response.raise_for_status()
+    return response
+
+def run_individual(client, udids) -> dict:
+    filenames = []
+    timings = {
+        "start": timed(lambda: [
+            check(client.post(f"/devices/{udid}/recording/start", json={"filename_prefix": "single"}))
+            for udid in udids
+        ]),
+        "stop": timed(lambda: filenames.extend(
+            check(client.post(f"/devices/{udid}/recording/stop")).json()["filename"] for udid in udids
+        )),
+    }
+
+    def download() -> None:
+        for filename in filenames:
+            with client.stream("GET", f"/recordings/{filename}") as response:
+                for _ in check(response).iter_bytes():
+                    pass
+
+    timings["download"] = timed(download)
+    timings["delete"] = timed(lambda: [check(client.delete(f"/recordings/{name}")) for name in filenames])
+    return timings
+
+def run_batch(client, udids) -> dict:
+    since = datetime.utcnow().isoformat()
+
+    def call(path: str) -> None:
+        results = check(client.post(path, json={"udids": udids, "filename_prefix": "batch"})).json()
+        failed = [r for r in results if r["status_code"] != 200]
+        if failed:
+            raise RuntimeError(f"{path}: {failed[0]}")
+
+    timings = {
+        "start": timed(lambda: call("/devices/recording/start")),
+        "stop": timed(lambda: call("/devices/recording/stop")),
+    }
+
+    received = []
+
+    def download() -> None:
+        with client.stream("GET", "/recordings/archive.zip", params={"created_after": since}) as response:
+            received.append(sum(len(chunk) for chunk in check(response).iter_bytes()))
+
+    reset_peak_rss()
+    baseline = current_rss()
+    timings["download"] = timed(download)
+    timings["archive_bytes"] = received[0]
+    timings["archive_peak_rss"] = max(0, peak_rss() - baseline)
+    timings["delete"] = timed(lambda: check(client.delete("/recordings", params={"created_after": since})))
+    return timings
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--payload", default="5M", help="MockDriver video payload size")
+    args = parser.parse_args()
+
+    # One worker thread per device so batch fan-out is not capped by the executor
+    os.environ.setdefault("WORKER_POOL_SIZE", str(max(args.devices)))
+
+    import httpx
+    from src.api import routes
+    from src.api.dependencies import get_device_pool
+    from src.api.main import app
+    from src.core.device_pool import DevicePool
+    from src.database import init_db
+    from src.simulation.mock_driver import MockDriver
+
+    init_db()
+    routes.OUTPUT_DIR = Path(tempfile.mkdtemp())
+    payload_size = parse_size(args.payload)
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=payload_size))
+    app.dependency_overrides[get_device_pool] = lambda: pool
+
+    print(f"{'devices':>7} {'mode':<10} {'start':>9} {'stop':>9} {'download':>9} {'delete':>9} {'total':>9}")
+    with serve_app(app) as base_url, httpx.Client(base_url=base_url, timeout=300) as client:
+        for devices in args.devices:
+            udids = [f"bench-{devices}-{i}" for i in range(devices)]
+            for mode, run in (("individual", run_individual), ("batch", run_batch)):
+                timings = run(client, udids)
+                phases = [timings[p] for p in ("start", "stop", "download", "delete")]
+                print(
+                    f"{devices:>7} {mode:<10} "
+                    + " ".join(f"{seconds * 1000:>7.0f}ms" for seconds in phases)
+                    + f" {sum(phases) * 1000:>7.0f}ms"
+                )
+            print(
+                f"{'':>7} archive of {format_size(timings['archive_bytes'])}: "
+                f"server peak RSS +{format_size(timings['archive_peak_rss'])}"
+            )
+    pool.quit_all()
+
+if __name__ == "__main__":
+    main()
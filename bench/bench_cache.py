@@ -0,0 +1,69 @@
+"""
+Benchmark: throughput of the polled endpoints with and without the crud cache.
+
+Seeds the recordings table, then has concurrent clients poll /health,
+/recordings and HEAD /recordings/{filename} the way open dashboards do,
+once with the cache disabled (CRUD_CACHE_TTL=0) and once enabled.
+
+Usage:
+    python -m bench.bench_cache --rows 100000 --seconds 5 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx
+
+from bench.bench_pagination import seed
+
+async def poll(client: httpx.AsyncClient, paths: list, deadline: float) -> int:
+    done = 0
+    while time.perf_counter() < deadline:
+        for method, path in paths:
+            (await client.request(method, path)).raise_for_status()
+            done += 1
+    return done
+
+async def run(seconds: float, concurrency: int, paths: list) -> float:
+    from src.api.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        counts = await asyncio.gather(*(
+            poll(client, paths, started + seconds) for _ in range(concurrency)
+        ))
+        return sum(counts) / (time.perf_counter() - started)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--ttl", type=float, default=5.0)
+    args = parser.parse_args()
+
+    from src.api import routes
+    from src.database import crud, init_db
+
+    init_db()
+    seed(args.rows)
+    # HEAD requests need the file on disk, not just the row
+    routes.OUTPUT_DIR = Path(tempfile.mkdtemp())
+    (routes.OUTPUT_DIR / "seed_0.mp4").write_bytes(b"0" * 1024)
+    paths = [("GET", "/health"), ("GET", "/recordings?limit=50"), ("HEAD", "/recordings/seed_0.mp4")]
+
+    for label, ttl in (("no cache", 0), (f"cache ttl={args.ttl}s", args.ttl)):
+        crud.recording_cache.ttl = ttl
+        crud.invalidate_cache()
+        rate = asyncio.run(run(args.seconds, args.concurrency, paths))
+        stats = crud.get_cache_stats()
+        print(f"{label:<16} {rate:>9.1f} req/s   hits={stats['hits']} misses={stats['misses']}")
+
+if __name__ == "__main__":
+    main()
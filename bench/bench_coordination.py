@@ -0,0 +1,100 @@
+"""
+Benchmark: start/stop throughput as uvicorn workers scale, with device leases.
+
+For each worker count, the API runs as ``uvicorn --workers N`` with
+COORDINATION=database, MockDriver devices and a shared database. Clients
+record ``--devices`` devices at once, each running ``--cycles`` start/stop
+cycles. Every request opens a new connection, so the kernel spreads the
+requests over the workers and most stops land on a worker that does not own
+the recording and is served through its lease.
+
+Usage:
+    python -m bench.bench_coordination --workers 1 2 4 --devices 16 --cycles 10 \\
+        --url postgresql://localhost/bench
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.utils import percentiles, spawn_app
+
+async def run_clients(base_url: str, devices: int, cycles: int) -> dict:
+    import httpx
+
+    starts, stops, errors = [], [], []
+    # No keep-alive: each request is a new connection to whichever worker accepts it
+    limits = httpx.Limits(max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def timed(path: str, body: dict, samples: list) -> bool:
+            started = time.perf_counter()
+            response = await client.post(path, json=body)
+            samples.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors.append(f"{path} {response.status_code}")
+                return False
+            return True
+
+        async def device(udid: str) -> None:
+            for cycle in range(cycles):
+                if await timed(f"/devices/{udid}/recording/start", {"filename_prefix": f"c{cycle}"}, starts):
+                    await timed(f"/devices/{udid}/recording/stop", {}, stops)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(device(f"bench-{i}") for i in range(devices)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "cycles_per_second": len(stops) / elapsed,
+        "start": percentiles(starts),
+        "stop": percentiles(stops),
+        "errors": errors,
+    }
+
+def run_workers(workers: int, url: str, devices: int, cycles: int) -> dict:
+    env = {
+        "DATABASE_URL": url,
+        "COORDINATION": "database",
+        "MOCK_MODE": "true",
+        "DRIVER_WARMUP": "",
+        "POSTPROCESS": "false",
+        "LOG_LEVEL": "WARNING",
+    }
+    with spawn_app(env, workers=workers) as (base_url, _):
+        # Give the remaining workers time to finish their startup
+        time.sleep(1 + workers)
+        return asyncio.run(run_clients(base_url, devices, cycles))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--devices", type=int, default=16)
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--url", help="Database URL (default: a temporary SQLite file per run)")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'cycles/s':>9} {'start p50':>10} {'start p99':>10} {'stop p50':>10} {'stop p99':>10} {'errors':>7}")
+    for workers in args.workers:
+        url = args.url or f"sqlite:///{tempfile.mkdtemp()}/bench_coordination.db"
+        # Create the schema once, not concurrently from every worker. Like the
+        # server, run outside the checkout so nothing is written into it.
+        subprocess.run(
+            [sys.executable, "-c", "from src.database import init_db; init_db()"],
+            env={**os.environ, "DATABASE_URL": url, "LOG_LEVEL": "WARNING", "PYTHONPATH": os.getcwd()},
+            cwd=tempfile.mkdtemp(), check=True,
+        )
+        result = run_workers(workers, url, args.devices, args.cycles)
+        print(
+            f"{workers:>7} {result['cycles_per_second']:>9.1f} "
+            f"{result['start']['p50'] * 1000:>8.1f}ms {result['start']['p99'] * 1000:>8.1f}ms "
+            f"{result['stop']['p50'] * 1000:>8.1f}ms {result['stop']['p99'] * 1000:>8.1f}ms "
+            f"{len(result['errors']):>7}"
+        )
+        for error in sorted(set(result["errors"]))[:5]:
+            print(f"        {error}")
+
+if __name__ == "__main__":
+    main()
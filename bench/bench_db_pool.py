@@ -0,0 +1,127 @@
+"""
+Benchmark: mixed read/write throughput under each connection configuration.
+
+Worker threads run a mix of reads (a keyset page and a lookup by filename)
+and writes (create a recording, then complete it) through crud for
+``--seconds``, each operation on a pooled session. SQLite runs once with
+the previous settings (rollback journal, pre-ping on checkout) and once
+tuned (WAL, synchronous=NORMAL, mmap, busy timeout). A Postgres URL passed
+with ``--url`` runs with pre-ping and with the recycle-only policy.
+
+Each configuration runs in its own process because the engine is
+configured at import time. The crud read cache is disabled.
+
+Usage:
+    python -m bench.bench_db_pool --threads 16 --seconds 10 --write-ratio 0.2 \\
+        --url postgresql://localhost/bench
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from bench.utils import percentiles
+
+# name -> environment applied on top of the caller's
+SQLITE_CONFIGS = {
+    "legacy": {"SQLITE_PRAGMAS": "false", "DB_POOL_PRE_PING": "true"},
+    "tuned": {"SQLITE_PRAGMAS": "true", "DB_POOL_PRE_PING": "false"},
+}
+SERVER_CONFIGS = {
+    "pre-ping": {"DB_POOL_PRE_PING": "true"},
+    "recycle": {"DB_POOL_PRE_PING": "false"},
+}
+
+def run_single(threads: int, seconds: float, write_ratio: float, rows: int) -> dict:
+    from src.database import crud, init_db, Recording, RecordingStatus
+    from src.database.connection import SessionLocal, engine
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(Recording.__table__.delete())
+        conn.execute(Recording.__table__.insert(), [
+            {"id": uuid.uuid4(), "filename": f"seed_{i}.mp4", "size_bytes": i, "status": RecordingStatus.COMPLETED}
+            for i in range(rows)
+        ])
+
+    reads, writes, errors = [], [], []
+    deadline = time.perf_counter() + seconds
+
+    def work(worker: int) -> None:
+        rng = random.Random(worker)
+        counter = 0
+        while time.perf_counter() < deadline:
+            db = SessionLocal()
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    counter += 1
+                    recording = crud.create_recording(db, filename=f"w{worker}_{counter}_{uuid.uuid4().hex[:6]}.mp4")
+                    crud.update_recording(db, str(recording.id), size_bytes=1024, status=RecordingStatus.COMPLETED)
+                    writes.append(time.perf_counter() - started)
+                else:
+                    crud.get_recordings_page(db, limit=50, status=RecordingStatus.COMPLETED)
+                    crud.get_recording_summary_by_filename(db, f"seed_{rng.randrange(rows)}.mp4")
+                    reads.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(type(e).__name__)
+            finally:
+                db.close()
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "ops_per_second": (len(reads) + len(writes)) / elapsed,
+        "read": percentiles(reads),
+        "write": percentiles(writes),
+        "errors": len(errors),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows seeded before the run")
+    parser.add_argument("--url", action="append", help="Server database URL (repeatable)")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.threads, args.seconds, args.write_ratio, args.rows)))
+        return
+
+    runs = [(f"sqlite:///{tempfile.mkdtemp()}/bench_pool.db", name, env) for name, env in SQLITE_CONFIGS.items()]
+    for url in args.url or []:
+        runs += [(url, name, env) for name, env in SERVER_CONFIGS.items()]
+
+    print(f"{'database':<10} {'config':<9} {'ops/s':>8} {'read p50':>9} {'read p99':>9} {'write p50':>10} {'write p99':>10} {'errors':>7}")
+    for url, name, env in runs:
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.bench_db_pool", "--single", "--threads", str(args.threads),
+             "--seconds", str(args.seconds), "--write-ratio", str(args.write_ratio), "--rows", str(args.rows)],
+            env={**os.environ, **env, "DATABASE_URL": url, "CRUD_CACHE_TTL": "0", "LOG_LEVEL": "WARNING"},
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(
+            f"{url.split(':')[0]:<10} {name:<9} {result['ops_per_second']:>8.0f} "
+            f"{result['read']['p50'] * 1000:>7.1f}ms {result['read']['p99'] * 1000:>7.1f}ms "
+            f"{result['write']['p50'] * 1000:>8.1f}ms {result['write']['p99'] * 1000:>8.1f}ms "
+            f"{result['errors']:>7}"
+        )
+
+if __name__ == "__main__":
+    main()
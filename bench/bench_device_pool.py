@@ -0,0 +1,67 @@
+"""
+Benchmark: aggregate recordings/min as the number of devices grows.
+
+Each device is a MockDriver; every cycle starts and stops a recording on all
+devices in parallel through DevicePool.start_many/stop_many, including the
+database writes and the video save.
+
+Usage:
+    python -m bench.bench_device_pool --devices 1 2 4 8 16 --cycles 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from bench.utils import parse_size
+
+async def run_pool(devices: int, cycles: int, payload_size: int, record_seconds: float) -> float:
+    from src.core.device_pool import DevicePool
+    from src.simulation.mock_driver import MockDriver
+
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=payload_size))
+    udids = [f"bench-{devices}-{i}" for i in range(devices)]
+    output_dir = Path(tempfile.mkdtemp())
+
+    started = time.perf_counter()
+    for cycle in range(cycles):
+        results = await pool.start_many(udids, filename_prefix=f"c{cycle}")
+        failures = [r for r in results.values() if isinstance(r, Exception)]
+        if failures:
+            raise failures[0]
+        await asyncio.sleep(record_seconds)
+        results = await pool.stop_many(udids, output_dir)
+        failures = [r for r in results.values() if isinstance(r, Exception)]
+        if failures:
+            raise failures[0]
+    elapsed = time.perf_counter() - started
+    pool.quit_all()
+    return devices * cycles / elapsed * 60
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--payload", default="1.5M", help="MockDriver video payload size")
+    parser.add_argument("--record-seconds", type=float, default=0.5, help="Time between start and stop")
+    args = parser.parse_args()
+
+    # One worker thread per device so the pool, not the executor, is measured
+    os.environ.setdefault("WORKER_POOL_SIZE", str(max(args.devices)))
+
+    from src.database import init_db
+    init_db()
+
+    baseline = None
+    print(f"{'devices':>7} {'recordings/min':>15} {'scaling':>8}")
+    for devices in args.devices:
+        rate = asyncio.run(run_pool(devices, args.cycles, parse_size(args.payload), args.record_seconds))
+        baseline = baseline or rate / devices
+        print(f"{devices:>7} {rate:>15.1f} {rate / baseline:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Load test: /health latency while recordings are being stopped.
+
+Polls /health at a fixed rate, first on an idle server and then while a
+client runs back-to-back start/stop cycles with a large MockDriver payload,
+and reports p50/p95/p99 for both phases. With the blocking work on the worker
+pool the two distributions should be close.
+
+Usage:
+    python -m bench.bench_health_latency --payload 50M --cycles 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx
+
+from bench.utils import parse_size, percentiles
+
+async def poll_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    samples = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/health")
+        response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return samples
+
+async def run_cycles(client: httpx.AsyncClient, cycles: int) -> None:
+    for cycle in range(cycles):
+        # Filenames carry a per-second timestamp, so keep prefixes unique
+        prefix = f"bench{cycle}_{time.time_ns()}"
+        (await client.post("/recording/start", json={"filename_prefix": prefix})).raise_for_status()
+        (await client.post("/recording/stop")).raise_for_status()
+
+async def run(payload_size: int, cycles: int, idle_seconds: float, interval: float) -> None:
+    from src.api import routes
+    from src.api.dependencies import get_recorder
+    from src.api.main import app
+    from src.core.recorder import ScreenRecorder
+    from src.database import init_db
+    from src.simulation.mock_driver import MockDriver
+
+    init_db()
+    routes.OUTPUT_DIR = Path(tempfile.mkdtemp())
+    driver = MockDriver(payload_size=payload_size)
+    app.dependency_overrides[get_recorder] = lambda: ScreenRecorder(driver)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_health(client, stop, interval))
+        await asyncio.sleep(idle_seconds)
+        stop.set()
+        idle = await poller
+
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_health(client, stop, interval))
+        started = time.perf_counter()
+        await run_cycles(client, cycles)
+        busy_seconds = time.perf_counter() - started
+        stop.set()
+        busy = await poller
+
+    for label, samples in (("idle", idle), ("during stops", busy)):
+        stats = percentiles(samples)
+        print(
+            f"/health {label:<13} n={len(samples):<5} "
+            + " ".join(f"{k}={v * 1000:.2f}ms" for k, v in stats.items())
+        )
+    print(f"{cycles} start/stop cycles in {busy_seconds:.2f}s")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--payload", default="50M", help="MockDriver video payload size")
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    parser.add_argument("--interval", type=float, default=0.01, help="Delay between /health polls")
+    args = parser.parse_args()
+    asyncio.run(run(parse_size(args.payload), args.cycles, args.idle_seconds, args.interval))
+
+if __name__ == "__main__":
+    main()
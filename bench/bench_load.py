@@ -0,0 +1,153 @@
+"""
+Benchmark: end-to-end recording load on the API with simulated devices.
+
+Runs the app under uvicorn with MOCK_MODE and the MockDriver simulation
+configured through the MOCK_* variables: start/stop latency distributions,
+payloads that grow with recording time and quality, and optional injected
+start/stop failures and session drops. ``--devices`` clients each run
+``--cycles`` start, record, stop cycles on their own device, recording for
+a time drawn between 0.5x and 1.5x ``--record-seconds`` at a quality drawn
+from ``--qualities``. With the same ``--seed`` every run issues the same
+requests and the drivers draw the same latencies and failures.
+
+Prints and optionally writes a JSON report: cycles and requests per second,
+stored bytes per second, start/stop latency percentiles, errors by request
+and status, and the server's peak RSS.
+
+Usage:
+    python -m bench.bench_load --devices 16 --cycles 20 --record-seconds 2 \\
+        --start-latency lognormal:0.3,0.5 --stop-latency lognormal:0.5,0.5 \\
+        --output load_report.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List
+
+from bench.utils import percentiles, process_peak_rss, spawn_app
+
+DEFAULTS = {
+    "devices": 8,
+    "cycles": 10,
+    "record_seconds": 1.0,
+    "qualities": ["low", "medium", "high"],
+    "start_latency": "lognormal:0.3,0.5",
+    "stop_latency": "lognormal:0.5,0.5",
+    "start_failure_rate": 0.0,
+    "stop_failure_rate": 0.0,
+    "session_loss_rate": 0.0,
+    "seed": 1,
+    "url": None,
+    "postprocess": False,
+}
+
+async def run_clients(base_url: str, config: dict) -> dict:
+    import httpx
+
+    starts: List[float] = []
+    stops: List[float] = []
+    stored: List[int] = []
+    errors: Counter = Counter()
+    limits = httpx.Limits(max_connections=config["devices"] * 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def timed(path: str, body: dict, samples: list):
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+            except httpx.HTTPError as e:
+                errors[f"{path.rsplit('/', 1)[-1]} {type(e).__name__}"] += 1
+                return None
+            samples.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors[f"{path.rsplit('/', 1)[-1]} {response.status_code}"] += 1
+                return None
+            return response.json()
+
+        async def device(index: int) -> None:
+            # Each client draws its own reproducible schedule
+            rng = random.Random(f"{config['seed']}:{index}")
+            udid = f"load-{index}"
+            for cycle in range(config["cycles"]):
+                body = {"filename_prefix": f"c{cycle}", "video_quality": rng.choice(config["qualities"])}
+                record_seconds = config["record_seconds"] * rng.uniform(0.5, 1.5)
+                if await timed(f"/devices/{udid}/recording/start", body, starts) is None:
+                    continue
+                await asyncio.sleep(record_seconds)
+                recording = await timed(f"/devices/{udid}/recording/stop", {}, stops)
+                if recording is not None:
+                    stored.append(recording["size_bytes"])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(device(i) for i in range(config["devices"])))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "duration_seconds": elapsed,
+        "cycles": len(stored),
+        "cycles_per_second": len(stored) / elapsed,
+        "requests_per_second": (len(starts) + len(stops)) / elapsed,
+        "bytes_stored": sum(stored),
+        "bytes_per_second": sum(stored) / elapsed,
+        "latency": {"start": percentiles(starts), "stop": percentiles(stops)},
+        "errors": dict(errors),
+    }
+
+def run_load(**overrides) -> Dict:
+    """Runs one load test against a fresh server; returns the JSON report."""
+    config = {**DEFAULTS, **overrides}
+    env = {
+        "DATABASE_URL": config["url"] or f"sqlite:///{tempfile.mkdtemp()}/bench_load.db",
+        "MOCK_MODE": "true",
+        "MOCK_PAYLOAD": "duration",
+        "MOCK_START_LATENCY": config["start_latency"],
+        "MOCK_STOP_LATENCY": config["stop_latency"],
+        "MOCK_START_FAILURE_RATE": str(config["start_failure_rate"]),
+        "MOCK_STOP_FAILURE_RATE": str(config["stop_failure_rate"]),
+        "MOCK_SESSION_LOSS_RATE": str(config["session_loss_rate"]),
+        "MOCK_SEED": str(config["seed"]),
+        "DRIVER_WARMUP": "",
+        "POSTPROCESS": str(config["postprocess"]).lower(),
+        "LOG_LEVEL": "WARNING",
+    }
+    with spawn_app(env) as (base_url, server):
+        results = asyncio.run(run_clients(base_url, config))
+        results["server_peak_rss_bytes"] = process_peak_rss(server.pid)
+    return {
+        "benchmark": "load",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=DEFAULTS["devices"])
+    parser.add_argument("--cycles", type=int, default=DEFAULTS["cycles"])
+    parser.add_argument("--record-seconds", type=float, default=DEFAULTS["record_seconds"])
+    parser.add_argument("--qualities", nargs="+", choices=["low", "medium", "high"], default=DEFAULTS["qualities"])
+    parser.add_argument("--start-latency", default=DEFAULTS["start_latency"], help="e.g. 0.1, uniform:0.1,0.3, lognormal:0.3,0.5")
+    parser.add_argument("--stop-latency", default=DEFAULTS["stop_latency"])
+    parser.add_argument("--start-failure-rate", type=float, default=DEFAULTS["start_failure_rate"])
+    parser.add_argument("--stop-failure-rate", type=float, default=DEFAULTS["stop_failure_rate"])
+    parser.add_argument("--session-loss-rate", type=float, default=DEFAULTS["session_loss_rate"])
+    parser.add_argument("--seed", type=int, default=DEFAULTS["seed"])
+    parser.add_argument("--url", help="Database URL (default: a temporary SQLite file)")
+    parser.add_argument("--postprocess", action="store_true", help="Run the post-stop pipeline")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_load(**{key: getattr(args, key) for key in DEFAULTS})
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
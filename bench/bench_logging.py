@@ -0,0 +1,99 @@
+"""
+Benchmark: request latency with a synchronous vs queued log sink.
+
+stdout is replaced by a stream whose every write blocks for
+``--write-delay`` ms, standing in for a container log driver that applies
+backpressure. Start/stop request pairs then run through the ASGI stack with
+a MockDriver, once per sink configuration, and the latency percentiles of
+each pair are reported together with the time the queued sink needs to
+drain at the end.
+
+Usage:
+    python -m bench.bench_logging --cycles 50 --write-delay 10 --level DEBUG
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from bench.utils import percentiles
+
+class SlowStream:
+    """Text stream whose writes block like a full pipe to a slow reader."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text: str) -> None:
+        time.sleep(self.delay)
+        self.lines += text.count("\n")
+
+    def flush(self) -> None:
+        pass
+
+async def run_cycles(app, cycles: int) -> list:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    samples = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(cycles):
+            started = time.perf_counter()
+            # Filenames carry a per-second timestamp, so each cycle needs its own prefix
+            prefix = f"log_{time.time_ns()}"
+            (await client.post("/recording/start", json={"filename_prefix": prefix})).raise_for_status()
+            (await client.post("/recording/stop")).raise_for_status()
+            samples.append(time.perf_counter() - started)
+    return samples
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--write-delay", type=float, default=10.0, help="Milliseconds each write to stdout blocks")
+    parser.add_argument("--level", default="INFO", help="Log level of the sink")
+    args = parser.parse_args()
+
+    from src.api import routes
+    from src.api.dependencies import get_device_pool
+    from src.api.main import app
+    from src.core.device_pool import DEFAULT_DEVICE, DevicePool
+    from src.database import init_db
+    from src.simulation.mock_driver import MockDriver
+    from src.utils.logger import configure_logging, shutdown_logging
+
+    init_db()
+    routes.OUTPUT_DIR = type(routes.OUTPUT_DIR)(tempfile.mkdtemp())
+    pool = DevicePool(driver_factory=lambda udid: MockDriver())
+    pool.get_device(DEFAULT_DEVICE)
+    app.dependency_overrides[get_device_pool] = lambda: pool
+
+    modes = (
+        ("sync text", {"json_format": False, "enqueue": False}),
+        ("sync json", {"json_format": True, "enqueue": False}),
+        ("queued json", {"json_format": True, "enqueue": True}),
+    )
+    results = []
+    for name, options in modes:
+        stream = SlowStream(args.write_delay / 1000)
+        configure_logging(sink=stream, level=args.level, **options)
+        samples = asyncio.run(run_cycles(app, args.cycles))
+        drain_started = time.perf_counter()
+        shutdown_logging()
+        results.append((name, percentiles(samples), stream.lines / args.cycles, time.perf_counter() - drain_started))
+    configure_logging()
+    pool.quit_all()
+
+    print(f"{'sink':<12} {'lines/cycle':>11} {'p50':>9} {'p95':>9} {'p99':>9} {'drain':>9}")
+    for name, stats, lines, drain in results:
+        print(
+            f"{name:<12} {lines:>11.1f} "
+            + " ".join(f"{stats[p] * 1000:>7.1f}ms" for p in ("p50", "p95", "p99"))
+            + f" {drain * 1000:>7.0f}ms"
+        )
+
+if __name__ == "__main__":
+    main()
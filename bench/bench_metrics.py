@@ -0,0 +1,93 @@
+"""
+Benchmark: overhead of the /metrics instrumentation on the hot paths.
+
+Times a light API request (GET /recording/status through the ASGI stack
+with all middleware) and a full start/stop cycle (driver calls, base64
+decode, disk write, DB commits) with instrumentation on and off. Rounds
+alternate between the two so drift affects both equally; the best round
+of each is reported. Also reports the raw cost of one histogram
+observation.
+
+Usage:
+    python -m bench.bench_metrics --requests 2000 --cycles 50 --rounds 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from bench.utils import parse_size
+
+async def time_requests(app, count: int) -> float:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for _ in range(count):
+            (await client.get("/recording/status")).raise_for_status()
+        return (time.perf_counter() - started) / count
+
+def time_cycles(pool, output_dir: Path, count: int) -> float:
+    from src.core.device_pool import DEFAULT_DEVICE
+    from src.database import get_db_context
+
+    started = time.perf_counter()
+    for i in range(count):
+        with get_db_context() as db:
+            pool.start_recording(db, DEFAULT_DEVICE, f"metrics_{time.time_ns()}_{i}")
+        with get_db_context() as db:
+            pool.stop_recording(db, DEFAULT_DEVICE, output_dir)
+    return (time.perf_counter() - started) / count
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--payload", default="1.5M", help="MockDriver video payload size")
+    args = parser.parse_args()
+
+    from src.api.dependencies import get_device_pool
+    from src.api.main import app
+    from src.core.device_pool import DEFAULT_DEVICE, DevicePool
+    from src.database import init_db
+    from src.simulation.mock_driver import MockDriver
+    from src.utils import metrics
+
+    init_db()
+    output_dir = Path(tempfile.mkdtemp())
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=parse_size(args.payload)))
+    pool.get_device(DEFAULT_DEVICE)
+    app.dependency_overrides[get_device_pool] = lambda: pool
+
+    results = {True: {"request": [], "cycle": []}, False: {"request": [], "cycle": []}}
+    for _ in range(args.rounds):
+        for enabled in (True, False):
+            metrics.set_enabled(enabled)
+            results[enabled]["request"].append(asyncio.run(time_requests(app, args.requests)))
+            results[enabled]["cycle"].append(time_cycles(pool, output_dir, args.cycles))
+    metrics.set_enabled(True)
+    pool.quit_all()
+
+    print(f"{'path':<20} {'metrics off':>12} {'metrics on':>12} {'overhead':>10}")
+    for path, key, unit, scale in (("request", "request", "us", 1e6), ("start/stop cycle", "cycle", "ms", 1e3)):
+        off = min(results[False][key])
+        on = min(results[True][key])
+        print(
+            f"{path:<20} {off * scale:>10.1f}{unit} {on * scale:>10.1f}{unit} "
+            f"{(on - off) / off * 100:>+9.2f}%"
+        )
+
+    histogram = metrics.Histogram("bench_observe_seconds", "Benchmark histogram")
+    number = 1_000_000
+    seconds = timeit.timeit(lambda: histogram.observe(0.004), number=number)
+    print(f"Histogram.observe: {seconds / number * 1e9:.0f} ns per call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: offset vs keyset paging of GET /recordings on a large SQLite table.
+
+Seeds the recordings table (default 1M rows) and times fetching page 1 and a
+deep page with crud.get_recordings (OFFSET, full ORM entities) and with
+crud.get_recordings_page (cursor, column projection).
+
+Usage:
+    python -m bench.bench_pagination --rows 1000000 --page 5000 --limit 100
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+def seed(rows: int, batch: int = 50_000) -> None:
+    from src.database import Recording, RecordingStatus
+    from src.database.connection import engine
+
+    statuses = [RecordingStatus.COMPLETED] * 8 + [RecordingStatus.FAILED, RecordingStatus.IN_PROGRESS]
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(Recording.__table__.insert(), [
+                {
+                    "id": uuid.uuid4(),
+                    "filename": f"seed_{i}.mp4",
+                    "size_bytes": 1572864,
+                    # Several rows share each second, exercising the id tiebreak
+                    "created_at": start + timedelta(seconds=i // 3),
+                    "status": statuses[i % len(statuses)],
+                }
+                for i in range(offset, min(rows, offset + batch))
+            ])
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=5000, help="Deep page number (1-based)")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from sqlalchemy import desc
+    from src.database import crud, init_db, Recording
+    from src.database.connection import SessionLocal
+
+    init_db()
+    started = time.perf_counter()
+    seed(args.rows)
+    print(f"Seeded {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    skip = (args.page - 1) * args.limit
+    deep_cursor = None
+    if skip:
+        # Cursor of the row just before the deep page (setup, not timed)
+        previous = db.query(Recording.id, Recording.created_at) \
+            .order_by(desc(Recording.created_at), desc(Recording.id)) \
+            .offset(skip - 1).first()
+        deep_cursor = (previous.created_at, previous.id)
+
+    cases = {
+        "offset page 1": lambda: crud.get_recordings(db, skip=0, limit=args.limit),
+        f"offset page {args.page}": lambda: crud.get_recordings(db, skip=skip, limit=args.limit),
+        "cursor page 1": lambda: crud.get_recordings_page(db, limit=args.limit),
+        f"cursor page {args.page}": lambda: crud.get_recordings_page(db, limit=args.limit, after=deep_cursor),
+    }
+    for name, func in cases.items():
+        elapsed = timed(lambda: (func(), db.expunge_all()), args.repeat)
+        print(f"{name:<20} {elapsed * 1000:>9.2f} ms")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: bytes transferred and time-to-first-byte for random-seek playback.
+
+Serves the real app under uvicorn and replays a video player seeking to
+random offsets in one recording. Three client behaviours are compared:
+
+* full:        no Range support, every seek re-downloads the whole file
+* range:       open-ended ``Range: bytes=N-`` per seek, reading one window
+* conditional: repeat views revalidated with ``If-None-Match`` (304)
+
+Usage:
+    python -m bench.bench_range_download --size 200M --seeks 50 --window 2M
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx
+
+from bench.utils import format_size, parse_size, percentiles, serve_app
+
+def fetch(client: httpx.Client, url: str, headers: dict, max_bytes: int) -> tuple:
+    """Returns (ttfb seconds, bytes read), stopping after ``max_bytes`` like a player."""
+    started = time.perf_counter()
+    ttfb = None
+    received = 0
+    with client.stream("GET", url, headers=headers) as response:
+        for chunk in response.iter_raw():
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+            received += len(chunk)
+            if received >= max_bytes:
+                break
+    if ttfb is None:
+        ttfb = time.perf_counter() - started
+    return ttfb, received
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", default="200M", help="Recording size")
+    parser.add_argument("--seeks", type=int, default=50)
+    parser.add_argument("--window", default="2M", help="Bytes the player reads after each seek")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    from src.api import routes
+    from src.api.main import app
+    from src.database import get_db_context, init_db
+    from src.database import crud
+
+    size, window = parse_size(args.size), parse_size(args.window)
+    init_db()
+    routes.OUTPUT_DIR = Path(tempfile.mkdtemp())
+    filename = f"range_bench_{time.time_ns()}.mp4"
+    with open(routes.OUTPUT_DIR / filename, "wb") as f:
+        f.truncate(size)
+    with get_db_context() as db:
+        crud.create_recording(db=db, filename=filename)
+
+    rng = random.Random(args.seed)
+    offsets = [rng.randrange(0, size - window) for _ in range(args.seeks)]
+
+    with serve_app(app) as base_url, httpx.Client(base_url=base_url, timeout=60) as client:
+        url = f"/recordings/{filename}"
+        etag = client.head(url).headers["etag"]
+        patterns = {
+            # Without Range support every seek re-downloads the file from the start
+            "full": [({}, size) for _ in offsets],
+            "range": [({"Range": f"bytes={offset}-"}, window) for offset in offsets],
+            "conditional": [({"If-None-Match": etag}, size) for _ in offsets],
+        }
+
+        print(f"{'pattern':<12} {'requests':>8} {'transferred':>13} {'ttfb p50':>10} {'ttfb p99':>10}")
+        for name, requests in patterns.items():
+            ttfbs, transferred = [], 0
+            for headers, max_bytes in requests:
+                ttfb, received = fetch(client, url, headers, max_bytes)
+                ttfbs.append(ttfb)
+                transferred += received
+            stats = percentiles(ttfbs)
+            print(
+                f"{name:<12} {len(requests):>8} {format_size(transferred):>13} "
+                f"{stats['p50'] * 1000:>8.2f}ms {stats['p99'] * 1000:>8.2f}ms"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: peak memory and throughput of save_video.
+
+Every payload size runs in its own subprocess so peak RSS figures do not leak
+between runs. The payload comes from MockDriver.stop_recording_screen, exactly
+as ScreenRecorder.stop_recording receives it.
+
+Usage:
+    python -m bench.bench_save_video --sizes 1.5M 100M 1G
+"""
+import argparse
+import base64
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench.utils import current_rss, format_size, parse_size, peak_rss, reset_peak_rss
+
+DEFAULT_SIZES = ["1.5M", "100M", "1G"]
+
+def _legacy_save_video(base64_data: str, output_path: Path) -> None:
+    """The previous implementation: decode the whole payload, then write it."""
+    video_data = base64.b64decode(base64_data)
+    with open(output_path, "wb") as f:
+        f.write(video_data)
+
+def run_single(size: int, mode: str) -> dict:
+    from src.simulation.mock_driver import MockDriver
+    from src.utils.file_utils import save_video
+
+    payload = MockDriver(payload_size=size).stop_recording_screen()
+    save = save_video if mode == "streaming" else _legacy_save_video
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = Path(tmp_dir) / "bench.mp4"
+        reset_peak_rss()
+        baseline = current_rss()
+        start = time.perf_counter()
+        save(payload, output_path)
+        elapsed = time.perf_counter() - start
+        peak = peak_rss()
+
+    return {
+        "mode": mode,
+        "video_bytes": size,
+        "base64_bytes": len(payload),
+        "seconds": elapsed,
+        "throughput_mb_s": size / elapsed / 1024 ** 2,
+        "peak_rss_over_payload": max(0, peak - baseline),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--modes", nargs="+", default=["streaming", "legacy"], choices=["streaming", "legacy"])
+    parser.add_argument("--single", nargs=2, metavar=("SIZE", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(int(args.single[0]), args.single[1])))
+        return
+
+    print(f"{'mode':<10} {'video':>10} {'time':>9} {'throughput':>13} {'peak RSS over payload':>22}")
+    for size in (parse_size(s) for s in args.sizes):
+        for mode in args.modes:
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.bench_save_video", "--single", str(size), mode],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(
+                f"{mode:<10} {format_size(size):>10} {result['seconds']:>8.3f}s "
+                f"{result['throughput_mb_s']:>8.1f} MB/s {format_size(result['peak_rss_over_payload']):>22}"
+            )
+
+if __name__ == "__main__":
+    main()
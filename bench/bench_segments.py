@@ -0,0 +1,91 @@
+"""
+Benchmark: stop latency and peak memory of single vs segmented recordings.
+
+A MockDriver whose payload grows with recording time (``--rate`` bytes per
+second) records for ``--seconds``, once as a single recording and once
+rotated every ``--segment`` seconds. Each mode runs in its own subprocess so
+peak RSS figures do not leak between runs.
+
+Usage:
+    python -m bench.bench_segments --seconds 10 --rate 20M --segment 1
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from bench.utils import current_rss, format_size, parse_size, peak_rss, reset_peak_rss
+
+def run_single(seconds: float, rate: int, segment: float, mode: str) -> dict:
+    from src.core.device_pool import DEFAULT_DEVICE, DevicePool
+    from src.database import get_db_context, init_db
+    from src.simulation.mock_driver import MockDriver
+
+    class GrowingDriver(MockDriver):
+        """Returns a payload proportional to the time since the last start."""
+
+        def start_recording_screen(self, **kwargs):
+            super().start_recording_screen(**kwargs)
+            self.started = time.monotonic()
+
+        def stop_recording_screen(self, **kwargs):
+            self.payload_size = int((time.monotonic() - self.started) * rate)
+            return super().stop_recording_screen(**kwargs)
+
+    init_db()
+    pool = DevicePool(driver_factory=lambda udid: GrowingDriver())
+    output_dir = Path(tempfile.mkdtemp())
+    segment_seconds = segment if mode == "segmented" else None
+
+    reset_peak_rss()
+    baseline = current_rss()
+    with get_db_context() as db:
+        pool.start_recording(db, DEFAULT_DEVICE, f"bench_{mode}", segment_seconds, output_dir)
+    time.sleep(seconds)
+    started = time.perf_counter()
+    with get_db_context() as db:
+        row = pool.stop_recording(db, DEFAULT_DEVICE, output_dir)
+    stop_latency = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "size_bytes": row.size_bytes,
+        "files": sum(1 for path in output_dir.rglob("*.mp4")),
+        "stop_seconds": stop_latency,
+        "peak_rss_over_baseline": max(0, peak_rss() - baseline),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", default="20M", help="Simulated video bytes per second")
+    parser.add_argument("--segment", type=float, default=1.0)
+    parser.add_argument("--single", metavar="MODE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    rate = parse_size(args.rate)
+
+    if args.single:
+        print(json.dumps(run_single(args.seconds, rate, args.segment, args.single)))
+        return
+
+    print(f"{'mode':<10} {'files':>5} {'total':>10} {'stop':>9} {'peak RSS':>10}")
+    for mode in ("single", "segmented"):
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.bench_segments", "--seconds", str(args.seconds),
+             "--rate", args.rate, "--segment", str(args.segment), "--single", mode],
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:<10} {result['files']:>5} {format_size(result['size_bytes']):>10} "
+            f"{result['stop_seconds'] * 1000:>7.0f}ms {format_size(result['peak_rss_over_baseline']):>10}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: recording totals from COUNT/SUM scans vs the recording_stats aggregate.
+
+Seeds the recordings table (default 1M rows over a few devices and
+statuses), then times the full scans the totals used to run next to the
+aggregate reads that replace them, and the create + complete write cycle
+with and without the maintaining triggers. The writes made without
+triggers leave the aggregate stale, and the final reconciliation rebuilds
+it; its duration is the cost of one background pass. The crud read cache
+is disabled.
+
+Usage:
+    python -m bench.bench_stats --rows 1000000 --reads 200 --writes 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ["CRUD_CACHE_TTL"] = "0"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from bench.utils import percentiles
+
+def seed(rows: int, batch: int = 50_000) -> None:
+    from src.database import Recording, RecordingStatus
+    from src.database.connection import engine
+
+    statuses = [RecordingStatus.COMPLETED] * 8 + [RecordingStatus.FAILED, RecordingStatus.IN_PROGRESS]
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(Recording.__table__.insert(), [
+                {
+                    "id": uuid.uuid4(),
+                    "filename": f"seed_{i}.mp4",
+                    "size_bytes": 1572864 + i % 1000,
+                    "duration_seconds": i % 600,
+                    "device_name": f"device-{i % 16}",
+                    "created_at": start + timedelta(seconds=i),
+                    "status": statuses[i % len(statuses)],
+                }
+                for i in range(offset, min(rows, offset + batch))
+            ])
+
+def sample(func, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+def write_cycles(db, writes: int, prefix: str) -> dict:
+    from src.database import crud, RecordingStatus
+
+    def cycle(i: int) -> None:
+        recording = crud.create_recording(db, filename=f"{prefix}_{i}.mp4", device_name="device-0")
+        crud.update_recording(db, str(recording.id), size_bytes=1024, duration_seconds=3, status=RecordingStatus.COMPLETED)
+
+    counter = iter(range(writes))
+    return sample(lambda: cycle(next(counter)), writes)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    from sqlalchemy import func, select, text
+    from src.database import crud, init_db, Recording
+    from src.database.connection import SessionLocal, engine
+    from src.database.stats import TRIGGER_NAMES, get_recording_stats, install_stats_triggers, reconcile_stats
+
+    init_db()
+    started = time.perf_counter()
+    seed(args.rows)
+    print(f"seeded {args.rows} rows through the triggers in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    scans = max(1, args.reads // 10)
+    results = [
+        ("COUNT(*) + SUM(size_bytes)", scans, sample(lambda: (
+            db.query(Recording).count(), db.query(func.sum(Recording.size_bytes)).scalar()
+        ), scans)),
+        ("GROUP BY status, device", scans, sample(lambda: db.execute(select(
+            Recording.status, Recording.device_name, func.count(),
+            func.sum(Recording.size_bytes), func.sum(Recording.duration_seconds)
+        ).group_by(Recording.status, Recording.device_name)).all(), scans)),
+        ("aggregate totals", args.reads, sample(lambda: (
+            crud.get_total_recordings_count(db), crud.get_total_size(db)
+        ), args.reads)),
+        ("aggregate /stats", args.reads, sample(lambda: get_recording_stats(db), args.reads)),
+    ]
+    results.append(("create + complete", args.writes, write_cycles(db, args.writes, "tracked")))
+    with engine.begin() as conn:
+        for name in TRIGGER_NAMES:
+            conn.execute(text(f"DROP TRIGGER {name}"))
+    results.append(("  without triggers", args.writes, write_cycles(db, args.writes, "untracked")))
+    with engine.begin() as conn:
+        install_stats_triggers(conn)
+
+    started = time.perf_counter()
+    report = reconcile_stats(db)
+    reconcile_seconds = time.perf_counter() - started
+    assert get_recording_stats(db)["count"] == args.rows + 2 * args.writes
+    db.close()
+
+    print(f"{'operation':<28} {'runs':>6} {'p50':>10} {'p99':>10}")
+    for name, runs, stats in results:
+        print(f"{name:<28} {runs:>6} {stats['p50'] * 1000:>8.3f}ms {stats['p99'] * 1000:>8.3f}ms")
+    print(
+        f"reconcile: {reconcile_seconds * 1000:.0f}ms over {report['buckets']} buckets, "
+        f"{report['drifted']} drifted after the untracked writes"
+    )
+
+if __name__ == "__main__":
+    main()
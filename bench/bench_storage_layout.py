@@ -0,0 +1,95 @@
+"""
+Benchmark: file lookup cost in a flat vs hash-sharded recordings directory.
+
+Creates ``--files`` empty recording files in one flat directory and in the
+two-level sharded layout of ``recording_path``, then times ``--lookups``
+random existence checks (hits and misses) in each, with warm and with
+dropped dentry caches where the kernel allows it. Also times a listing of
+the directory a lookup lands in, which is what backups and sweeps pay.
+
+Usage:
+    python -m bench.bench_storage_layout --files 1000000 --lookups 100000
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from bench.utils import percentiles
+from src.utils.file_utils import recording_path
+
+def populate(root: Path, names, sharded: bool) -> float:
+    started = time.perf_counter()
+    created_dirs = set()
+    for name in names:
+        path = recording_path(root, name) if sharded else root / name
+        if path.parent not in created_dirs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(path.parent)
+        os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o644))
+    return time.perf_counter() - started
+
+def drop_caches() -> bool:
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("2")
+        return True
+    except OSError:
+        return False
+
+def time_lookups(root: Path, names, sharded: bool) -> list:
+    # Paths are resolved up front so only the filesystem lookup is timed
+    paths = [str(recording_path(root, name) if sharded else root / name) for name in names]
+    samples = []
+    for path in paths:
+        started = time.perf_counter()
+        os.path.exists(path)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def time_listing(root: Path, name: str, sharded: bool) -> float:
+    directory = recording_path(root, name).parent if sharded else root
+    started = time.perf_counter()
+    sum(1 for _ in os.scandir(directory))
+    return time.perf_counter() - started
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--dir", help="Scratch directory (default: a temp dir)")
+    args = parser.parse_args()
+
+    scratch = Path(tempfile.mkdtemp(dir=args.dir))
+    names = [f"recording_{i:08d}.mp4" for i in range(args.files)]
+    probes = random.sample(names, min(args.lookups, len(names)) // 2)
+    probes += [f"missing_{i:08d}.mp4" for i in range(len(probes))]
+    random.shuffle(probes)
+
+    try:
+        print(f"{'layout':<8} {'create':>9} {'cache':<5} {'p50':>8} {'p95':>8} {'p99':>8} {'list dir':>10}")
+        for layout in ("flat", "sharded"):
+            root = scratch / layout
+            root.mkdir()
+            sharded = layout == "sharded"
+            create_seconds = populate(root, names, sharded)
+            runs = [("warm", time_lookups(root, probes, sharded))]
+            if drop_caches():
+                runs.append(("cold", time_lookups(root, probes, sharded)))
+            listing = time_listing(root, names[0], sharded)
+            for cache, samples in runs:
+                stats = percentiles(samples)
+                print(
+                    f"{layout:<8} {create_seconds:>8.1f}s {cache:<5} "
+                    + " ".join(f"{stats[p] * 1e6:>6.1f}us" for p in ("p50", "p95", "p99"))
+                    + f" {listing * 1000:>8.2f}ms"
+                )
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
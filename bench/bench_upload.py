@@ -0,0 +1,80 @@
+"""
+Benchmark: stop latency and peak memory of base64 vs upload delivery.
+
+The API runs under uvicorn in-process and a MockDriver stops a recording of
+``--size`` bytes, once returning it as base64 and once uploading it to the
+/uploads receiver the way Appium does with ``remotePath``. Each mode runs in
+its own subprocess so peak RSS figures do not leak between runs.
+
+Usage:
+    python -m bench.bench_upload --sizes 100M 500M --repeat 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from bench.utils import current_rss, format_size, parse_size, peak_rss, reset_peak_rss, serve_app
+
+def run_single(size: int, mode: str, repeat: int) -> dict:
+    from src.api.main import app
+    from src.core.device_pool import DEFAULT_DEVICE, DevicePool
+    from src.database import get_db_context, init_db
+    from src.simulation.mock_driver import MockDriver
+
+    init_db()
+    output_dir = Path(tempfile.mkdtemp())
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=size, upload=mode == "upload"))
+    device = pool.get_device(DEFAULT_DEVICE)
+
+    latencies = []
+    with serve_app(app) as base_url:
+        if mode == "upload":
+            device.recorder.upload_url = base_url
+        reset_peak_rss()
+        baseline = current_rss()
+        for i in range(repeat):
+            with get_db_context() as db:
+                pool.start_recording(db, DEFAULT_DEVICE, f"bench_{mode}_{i}_{time.time_ns()}")
+            started = time.perf_counter()
+            with get_db_context() as db:
+                row = pool.stop_recording(db, DEFAULT_DEVICE, output_dir)
+            latencies.append(time.perf_counter() - started)
+            assert row.size_bytes == size
+        peak = max(0, peak_rss() - baseline)
+
+    return {"mode": mode, "size": size, "stop_seconds": min(latencies), "peak_rss_over_baseline": peak}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", default=["100M", "500M"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--single", nargs=2, metavar=("SIZE", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(int(args.single[0]), args.single[1], args.repeat)))
+        return
+
+    print(f"{'size':>10} {'mode':<7} {'stop':>9} {'peak RSS':>10}")
+    for size in map(parse_size, args.sizes):
+        for mode in ("base64", "upload"):
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.bench_upload", "--repeat", str(args.repeat),
+                 "--single", str(size), mode],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(
+                f"{format_size(size):>10} {mode:<7} {result['stop_seconds'] * 1000:>7.0f}ms "
+                f"{format_size(result['peak_rss_over_baseline']):>10}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: lifecycle transitions/sec, synchronous commits vs write-behind.
+
+Producer threads push IN_PROGRESS -> COMPLETED transitions (size, duration,
+status) for pre-created recordings, either through crud.update_recording
+(one commit per transition) or through a WriteBehindQueue (batched commits).
+Throughput is measured until every transition is durable.
+
+Each database URL runs in its own process because the engine is configured
+at import time. Pass a Postgres URL to compare against a local server.
+
+Usage:
+    python -m bench.bench_write_behind --transitions 5000 \\
+        --url sqlite:///./bench_wb.db --url postgresql://localhost/bench
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+def run_single(transitions: int, producers: int, mode: str) -> float:
+    from src.database import crud, init_db, Recording, RecordingStatus
+    from src.database.connection import SessionLocal, engine
+    from src.database.write_behind import WriteBehindQueue
+
+    init_db()
+    with engine.begin() as conn:
+        ids = [uuid.uuid4() for _ in range(transitions)]
+        conn.execute(Recording.__table__.insert(), [
+            {"id": rid, "filename": f"wb_{rid}.mp4", "size_bytes": 0, "status": RecordingStatus.IN_PROGRESS}
+            for rid in ids
+        ])
+
+    queue = WriteBehindQueue(flush_interval_ms=50, max_batch=500) if mode == "write-behind" else None
+    if queue:
+        queue.start()
+
+    def produce(chunk):
+        db = SessionLocal()
+        try:
+            for rid in chunk:
+                values = {"size_bytes": 1572864, "duration_seconds": 5, "status": RecordingStatus.COMPLETED}
+                if queue:
+                    queue.submit(rid, **values)
+                else:
+                    crud.update_recording(db, rid, **values)
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=produce, args=(ids[i::producers],)) for i in range(producers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if queue:
+        queue.stop()
+    return transitions / (time.perf_counter() - started)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--transitions", type=int, default=5000)
+    parser.add_argument("--producers", type=int, default=8)
+    parser.add_argument("--url", action="append", help="Database URL (repeatable)")
+    parser.add_argument("--single", nargs=2, metavar=("TRANSITIONS", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(int(args.single[0]), args.producers, args.single[1])))
+        return
+
+    urls = args.url or [f"sqlite:///{tempfile.mkdtemp()}/bench_wb.db"]
+    print(f"{'database':<12} {'mode':<13} {'transitions/s':>14}")
+    for url in urls:
+        for mode in ("sync", "write-behind"):
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.bench_write_behind", "--producers", str(args.producers),
+                 "--single", str(args.transitions), mode],
+                env={**os.environ, "DATABASE_URL": url},
+                capture_output=True, text=True, check=True,
+            )
+            rate = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{url.split(':')[0]:<12} {mode:<13} {rate:>14.1f}")
+
+if __name__ == "__main__":
+    main()
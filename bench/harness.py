@@ -0,0 +1,381 @@
+"""
+End-to-end benchmark and regression harness for the recording API.
+
+Serves ``src.api.main:app`` in-process under uvicorn with MockDriver devices
+and a temporary SQLite database, runs scripted workloads against it over
+HTTP and reports latency percentiles and histograms, throughput and memory
+per workload. Given a baseline report it compares every metric and exits
+non-zero when one regressed past the threshold, so it can gate a deploy.
+
+Workloads:
+    start_stop    devices recording back-to-back start/stop cycles
+    pagination    walking a large recordings table with cursor pages
+    downloads     concurrent full downloads of stored recordings
+    health        concurrent /health polling
+    sweep         resolving a backlog of orphaned IN_PROGRESS rows in one sweep
+
+Usage:
+    python -m bench --output bench_report.json
+    python -m bench --baseline bench_baseline.json --threshold 0.25
+    python -m bench --workloads start_stop health --save-baseline bench_baseline.json
+
+Each workload runs ``--repeat`` rounds on the same server. Percentiles are
+taken over the samples of all rounds and the other metrics are the median
+round, which keeps single-round noise from failing the comparison.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Latency histogram bucket upper bounds in seconds, 0.5 ms to 10 s
+HISTOGRAM_BUCKETS = [0.0005 * 2 ** i for i in range(15)] + [float("inf")]
+
+# Workload sizes; --scale multiplies the counts
+WORKLOADS = {
+    "start_stop": {"devices": 4, "cycles": 25},
+    "pagination": {"rows": 20_000, "page": 100},
+    "downloads": {"files": 8, "concurrency": 8, "rounds": 4},
+    "health": {"concurrency": 8, "requests": 1000},
+    "sweep": {"rows": 100_000, "batch": 1000},
+}
+
+# Changes smaller than this are noise whatever the relative change
+ABSOLUTE_TOLERANCE = {"seconds": 0.001, "bytes": 4 * 1024 * 1024, "per_second": 0.0}
+
+def histogram(samples: List[float]) -> Dict[str, List]:
+    """Counts of ``samples`` per HISTOGRAM_BUCKETS upper bound (not cumulative)."""
+    counts = [0] * len(HISTOGRAM_BUCKETS)
+    for sample in samples:
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if sample <= bound:
+                counts[i] += 1
+                break
+    return {"le": [str(bound) for bound in HISTOGRAM_BUCKETS], "counts": counts}
+
+class Recorder:
+    """Collects one workload's latency samples, by operation, and its metrics over all rounds."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.samples: Dict[str, List[float]] = {}
+        self.metrics: Dict[str, List[float]] = {}
+        # Set up by the first round for the following ones
+        self.state: Dict[str, object] = {}
+
+    async def time(self, operation: str, request):
+        """Awaits ``request`` and records its latency under ``operation``."""
+        started = time.perf_counter()
+        response = await request
+        self.samples.setdefault(operation, []).append(time.perf_counter() - started)
+        response.raise_for_status()
+        return response
+
+    def metric(self, name: str, value: float) -> None:
+        self.metrics.setdefault(f"{self.name}.{name}", []).append(value)
+
+    def summarize(self) -> Tuple[Dict[str, float], Dict[str, dict]]:
+        from bench.utils import percentiles
+
+        metrics = {name: statistics.median(values) for name, values in self.metrics.items()}
+        histograms = {}
+        for operation, samples in self.samples.items():
+            for point, value in percentiles(samples).items():
+                metrics[f"{self.name}.{operation}.{point}_seconds"] = value
+            histograms[f"{self.name}.{operation}"] = histogram(samples)
+        return metrics, histograms
+
+async def start_stop(client, rec: Recorder, devices: int, cycles: int) -> None:
+    if not rec.state:
+        # Unmeasured cycle per device: pays driver session creation
+        for i in range(devices):
+            (await client.post(f"/devices/bench-{i}/recording/start", json={"filename_prefix": "warmup"})).raise_for_status()
+            (await client.post(f"/devices/bench-{i}/recording/stop")).raise_for_status()
+        rec.state["warm"] = True
+
+    async def device(udid: str) -> None:
+        for cycle in range(cycles):
+            await rec.time("start", client.post(f"/devices/{udid}/recording/start", json={"filename_prefix": f"c{cycle}"}))
+            await rec.time("stop", client.post(f"/devices/{udid}/recording/stop"))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(device(f"bench-{i}") for i in range(devices)))
+    rec.metric("cycles_per_second", devices * cycles / (time.perf_counter() - started))
+
+async def pagination(client, rec: Recorder, rows: int, page: int) -> None:
+    from src.database import Recording, RecordingStatus
+    from src.database.connection import engine
+
+    if not rec.state:
+        created = datetime.utcnow() - timedelta(days=1)
+        with engine.begin() as conn:
+            conn.execute(Recording.__table__.insert(), [
+                {
+                    # A leading letter keeps SQLite from reading an all-digit hex as a number
+                    "id": uuid.UUID(int=(0xb << 124) | i, version=4),
+                    "filename": f"page_{i}.mp4",
+                    "size_bytes": 1572864,
+                    "created_at": created + timedelta(milliseconds=i),
+                    "status": RecordingStatus.COMPLETED,
+                }
+                for i in range(rows)
+            ])
+        rec.state["seeded"] = True
+
+    params = {"limit": page}
+    pages = 0
+    started = time.perf_counter()
+    while True:
+        response = await rec.time("page", client.get("/recordings", params=params))
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"limit": page, "after": cursor}
+    rec.metric("pages_per_second", pages / (time.perf_counter() - started))
+
+async def downloads(client, rec: Recorder, files: int, concurrency: int, rounds: int) -> None:
+    if not rec.state:
+        urls = []
+        for i in range(files):
+            (await client.post(f"/devices/download-{i}/recording/start", json={"filename_prefix": "download"})).raise_for_status()
+            response = await client.post(f"/devices/download-{i}/recording/stop")
+            response.raise_for_status()
+            urls.append(response.json()["download_url"])
+        rec.state["urls"] = urls
+    urls = rec.state["urls"]
+
+    received = []
+
+    async def download(url: str) -> None:
+        started = time.perf_counter()
+        size = 0
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+        rec.samples.setdefault("download", []).append(time.perf_counter() - started)
+        received.append(size)
+
+    queue = [url for _ in range(rounds) for url in urls]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(url: str) -> None:
+        async with semaphore:
+            await download(url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(url) for url in queue))
+    rec.metric("bytes_per_second", sum(received) / (time.perf_counter() - started))
+
+async def health(client, rec: Recorder, concurrency: int, requests: int) -> None:
+    async def poller(count: int) -> None:
+        for _ in range(count):
+            await rec.time("health", client.get("/health"))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(poller(requests // concurrency) for _ in range(concurrency)))
+    rec.metric("requests_per_second", requests // concurrency * concurrency / (time.perf_counter() - started))
+
+async def sweep(client, rec: Recorder, rows: int, batch: int) -> None:
+    from src.api import routes
+    from src.core.device_pool import DevicePool
+    from src.core.recovery import RecordingSweeper
+    from src.database import Recording, RecordingStatus
+    from src.database.connection import engine
+    from src.simulation.mock_driver import MockDriver
+
+    # Fresh rows every round: the previous sweep resolved the last ones
+    generation = rec.state.setdefault("rounds", 0)
+    rec.state["rounds"] = generation + 1
+    stale_at = datetime.utcnow() - timedelta(hours=1)
+    with engine.begin() as conn:
+        conn.execute(Recording.__table__.insert(), [
+            {
+                "id": uuid.UUID(int=(0xc << 124) | (generation << 32) | i, version=4),
+                "filename": f"orphan_{generation}_{i}.mp4",
+                "device_name": f"sweep-{i % 4}",
+                "created_at": stale_at + timedelta(milliseconds=i),
+                "size_bytes": 0,
+                "status": RecordingStatus.IN_PROGRESS,
+            }
+            for i in range(rows)
+        ])
+
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(udid=udid, payload_size=1024))
+    try:
+        started = time.perf_counter()
+        report = RecordingSweeper(pool, routes.OUTPUT_DIR, min_age=60, batch_size=batch).sweep()
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.quit_all()
+    rec.samples.setdefault("sweep", []).append(elapsed)
+    rec.metric("rows_per_second", report["stale"] / elapsed)
+
+WORKLOAD_FUNCTIONS = {
+    "start_stop": start_stop,
+    "pagination": pagination,
+    "downloads": downloads,
+    "health": health,
+    "sweep": sweep,
+}
+
+async def run_workloads(
+    base_url: str,
+    names: List[str],
+    scale: float,
+    repeat: int
+) -> Tuple[Dict[str, float], Dict[str, dict]]:
+    import httpx
+
+    from bench.utils import current_rss, peak_rss, reset_peak_rss
+
+    metrics: Dict[str, float] = {}
+    histograms: Dict[str, dict] = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        for name in names:
+            params = {
+                key: max(1, int(value * scale)) if key not in ("page", "concurrency", "batch") else value
+                for key, value in WORKLOADS[name].items()
+            }
+            rec = Recorder(name)
+            for _ in range(repeat):
+                reset_peak_rss()
+                baseline_rss = current_rss()
+                started = time.perf_counter()
+                await WORKLOAD_FUNCTIONS[name](client, rec, **params)
+                rec.metric("duration_seconds", time.perf_counter() - started)
+                rec.metric("rss_growth_bytes", max(0, peak_rss() - baseline_rss))
+            workload_metrics, workload_histograms = rec.summarize()
+            metrics.update(workload_metrics)
+            histograms.update(workload_histograms)
+            print(f"{name}: {repeat} rounds, median {workload_metrics[f'{name}.duration_seconds']:.2f}s", file=sys.stderr)
+    return metrics, histograms
+
+def run(names: List[str], scale: float = 1.0, payload_size: int = 5 * 1024 * 1024, repeat: int = 3) -> Dict:
+    """Serves the app with MockDriver devices, runs ``names`` and returns the report."""
+    from bench.utils import serve_app
+    from src.api import routes
+    from src.api.dependencies import get_device_pool
+    from src.api.main import app
+    from src.core.device_pool import DevicePool
+    from src.database import init_db
+    from src.simulation.mock_driver import Latency, MockDriver, SimulationProfile
+
+    init_db()
+    routes.OUTPUT_DIR = Path(tempfile.mkdtemp())
+    # No simulated driver latency: the harness measures the API, not the mock
+    profile = SimulationProfile(start_latency=Latency())
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(udid=udid, payload_size=payload_size, profile=profile))
+    app.dependency_overrides[get_device_pool] = lambda: pool
+    try:
+        with serve_app(app) as base_url:
+            metrics, histograms = asyncio.run(run_workloads(base_url, names, scale, repeat))
+    finally:
+        app.dependency_overrides.clear()
+        pool.quit_all()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.utcnow().isoformat(),
+        "config": {
+            "workloads": {name: WORKLOADS[name] for name in names},
+            "scale": scale,
+            "payload_size": payload_size,
+            "repeat": repeat,
+        },
+        "metrics": metrics,
+        "histograms": histograms,
+    }
+
+def _unit(metric: str) -> str:
+    for unit in ("per_second", "seconds", "bytes"):
+        if metric.endswith(unit):
+            return unit
+    raise ValueError(f"Metric without a unit suffix: {metric}")
+
+def compare(baseline: Dict[str, float], current: Dict[str, float], threshold: float) -> List[Dict]:
+    """
+    Compares the current report with the baseline, metric by metric.
+
+    Rates regress when they drop, everything else when it grows, by more
+    than ``threshold`` (0.25 = 25%) and ABSOLUTE_TOLERANCE. Growth from a
+    baseline of 0 is an infinite change, so only the absolute tolerance
+    applies to it. A baseline metric missing from the current report counts
+    as a regression; metrics new in the current report are listed but
+    cannot regress.
+    """
+    rows = []
+    for metric in sorted(baseline.keys() | current.keys()):
+        old, new = baseline.get(metric), current.get(metric)
+        if old is None or new is None:
+            rows.append({"metric": metric, "baseline": old, "current": new, "change": None, "regressed": new is None})
+            continue
+        unit = _unit(metric)
+        if old:
+            change = (new - old) / old
+        else:
+            change = 0.0 if new == old else math.copysign(math.inf, new - old)
+        worse = -change if unit == "per_second" else change
+        regressed = worse > threshold and abs(new - old) > ABSOLUTE_TOLERANCE[unit]
+        rows.append({"metric": metric, "baseline": old, "current": new, "change": change, "regressed": regressed})
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__.splitlines()[1])
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies the workload counts")
+    parser.add_argument("--payload", default="5M", help="MockDriver video payload size")
+    parser.add_argument("--repeat", type=int, default=3, help="Rounds per workload")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (Default: 0.25)")
+    parser.add_argument("--save-baseline", help="Write the report as the new baseline")
+    args = parser.parse_args()
+
+    # Before anything imports src.database or the logger
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+    os.environ["MOCK_MODE"] = "true"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("DRIVER_WARMUP", "")
+    os.environ.setdefault("POSTPROCESS", "false")
+    os.environ.setdefault("CRUD_CACHE_TTL", "0")
+
+    from bench.utils import parse_size
+
+    report = run(args.workloads, args.scale, parse_size(args.payload), args.repeat)
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(report, indent=2) + "\n")
+
+    if not args.baseline:
+        for metric, value in sorted(report["metrics"].items()):
+            print(f"{metric:<45} {value:>14.4f}")
+        return
+
+    # Only the workloads that ran are expected in the report
+    baseline = {
+        metric: value for metric, value in json.loads(Path(args.baseline).read_text())["metrics"].items()
+        if metric.split(".", 1)[0] in args.workloads
+    }
+    rows = compare(baseline, report["metrics"], args.threshold)
+    print(f"{'metric':<45} {'baseline':>14} {'current':>14} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        old, new = (f"{row[key]:>14.4f}" if row[key] is not None else f"{'missing':>14}" for key in ("baseline", "current"))
+        change = f"{row['change']:>+7.1%}" if row["change"] is not None else f"{'':>8}"
+        print(f"{row['metric']:<45} {old} {new} {change}{flag}")
+    regressions = [row["metric"] for row in rows if row["regressed"]]
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%} or went missing", file=sys.stderr)
+        sys.exit(1)
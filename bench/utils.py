@@ -0,0 +1,141 @@
+"""Helpers shared by the benchmark scripts."""
+import contextlib
+import math
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+def parse_size(value: str) -> int:
+    """Parses sizes such as ``1.5M``, ``100M`` or ``1G`` into bytes."""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    value = value.strip().upper().rstrip("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+def format_size(num_bytes: float) -> str:
+    """Formats a byte count for report output."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(num_bytes) < 1024 or unit == "GiB":
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+def _read_status_kb(field: str, pid: str = "self") -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    raise KeyError(field)
+
+def current_rss() -> int:
+    """Current resident set size of this process in bytes."""
+    try:
+        return _read_status_kb("VmRSS")
+    except (OSError, KeyError):
+        return peak_rss()
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes."""
+    try:
+        return _read_status_kb("VmHWM")
+    except (OSError, KeyError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+def process_peak_rss(pid: int) -> Optional[int]:
+    """Peak resident set size of another process in bytes, where /proc has it."""
+    try:
+        return _read_status_kb("VmHWM", str(pid))
+    except (OSError, KeyError):
+        return None
+
+def reset_peak_rss() -> bool:
+    """Resets the peak RSS counter where the kernel allows it (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def percentiles(samples: List[float], points=(50, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of ``samples`` keyed as ``p50``, ``p95``..."""
+    if not samples:
+        return {f"p{p}": 0.0 for p in points}
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        result[f"p{p}"] = ordered[rank - 1]
+    return result
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+@contextlib.contextmanager
+def spawn_app(env: Dict[str, str], workers: int = 1, host: str = "127.0.0.1") -> Iterator[Tuple[str, subprocess.Popen]]:
+    """
+    Runs the API under ``uvicorn`` in a child process; yields its base URL
+    and the process once ``/health`` answers.
+
+    ``env`` is added to this process's environment. The working directory
+    is a fresh temporary directory, so recordings written under ``output/``
+    do not touch the checkout.
+    """
+    import httpx
+
+    port = free_port(host)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--host", host, "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env={**os.environ, "PYTHONPATH": os.getcwd(), **env},
+        cwd=tempfile.mkdtemp(),
+    )
+    base_url = f"http://{host}:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.2)
+        yield base_url, server
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+@contextlib.contextmanager
+def serve_app(app, host: str = "127.0.0.1") -> Iterator[str]:
+    """Runs an ASGI app under uvicorn in a background thread; yields its base URL."""
+    import uvicorn
+
+    port = free_port(host)
+
+    # Keep idle connections open across rounds; the 5s default races the clients' reuse
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="on", timeout_keep_alive=120)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("uvicorn failed to start")
+        time.sleep(0.01)
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { api } from './api';
-import type { Recording } from './api';
+import type { Recording, RecordingStatus } from './api';
 import { Button, Card, CardHeader, CardContent, CardTitle, CardDescription, Badge, RecordingCard } from './components';
 
 function App() {
@@ -10,25 +10,45 @@ function App() {
   const [currentFile, setCurrentFile] = useState<string | null>(null);
   const [recordingDuration, setRecordingDuration] = useState(0);
 
-  // Timer for recording duration
+  // Recording state and duration are pushed by the server instead of polled
   useEffect(() => {
-    let interval: number | undefined;
-    if (isRecording) {
-      interval = window.setInterval(() => {
-        setRecordingDuration(prev => prev + 1);
-      }, 1000);
-    } else {
-      setRecordingDuration(0);
-    }
-    return () => {
-      if (interval) clearInterval(interval);
+    const source = new EventSource(api.eventsUrl);
+    const isDefault = (device: RecordingStatus) => device.udid === 'default';
+
+    const applyState = (device?: RecordingStatus) => {
+      setIsRecording(!!device?.is_recording);
+      setCurrentFile(device?.is_recording ? device.filename || null : null);
+      setRecordingDuration(device?.is_recording ? Math.floor(device.duration || 0) : 0);
     };
-  }, [isRecording]);
+
+    const onDevices = (event: MessageEvent) => {
+      const { devices } = JSON.parse(event.data) as { devices: RecordingStatus[] };
+      const device = devices.find(isDefault);
+      if (event.type === 'snapshot' || device) {
+        applyState(device);
+      }
+    };
+
+    const onTransition = (event: MessageEvent) => {
+      const device = JSON.parse(event.data) as RecordingStatus;
+      if (!isDefault(device)) return;
+      applyState(device);
+      if (event.type === 'completed' || event.type === 'failed') {
+        queryClient.invalidateQueries({ queryKey: ['recordings'] });
+      }
+    };
+
+    source.addEventListener('snapshot', onDevices);
+    source.addEventListener('duration', onDevices);
+    ['started', 'stopping', 'completed', 'failed'].forEach(type =>
+      source.addEventListener(type, onTransition)
+    );
+    return () => source.close();
+  }, [queryClient]);
 
   const { data: recordings, isLoading } = useQuery({
     queryKey: ['recordings'],
     queryFn: api.listRecordings,
-    refetchInterval: 5000,
   });
 
   const startMutation = useMutation({
@@ -6,6 +6,8 @@ const API_URL = import.meta.env.VITE_API_URL || '';
 export interface RecordingStatus {
     is_recording: boolean;
     filename?: string;
+    duration?: number;
+    udid?: string;
 }
 
 export interface Recording {
@@ -36,5 +38,7 @@ export const api = {
             download_url: `${API_URL}${rec.download_url}`
         }));
     },
-    getDownloadUrl: (filename: string) => `${API_URL}/recordings/${filename}`
+    getDownloadUrl: (filename: string) => `${API_URL}/recordings/${filename}`,
+    // Server-Sent Events stream of recording transitions and live duration
+    eventsUrl: `${API_URL}/events`
 };
@@ -1,3 +1,4 @@
+from src.core.device_pool import DevicePool, device_pool
 from src.core.driver import MobileDriver
 from src.core.recorder import ScreenRecorder
 from fastapi import HTTPException
@@ -15,3 +16,6 @@ def get_driver():
 def get_recorder():
     driver = get_driver()
     return ScreenRecorder(driver)
+
+def get_device_pool() -> DevicePool:
+    return device_pool
@@ -2,10 +2,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from src.api.routes import router
-from src.utils.logger import logger
+from src.api.middleware import ProfilingMiddleware, RequestMetricsMiddleware, SQLStatementCountMiddleware
+from src.api.routes import OUTPUT_DIR, router
+from src.core.device_pool import device_pool
+from src.core.recovery import RecordingSweeper
+from src.core.storage import StorageJanitor
+from src.utils.logger import logger, shutdown_logging
 from src.database import init_db, check_db_connection
+from src.database.stats import STATS_RECONCILE_SECONDS, StatsReconciler
+from src.database.async_connection import DB_ASYNC, dispose_async_engine, get_async_engine
 import os
+import threading
 from pathlib import Path
 
 app = FastAPI(
@@ -21,10 +28,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-SQL-Statements", "X-Profile-Id"],
 )
 
+app.add_middleware(SQLStatementCountMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+
 app.include_router(router)
 
+storage_janitor = StorageJanitor.from_env(OUTPUT_DIR)
+
+def _elect_stats_reconciler() -> bool:
+    # One worker reconciles; if it dies its claim lapses after two intervals
+    return device_pool.coordination.claim("stats-reconcile", device_pool.owner, ttl=2 * STATS_RECONCILE_SECONDS)
+
+stats_reconciler = StatsReconciler(elect=_elect_stats_reconciler if device_pool.coordination is not None else None)
+recording_sweeper = RecordingSweeper(device_pool, OUTPUT_DIR)
+
 # Serve recordings as static files (already handled by route, but this is another way if needed)
 # app.mount("/static/recordings", StaticFiles(directory="output/recordings"), name="recordings")
 
@@ -58,9 +79,46 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Database initialization error: {e}")
         logger.warning("Continuing without database...")
+    
+    if DB_ASYNC:
+        get_async_engine()
+    
+    write_behind = device_pool.write_behind
+    if write_behind is not None:
+        try:
+            write_behind.recover()
+        except Exception as e:
+            logger.error(f"Failed to replay spooled write-behind transitions: {e}")
+        write_behind.start()
+    
+    # Create driver sessions now rather than on the first start request. This
+    # runs in the background; a request for a warming device waits for it.
+    warmup_udids = [u.strip() for u in os.getenv("DRIVER_WARMUP", "default").split(",") if u.strip()]
+    threading.Thread(target=device_pool.warm_up, args=(warmup_udids,), name="driver-warmup", daemon=True).start()
+    device_pool.start_keepalive()
+    device_pool.start_coordination(OUTPUT_DIR)
+    # Resolves rows a previous process left IN_PROGRESS, without delaying startup
+    recording_sweeper.start()
+    storage_janitor.start()
+    stats_reconciler.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down API Server...")
     from src.core.driver import MobileDriver
+    from src.utils.concurrency import shutdown_executor
+    # Let in-flight start/stop work finish before tearing anything down
+    shutdown_executor()
+    device_pool.stop_coordination()
+    recording_sweeper.stop()
+    storage_janitor.stop()
+    stats_reconciler.stop()
+    device_pool.quit_all()
     MobileDriver.quit_driver()
+    if device_pool.post_processor is not None:
+        device_pool.post_processor.shutdown()
+    if device_pool.write_behind is not None:
+        # Flush queued transitions; anything unwritten is spooled for startup
+        device_pool.write_behind.stop()
+    await dispose_async_engine()
+    shutdown_logging()
@@ -0,0 +1,105 @@
+import random
+import time
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.database import count_statements
+from src.utils import metrics, profiling
+
+class SQLStatementCountMiddleware:
+    """
+    Adds an ``X-SQL-Statements`` header with the number of SQL statements the
+    request executed before its response started.
+
+    Written as plain ASGI middleware so streamed file responses pass through
+    untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_statements() as counter:
+            async def send_with_count(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("X-SQL-Statements", str(counter.count))
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
+
+class RequestMetricsMiddleware:
+    """
+    Observes the time from request to response start in the request latency
+    histogram, labelled by method, route template and status code.
+
+    Routes are labelled by their path template (``/recordings/{filename}``)
+    so the number of series stays bounded. Streamed responses such as
+    /events are timed to their first byte, not to the end of the stream.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not metrics.enabled():
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def send_timed(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                metrics.REQUEST_SECONDS.observe(
+                    time.perf_counter() - started,
+                    scope["method"],
+                    getattr(route, "path", "unmatched"),
+                    str(message["status"])
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_timed)
+
+class ProfilingMiddleware:
+    """
+    Profiles selected requests into the buffer served at /admin/profiles.
+
+    With PROFILING on, a request sending ``X-Profile: cprofile`` is profiled
+    with cProfile plus spans, and any other ``X-Profile`` value with spans
+    only. PROFILE_SAMPLE_RATE additionally records spans for that fraction
+    of all requests. Profiled responses carry an ``X-Profile-Id`` header.
+    Like RequestMetricsMiddleware, streamed responses are profiled up to
+    their first byte.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _mode(self, scope: Scope) -> str:
+        if scope["path"].startswith("/admin/profiles"):
+            return ""
+        if profiling.PROFILING:
+            requested = Headers(scope=scope).get(profiling.PROFILE_HEADER)
+            if requested:
+                return "cprofile" if requested.lower() == "cprofile" else "spans"
+        if profiling.PROFILE_SAMPLE_RATE and random.random() < profiling.PROFILE_SAMPLE_RATE:
+            return "spans"
+        return ""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        mode = self._mode(scope) if scope["type"] == "http" else ""
+        if not mode:
+            await self.app(scope, receive, send)
+            return
+
+        with profiling.profile_request(scope["method"], scope["path"], mode) as profile:
+            async def send_profiled(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    profile.finish(message["status"])
+                    MutableHeaders(scope=message).append("X-Profile-Id", str(profile.id))
+                await send(message)
+
+            await self.app(scope, receive, send_profiled)
@@ -1,10 +1,11 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Dict, Literal, Optional, List
 
 class RecordingStatus(BaseModel):
     is_recording: bool
     filename: Optional[str] = None
     duration: Optional[float] = None
+    udid: Optional[str] = None
 
 class RecordingResponse(BaseModel):
     filename: str
@@ -12,8 +13,45 @@ class RecordingResponse(BaseModel):
     created_at: str
     download_url: str
 
+class RecordingSegmentResponse(BaseModel):
+    index: int
+    filename: str
+    size_bytes: int
+    created_at: float
+    download_url: str
+
 class StartRecordingRequest(BaseModel):
     filename_prefix: Optional[str] = "recording"
+    # Rotate the recording every N seconds and save each segment as it completes
+    segment_seconds: Optional[float] = Field(default=None, gt=0, le=1800)
+    video_quality: Literal["low", "medium", "high"] = "medium"
+
+class BatchStartRecordingRequest(StartRecordingRequest):
+    udids: List[str] = Field(min_length=1, max_length=100)
+
+class BatchStopRecordingRequest(BaseModel):
+    udids: List[str] = Field(min_length=1, max_length=100)
+
+class BatchRecordingResult(BaseModel):
+    # Outcome on one device: the status code and body the single-device call would return
+    udid: str
+    status_code: int
+    status: Optional[RecordingStatus] = None
+    recording: Optional[RecordingResponse] = None
+    detail: Optional[str] = None
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+
+class RecordingTotals(BaseModel):
+    count: int
+    size_bytes: int
+    duration_seconds: int
+
+class RecordingStatsResponse(RecordingTotals):
+    by_status: Dict[str, RecordingTotals]
+    # Recordings without a device are listed under ""
+    by_device: Dict[str, RecordingTotals]
 
 class ErrorResponse(BaseModel):
     detail: str
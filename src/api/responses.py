@@ -0,0 +1,218 @@
+import os
+import re
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Bytes read per chunk when the server cannot send straight from the file
+CHUNK_SIZE = 256 * 1024
+
+_RANGE_RE = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+def parse_range_header(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parses a ``Range: bytes=...`` header into sorted, merged (start, end) pairs.
+
+    Ends are inclusive. Returns None when the header is malformed or uses
+    another unit (the range must then be ignored) and an empty list when no
+    range is satisfiable for a file of ``size`` bytes.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        match = _RANGE_RE.match(part)
+        if not match or match.group(1) == match.group(2) == "":
+            return None
+        first, last = match.groups()
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                continue
+            ranges.append((max(0, size - length), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            end = int(last) if last else size - 1
+            ranges.append((start, min(end, size - 1)))
+
+    ranges.sort()
+    merged: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+class RangeFileResponse(Response):
+    """
+    File response with byte-range and conditional request support.
+
+    Handles ``Range`` (single and multipart/byteranges), ``If-Range``,
+    ``If-None-Match`` and ``If-Modified-Since`` against a strong ETag derived
+    from the file's size and mtime. Files are written once and renamed into
+    place, so size and mtime change whenever the content does.
+
+    When the ASGI server offers the ``http.response.zerocopy`` extension the
+    body is sent from the file descriptor by the server (sendfile); otherwise
+    it is streamed in chunks read off the event loop.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        request_headers: Headers,
+        media_type: str = "application/octet-stream",
+        filename: Optional[str] = None,
+        method: str = "GET"
+    ):
+        self.path = path
+        self.media_type = media_type
+        self.background = None
+        self.send_body = method != "HEAD"
+
+        stat = os.stat(path)
+        self.file_size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": last_modified,
+        }
+        if filename is not None:
+            headers["content-disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+
+        self.ranges: List[Tuple[int, int]] = []
+        self.boundary: Optional[str] = None
+
+        if self._not_modified(request_headers, etag, stat.st_mtime):
+            self.status_code = 304
+            self.init_headers(headers)
+            self.raw_headers = [(k, v) for k, v in self.raw_headers if k != b"content-length"]
+            return
+
+        range_header = request_headers.get("range")
+        if range_header and self._if_range_matches(request_headers.get("if-range"), etag, last_modified):
+            ranges = parse_range_header(range_header, self.file_size)
+            if ranges == []:
+                self.status_code = 416
+                headers["content-range"] = f"bytes */{self.file_size}"
+                headers["content-length"] = "0"
+                self.init_headers(headers)
+                return
+            if ranges:
+                self.ranges = ranges
+
+        if not self.ranges:
+            self.status_code = 200
+            self.ranges = [(0, self.file_size - 1)] if self.file_size else []
+            headers["content-type"] = media_type
+            headers["content-length"] = str(self.file_size)
+        elif len(self.ranges) == 1:
+            start, end = self.ranges[0]
+            self.status_code = 206
+            headers["content-type"] = media_type
+            headers["content-range"] = f"bytes {start}-{end}/{self.file_size}"
+            headers["content-length"] = str(end - start + 1)
+        else:
+            self.status_code = 206
+            self.boundary = secrets.token_hex(16)
+            headers["content-type"] = f"multipart/byteranges; boundary={self.boundary}"
+            headers["content-length"] = str(
+                sum(len(self._part_header(start, end)) + end - start + 1 for start, end in self.ranges)
+                + 2 * (len(self.ranges) - 1)  # CRLF before every part header but the first
+                + len(self._closing_boundary())
+            )
+        self.init_headers(headers)
+
+    @staticmethod
+    def _not_modified(request_headers: Headers, etag: str, mtime: float) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            # Weak comparison: W/"x" matches "x"
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or etag in tags
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _if_range_matches(if_range: Optional[str], etag: str, last_modified: str) -> bool:
+        # Without If-Range the range always applies; with it, only if the
+        # client's copy is current (strong comparison).
+        return if_range is None or if_range.strip() in (etag, last_modified)
+
+    def _part_header(self, start: int, end: int) -> bytes:
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{self.file_size}\r\n\r\n"
+        ).encode("latin-1")
+
+    def _closing_boundary(self) -> bytes:
+        return f"\r\n--{self.boundary}--\r\n".encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.status_code not in (200, 206) or not self.ranges:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        zerocopy = "http.response.zerocopy" in scope.get("extensions", {})
+        file = await anyio.to_thread.run_sync(open, self.path, "rb")
+        try:
+            for index, (start, end) in enumerate(self.ranges):
+                if self.boundary:
+                    prefix = self._part_header(start, end) if index == 0 else b"\r\n" + self._part_header(start, end)
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                last_range = index == len(self.ranges) - 1 and not self.boundary
+                if zerocopy:
+                    await send({
+                        "type": "http.response.zerocopy",
+                        "file": file,
+                        "offset": start,
+                        "count": end - start + 1,
+                        "more_body": not last_range,
+                    })
+                else:
+                    await self._send_chunks(send, file, start, end, more_body=not last_range)
+            if self.boundary:
+                await send({"type": "http.response.body", "body": self._closing_boundary()})
+        finally:
+            await anyio.to_thread.run_sync(file.close)
+
+    @staticmethod
+    def _read_at(file: BinaryIO, offset: int, length: int) -> bytes:
+        file.seek(offset)
+        return file.read(length)
+
+    @classmethod
+    async def _send_chunks(cls, send: Send, file: BinaryIO, start: int, end: int, more_body: bool) -> None:
+        offset = start
+        while offset <= end:
+            length = min(CHUNK_SIZE, end - offset + 1)
+            chunk = await anyio.to_thread.run_sync(cls._read_at, file, offset, length)
+            if not chunk:
+                raise RuntimeError("File shrank while it was being sent")
+            offset += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body or offset <= end})
@@ -1,178 +1,433 @@
 import os
-import time
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from typing import List
+import secrets
+import shutil
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import Iterator, List, Optional, Tuple, Union
 from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.api.models import RecordingStatus, RecordingResponse, StartRecordingRequest
-from src.api.dependencies import get_recorder
-from src.core.recorder import ScreenRecorder
-from src.utils.time_utils import get_file_safe_timestamp
-from src.database import get_db, Recording as DBRecording, RecordingStatus as DBRecordingStatus
-from src.database import crud
+from src.api.models import (
+    BatchRecordingResult,
+    BatchStartRecordingRequest,
+    BatchStopRecordingRequest,
+    BulkDeleteResponse,
+    RecordingStatus,
+    RecordingResponse,
+    RecordingSegmentResponse,
+    RecordingStatsResponse,
+    StartRecordingRequest
+)
+from src.api.dependencies import get_device_pool
+from src.api.responses import RangeFileResponse
+from src.core.device_pool import DEFAULT_DEVICE, DevicePool, DeviceStateError
+from src.core.storage import cold_tier_from_env, delete_recording_files, recording_file_names
+from src.core.uploads import upload_registry
+from src.utils import metrics, profiling
+from src.utils.file_utils import ContentAddressedStorage
+from src.utils.concurrency import run_blocking
+from src.utils.zip_stream import stream_zip
+from src.database import get_db, get_db_context, Recording as DBRecording, RecordingStatus as DBRecordingStatus
+from src.database import async_crud, crud, stats
+from src.database.async_connection import get_session, run_query
+from src.database.connection import pool_connections_in_use
 
 router = APIRouter()
 
-# Global state to track active recording (in-memory for simplicity)
-# In production with multiple workers, use Redis or database
-ACTIVE_RECORDING = {
-    "is_recording": False,
-    "filename": None,
-    "start_time": None,
-    "db_id": None
-}
-
 OUTPUT_DIR = Path("output/recordings")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+COLD_TIER = cold_tier_from_env()
+
+# Lifetime of one /events connection; EventSource reconnects transparently
+EVENTS_MAX_SECONDS = float(os.getenv("EVENTS_MAX_SECONDS", "300"))
+
+# Recordings looked up per query while a ZIP archive streams
+ARCHIVE_PAGE_SIZE = 200
+
+def _storage() -> ContentAddressedStorage:
+    return ContentAddressedStorage(OUTPUT_DIR, cold_tier=COLD_TIER)
+
+def _to_response(db_recording: DBRecording) -> RecordingResponse:
+    return RecordingResponse(
+        filename=db_recording.filename,
+        size_bytes=db_recording.size_bytes,
+        created_at=str(db_recording.created_at.timestamp()),
+        download_url=f"/recordings/{db_recording.filename}"
+    )
+
+def _error_status(e: Exception) -> int:
+    return 400 if isinstance(e, DeviceStateError) else 500
+
+def _started_status(udid: str, active) -> RecordingStatus:
+    return RecordingStatus(
+        is_recording=True,
+        filename=active.filename,
+        udid=None if udid == DEFAULT_DEVICE else udid
+    )
+
+async def _start_on_device(pool: DevicePool, db: Session, udid: str, req: StartRecordingRequest) -> RecordingStatus:
+    # Driver and database calls block, so they run on the worker pool. The
+    # device lock inside the pool keeps start/stop on one device serialized.
+    try:
+        active = await run_blocking(
+            pool.start_recording, db, udid, req.filename_prefix, req.segment_seconds, OUTPUT_DIR, req.video_quality
+        )
+    except Exception as e:
+        raise HTTPException(status_code=_error_status(e), detail=str(e))
+
+    return _started_status(udid, active)
+
+async def _stop_on_device(pool: DevicePool, db: Session, udid: str) -> RecordingResponse:
+    try:
+        db_recording = await run_blocking(pool.stop_recording, db, udid, OUTPUT_DIR)
+    except Exception as e:
+        raise HTTPException(status_code=_error_status(e), detail=str(e))
+
+    if db_recording is None:
+        raise HTTPException(status_code=500, detail="Failed to update recording in database")
+    return _to_response(db_recording)
+
 @router.post("/recording/start", response_model=RecordingStatus)
 async def start_recording(
     req: StartRecordingRequest,
-    recorder: ScreenRecorder = Depends(get_recorder),
+    pool: DevicePool = Depends(get_device_pool),
     db: Session = Depends(get_db)
 ):
     """Start a new screen recording"""
-    if ACTIVE_RECORDING["is_recording"]:
-        raise HTTPException(status_code=400, detail="Recording already in progress")
-    
-    try:
-        # Generate filename
-        filename = f"{req.filename_prefix}_{get_file_safe_timestamp()}.mp4"
-        
-        # Create database entry
-        db_recording = crud.create_recording(
-            db=db,
-            filename=filename,
-            device_name=None  # Can be populated from device info if available
-        )
-        
-        # Start actual recording
-        recorder.start_recording()
-        
-        # Update global state
-        ACTIVE_RECORDING["is_recording"] = True
-        ACTIVE_RECORDING["filename"] = filename
-        ACTIVE_RECORDING["start_time"] = time.time()
-        ACTIVE_RECORDING["db_id"] = str(db_recording.id)
-        
-        return RecordingStatus(
-            is_recording=True,
-            filename=filename
-        )
-    except Exception as e:
-        ACTIVE_RECORDING["is_recording"] = False
-        # Update DB status to failed if entry was created
-        if ACTIVE_RECORDING.get("db_id"):
-            crud.update_recording(
-                db=db,
-                recording_id=ACTIVE_RECORDING["db_id"],
-                status=DBRecordingStatus.FAILED
-            )
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _start_on_device(pool, db, DEFAULT_DEVICE, req)
 
 @router.post("/recording/stop", response_model=RecordingResponse)
 async def stop_recording(
-    recorder: ScreenRecorder = Depends(get_recorder),
+    pool: DevicePool = Depends(get_device_pool),
     db: Session = Depends(get_db)
 ):
     """Stop the current recording"""
-    if not ACTIVE_RECORDING["is_recording"]:
-        raise HTTPException(status_code=400, detail="No recording in progress")
+    return await _stop_on_device(pool, db, DEFAULT_DEVICE)
+
+def _device_status(pool: DevicePool, udid: str) -> RecordingStatus:
+    status = pool.device_status(udid)
+    if udid == DEFAULT_DEVICE:
+        status["udid"] = None
+    return RecordingStatus(**status)
+
+@router.get("/recording/status", response_model=RecordingStatus)
+def recording_status(pool: DevicePool = Depends(get_device_pool)):
+    """State and live duration of the current recording"""
+    return _device_status(pool, DEFAULT_DEVICE)
+
+@router.get("/devices/{udid}/recording/status", response_model=RecordingStatus)
+def device_recording_status(udid: str, pool: DevicePool = Depends(get_device_pool)):
+    """State and live duration of the current recording on a specific device"""
+    return _device_status(pool, udid)
+
+@router.get("/events")
+async def recording_events(pool: DevicePool = Depends(get_device_pool)):
+    """
+    Server-Sent Events stream of recording state.
     
-    try:
-        filename = ACTIVE_RECORDING["filename"]
-        output_path = OUTPUT_DIR / filename
-        start_time = ACTIVE_RECORDING["start_time"]
-        db_id = ACTIVE_RECORDING["db_id"]
-        
-        # Stop recording and save file
-        saved_path = recorder.stop_recording(output_path)
-        
-        # Calculate duration
-        duration_seconds = int(time.time() - start_time) if start_time else None
-        
-        # Update database with file info
-        db_recording = crud.update_recording(
-            db=db,
-            recording_id=db_id,
-            size_bytes=saved_path.stat().st_size if saved_path else 0,
-            duration_seconds=duration_seconds,
-            status=DBRecordingStatus.COMPLETED
-        )
-        
-        # Reset global state
-        ACTIVE_RECORDING["is_recording"] = False
-        ACTIVE_RECORDING["filename"] = None
-        ACTIVE_RECORDING["start_time"] = None
-        ACTIVE_RECORDING["db_id"] = None
-        
-        if db_recording:
-            return RecordingResponse(
-                filename=db_recording.filename,
-                size_bytes=db_recording.size_bytes,
-                created_at=str(db_recording.created_at.timestamp()),
-                download_url=f"/recordings/{db_recording.filename}"
-            )
+    Opens with a ``snapshot`` of every device, then pushes ``started``,
+    ``stopping``, ``completed`` and ``failed`` transitions and a ``duration``
+    update for active recordings every EVENTS_TICK_SECONDS. A client that
+    falls behind gets a fresh ``snapshot`` instead of the events it missed.
+    """
+    return StreamingResponse(
+        pool.events.stream(max_seconds=EVENTS_MAX_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/sessions/stats")
+def session_stats(pool: DevicePool = Depends(get_device_pool)):
+    """Driver session creation latency and liveness counters"""
+    return pool.session_stats()
+
+@router.get("/devices", response_model=List[RecordingStatus])
+def list_devices(pool: DevicePool = Depends(get_device_pool)):
+    """List registered devices and devices recorded by other workers, with their recording state"""
+    return [RecordingStatus(**status) for status in pool.snapshot()]
+
+@router.post("/devices/{udid}/recording/start", response_model=RecordingStatus)
+async def start_device_recording(
+    udid: str,
+    req: StartRecordingRequest,
+    pool: DevicePool = Depends(get_device_pool),
+    db: Session = Depends(get_db)
+):
+    """Start a new screen recording on a specific device"""
+    return await _start_on_device(pool, db, udid, req)
+
+@router.post("/devices/{udid}/recording/stop", response_model=RecordingResponse)
+async def stop_device_recording(
+    udid: str,
+    pool: DevicePool = Depends(get_device_pool),
+    db: Session = Depends(get_db)
+):
+    """Stop the current recording on a specific device"""
+    return await _stop_on_device(pool, db, udid)
+
+@router.post("/devices/recording/start", response_model=List[BatchRecordingResult])
+async def start_recordings(req: BatchStartRecordingRequest, pool: DevicePool = Depends(get_device_pool)):
+    """
+    Start recordings on several devices at once.
+    
+    Devices are started in parallel and each gets its own result, with the
+    status code its single-device call would return, so one busy device
+    does not fail the others.
+    """
+    results = await pool.start_many(req.udids, req.filename_prefix, req.segment_seconds, OUTPUT_DIR, req.video_quality)
+    response = []
+    for udid, result in results.items():
+        if isinstance(result, Exception):
+            response.append(BatchRecordingResult(udid=udid, status_code=_error_status(result), detail=str(result)))
+        else:
+            response.append(BatchRecordingResult(udid=udid, status_code=200, status=_started_status(udid, result)))
+    return response
+
+@router.post("/devices/recording/stop", response_model=List[BatchRecordingResult])
+async def stop_recordings(req: BatchStopRecordingRequest, pool: DevicePool = Depends(get_device_pool)):
+    """Stop recordings on several devices at once, in parallel, with a result per device"""
+    results = await pool.stop_many(req.udids, OUTPUT_DIR)
+    response = []
+    for udid, result in results.items():
+        if isinstance(result, Exception):
+            response.append(BatchRecordingResult(udid=udid, status_code=_error_status(result), detail=str(result)))
+        elif result is None:
+            response.append(BatchRecordingResult(
+                udid=udid, status_code=500, detail="Failed to update recording in database"
+            ))
         else:
-            raise HTTPException(status_code=500, detail="Failed to update recording in database")
-            
+            response.append(BatchRecordingResult(udid=udid, status_code=200, recording=_to_response(result)))
+    return response
+
+@router.put("/uploads/{token}", status_code=204)
+async def receive_upload(token: str, request: Request):
+    """
+    Receive a recording the Appium server uploads on stop (``remotePath``).
+    
+    The body is streamed to disk in chunks, so the video is never held in
+    memory or base64-encoded.
+    """
+    if not upload_registry.is_expected(token):
+        raise HTTPException(status_code=404, detail="Unknown upload")
+    
+    try:
+        written = await upload_registry.receive(token, request.stream())
     except Exception as e:
-        # Attempt cleanup
-        ACTIVE_RECORDING["is_recording"] = False
-        if ACTIVE_RECORDING.get("db_id"):
-            crud.update_recording(
-                db=db,
-                recording_id=ACTIVE_RECORDING["db_id"],
-                status=DBRecordingStatus.FAILED
-            )
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to store upload: {str(e)}")
+    
+    if written is None:
+        raise HTTPException(status_code=404, detail="Unknown upload")
+    return Response(status_code=204)
 
 @router.get("/recordings", response_model=List[RecordingResponse])
 async def list_recordings(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    after: Optional[str] = None,
+    status: Optional[DBRecordingStatus] = None,
+    db: Union[Session, AsyncSession] = Depends(get_session)
 ):
-    """List all recordings from database"""
+    """
+    List recordings from database, newest first.
+    
+    Pass the X-Next-Cursor header of a full page back as ``after`` to get the
+    next page. ``skip`` keeps the older offset-based paging available.
+    """
     try:
-        db_recordings = crud.get_recordings(db=db, skip=skip, limit=limit)
-        
-        recordings = []
-        for db_rec in db_recordings:
-            recordings.append(RecordingResponse(
-                filename=db_rec.filename,
-                size_bytes=db_rec.size_bytes,
-                created_at=str(db_rec.created_at.timestamp()),
-                download_url=f"/recordings/{db_rec.filename}"
-            ))
+        cursor = crud.decode_cursor(after) if after else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {after}")
+    
+    try:
+        if skip:
+            db_recordings = await run_query(
+                db, crud.get_recordings, async_crud.get_recordings, skip=skip, limit=limit, status=status
+            )
+        else:
+            db_recordings = await run_query(
+                db, crud.get_recordings_page, async_crud.get_recordings_page, limit=limit, after=cursor, status=status
+            )
+            if db_recordings and len(db_recordings) == limit:
+                response.headers["X-Next-Cursor"] = crud.encode_cursor(db_recordings[-1])
         
-        return recordings
+        return [_to_response(db_rec) for db_rec in db_recordings]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch recordings: {str(e)}")
 
-@router.get("/recordings/{filename}")
-async def download_recording(filename: str, db: Session = Depends(get_db)):
-    """Download a specific recording file"""
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Rows store naive UTC timestamps
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def recording_filters(
+    status: Optional[DBRecordingStatus] = None,
+    device_name: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    filename: Optional[List[str]] = Query(default=None)
+) -> dict:
+    """Query parameters selecting the recordings a bulk operation applies to"""
+    return {
+        "status": status,
+        "device_name": device_name,
+        "created_after": _as_utc(created_after),
+        "created_before": _as_utc(created_before),
+        "filenames": filename,
+    }
+
+def _archive_entries(storage: ContentAddressedStorage, filters: dict) -> Iterator[Tuple[str, Path]]:
+    # Pages are read lazily with a short-lived session each, so the archive
+    # never holds the whole result set and no session spans the stream
+    after = None
+    while True:
+        with get_db_context() as db:
+            rows = crud.get_recordings_page(db, limit=ARCHIVE_PAGE_SIZE, after=after, **filters)
+            segments = crud.get_segment_filenames(db, [row.id for row in rows])
+        for row in rows:
+            for name in segments.get(row.id) or [row.filename]:
+                path = storage.path_for(name)
+                if path.exists() or storage.restore(name) is not None:
+                    storage.touch(name)
+                    yield name, path
+        if len(rows) < ARCHIVE_PAGE_SIZE:
+            return
+        after = (rows[-1].created_at, rows[-1].id)
+
+@router.get("/recordings/archive.zip")
+def download_recordings_archive(filters: dict = Depends(recording_filters)):
+    """
+    Download the recordings matching the filters as one ZIP archive.
+    
+    The archive is stored (videos are not recompressed) and generated while
+    it is sent, so memory use does not grow with its size. Segmented
+    recordings contribute their segments. Repeat ``filename`` to pick
+    recordings by name.
+    """
+    return StreamingResponse(
+        stream_zip(_archive_entries(_storage(), filters)),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="recordings.zip"'}
+    )
+
+@router.delete("/recordings", response_model=BulkDeleteResponse)
+def delete_recordings(filters: dict = Depends(recording_filters), db: Session = Depends(get_db)):
+    """
+    Delete every finished recording matching the filters, with all of its files.
+    
+    At least one filter is required. Recordings still in progress are kept.
+    """
+    if all(value is None for value in filters.values()):
+        raise HTTPException(status_code=400, detail="Pass at least one filter to delete recordings")
+    
+    storage = _storage()
+    
+    def remove_files(batch) -> None:
+        for names, thumbnail_filename in batch:
+            delete_recording_files(storage, names, thumbnail_filename)
+    
+    return BulkDeleteResponse(deleted=crud.delete_recordings(db=db, on_deleted=remove_files, **filters))
+
+@router.api_route("/recordings/{filename}", methods=["GET", "HEAD"])
+def download_recording(filename: str, request: Request, db: Session = Depends(get_db)):
+    """Download a specific recording file, honouring Range and conditional headers"""
     # Verify file exists in database
+    db_recording = crud.get_recording_summary_by_filename(db=db, filename=filename)
+    # Segments of a segmented recording are served the same way
+    db_segment = None if db_recording else crud.get_segment_by_filename(db=db, filename=filename)
+    if not db_recording and not db_segment:
+        raise HTTPException(status_code=404, detail="Recording not found in database")
+    
+    # Check if file exists on disk, bringing evicted files back from the cold tier
+    storage = _storage()
+    file_path = storage.path_for(filename)
+    if not file_path.exists() and storage.restore(filename) is None:
+        if db_recording and crud.get_recording_segments(db=db, recording_id=db_recording.id):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Recording is segmented, see /recordings/{filename}/segments"
+            )
+        raise HTTPException(status_code=404, detail="Recording file not found on disk")
+    
+    storage.touch(filename)
+    return RangeFileResponse(
+        file_path,
+        request_headers=request.headers,
+        media_type="video/mp4",
+        filename=filename,
+        method=request.method
+    )
+
+@router.get("/recordings/{filename}/segments", response_model=List[RecordingSegmentResponse])
+def list_recording_segments(filename: str, db: Session = Depends(get_db)):
+    """
+    List the segments of a recording in playback order.
+    
+    Segments of a recording that is still running appear as they are saved.
+    A single-file recording has no segments.
+    """
+    db_recording = crud.get_recording_summary_by_filename(db=db, filename=filename)
+    if not db_recording:
+        raise HTTPException(status_code=404, detail="Recording not found in database")
+    
+    return [
+        RecordingSegmentResponse(**segment.to_dict())
+        for segment in crud.get_recording_segments(db=db, recording_id=db_recording.id)
+    ]
+
+@router.delete("/recordings/{filename}", status_code=204)
+def delete_recording(filename: str, db: Session = Depends(get_db)):
+    """Delete a recording: its database row and all of its files"""
     db_recording = crud.get_recording_by_filename(db=db, filename=filename)
     if not db_recording:
         raise HTTPException(status_code=404, detail="Recording not found in database")
+    if db_recording.status == DBRecordingStatus.IN_PROGRESS:
+        raise HTTPException(status_code=409, detail="Recording is still in progress")
     
-    # Check if file exists on disk
-    file_path = OUTPUT_DIR / filename
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Recording file not found on disk")
+    # Row first: a crash in between leaves an unreferenced file, not a dangling row
+    names = recording_file_names(db_recording)
+    thumbnail_filename = db_recording.thumbnail_filename
+    crud.delete_recording(db=db, recording_id=str(db_recording.id))
+    delete_recording_files(_storage(), names, thumbnail_filename)
+    return Response(status_code=204)
+
+@router.get("/recordings/{filename}/poster")
+def download_recording_poster(filename: str, db: Session = Depends(get_db)):
+    """Poster image extracted from a recording after it stopped"""
+    db_recording = crud.get_recording_by_filename(db=db, filename=filename)
+    if not db_recording or not db_recording.thumbnail_filename:
+        raise HTTPException(status_code=404, detail="No poster for this recording")
     
-    return FileResponse(file_path, media_type="video/mp4", filename=filename)
+    poster_path = _storage().path_for(filename).with_name(db_recording.thumbnail_filename)
+    if not poster_path.exists():
+        raise HTTPException(status_code=404, detail="Poster file not found on disk")
+    return FileResponse(poster_path, media_type="image/jpeg")
+
+@router.get("/postprocess/stats")
+def postprocess_stats(pool: DevicePool = Depends(get_device_pool)):
+    """Job counters and per-stage timings of the post-stop pipeline"""
+    if pool.post_processor is None:
+        return {"enabled": False}
+    return {"enabled": True, **pool.post_processor.stats()}
+
+@router.get("/metrics")
+def prometheus_metrics(pool: DevicePool = Depends(get_device_pool)):
+    """Latency and size histograms plus current gauges in Prometheus text format"""
+    metrics.ACTIVE_RECORDINGS.set(sum(1 for device in pool.devices() if device.active is not None))
+    metrics.DB_CONNECTIONS_IN_USE.set(pool_connections_in_use())
+    metrics.DISK_FREE_BYTES.set(shutil.disk_usage(OUTPUT_DIR).free)
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
 @router.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: Union[Session, AsyncSession] = Depends(get_session)):
     """Health check endpoint"""
     try:
-        # Test database connection
-        total_recordings = crud.get_total_recordings_count(db=db)
+        # Test database connection (the count is cached for CRUD_CACHE_TTL seconds)
+        total_recordings = await run_query(db, crud.get_total_recordings_count, async_crud.get_total_recordings_count)
         return {
             "status": "ok",
             "environment": os.getenv("PLATFORM_TYPE", "unknown"),
@@ -186,3 +441,58 @@ async def health_check(db: Session = Depends(get_db)):
             "database": "disconnected",
             "error": str(e)
         }
+
+@router.get("/stats", response_model=RecordingStatsResponse)
+async def recording_stats(db: Union[Session, AsyncSession] = Depends(get_session)):
+    """Recording count, bytes and duration overall, per status and per device"""
+    try:
+        return await run_query(db, stats.get_recording_stats, async_crud.get_recording_stats)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch stats: {str(e)}")
+
+@router.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters of the recording metadata cache"""
+    return crud.get_cache_stats()
+
+def _require_profiles_access(request: Request) -> None:
+    """Hides the profile routes unless profiling is on, and checks PROFILE_ADMIN_TOKEN."""
+    if not (profiling.PROFILING or profiling.PROFILE_SAMPLE_RATE):
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = profiling.PROFILE_ADMIN_TOKEN
+    if token and not secrets.compare_digest(request.headers.get("x-admin-token", "").encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def _get_profile(profile_id: int) -> profiling.RequestProfile:
+    profile = profiling.profile_buffer.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@router.get("/admin/profiles", dependencies=[Depends(_require_profiles_access)])
+def list_profiles():
+    """Summaries of the buffered request profiles, newest first"""
+    return [profile.summary() for profile in profiling.profile_buffer.list()]
+
+@router.get("/admin/profiles/{profile_id}", dependencies=[Depends(_require_profiles_access)])
+def get_profile(profile_id: int):
+    """Span timeline and, for cProfile captures, the top functions by cumulative time"""
+    return _get_profile(profile_id).to_dict()
+
+@router.get("/admin/profiles/{profile_id}/pstats", dependencies=[Depends(_require_profiles_access)])
+def download_profile_stats(profile_id: int):
+    """Raw cProfile statistics, loadable with pstats or snakeviz"""
+    dump = _get_profile(profile_id).pstats_dump()
+    if dump is None:
+        raise HTTPException(status_code=404, detail="Profile has no cProfile capture")
+    return Response(
+        dump,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="profile_{profile_id}.pstats"'}
+    )
+
+@router.delete("/admin/profiles", status_code=204, dependencies=[Depends(_require_profiles_access)])
+def clear_profiles():
+    """Empties the profile buffer"""
+    profiling.profile_buffer.clear()
+    return Response(status_code=204)
@@ -1,11 +1,16 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_ios_capabilities() -> Dict[str, Any]:
-    """Returns Appium capabilities for iOS real device."""
+def get_ios_capabilities(udid: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Returns Appium capabilities for iOS real device.
+    
+    Args:
+        udid: Target device UDID; defaults to the UDID environment variable
+    """
     
     server_url = os.getenv("APPIUM_SERVER_URL", "http://localhost:4723")
     
@@ -23,11 +28,14 @@ def get_ios_capabilities() -> Dict[str, Any]:
 
     if platform_type == "real":
         caps.update({
-            "appium:udid": os.getenv("UDID", "auto"),
+            "appium:udid": udid or os.getenv("UDID", "auto"),
             "appium:xcodeOrgId": os.getenv("XCODE_ORG_ID"),
             "appium:xcodeSigningId": os.getenv("XCODE_SIGNING_ID", "iPhone Developer"),
             "appium:updatedWDABundleId": os.getenv("UPDATED_WDA_BUNDLE_ID"),
         })
 
+    elif udid:
+        caps["appium:udid"] = udid
+
     # Filter out None values
     return {k: v for k, v in caps.items() if v is not None}
@@ -0,0 +1,212 @@
+import abc
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from src.database import DeviceLease, TaskLease
+from src.database.connection import SessionLocal
+
+# Seconds a lease stays valid without a heartbeat. A worker that crashes
+# stops renewing, so its devices are free again after this long.
+LEASE_TTL_SECONDS = float(os.getenv("LEASE_TTL_SECONDS", "15"))
+
+# How often an owner checks for stop requests from other workers, and how
+# often the requesting worker checks whether the stop happened
+LEASE_POLL_SECONDS = float(os.getenv("LEASE_POLL_SECONDS", "0.1"))
+
+@dataclass
+class Lease:
+    """A device's current owner and the recording it runs."""
+    udid: str
+    owner: str
+    filename: str
+    started_at: float
+    expires_at: float
+    stop_requested: bool = False
+
+def worker_id() -> str:
+    """Identifies this process among the workers of every node."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+class CoordinationStore(abc.ABC):
+    """
+    Shared record of which worker owns each device, for running several
+    uvicorn workers or nodes against the same devices.
+
+    The owner of a device is the worker that started its recording and
+    holds its driver; it keeps the lease alive with ``renew``. Any worker
+    can read leases to report status, and asks the owner to stop with
+    ``request_stop``. Only live leases are returned. Jobs that must run on
+    one worker only are elected with ``claim``. Subclass for another
+    backend; DatabaseCoordinationStore uses the application database.
+    """
+
+    @abc.abstractmethod
+    def acquire(self, udid: str, owner: str, filename: str, started_at: float) -> bool:
+        """Takes the device for ``owner``; False if another worker holds a live lease."""
+
+    @abc.abstractmethod
+    def release(self, udid: str, owner: str) -> None:
+        """Gives the device up, if ``owner`` still holds it."""
+
+    @abc.abstractmethod
+    def renew(self, owner: str) -> int:
+        """Extends every lease of ``owner``; returns how many it still holds."""
+
+    @abc.abstractmethod
+    def get(self, udid: str) -> Optional[Lease]:
+        ...
+
+    @abc.abstractmethod
+    def leases(self) -> List[Lease]:
+        ...
+
+    @abc.abstractmethod
+    def request_stop(self, udid: str) -> Optional[Lease]:
+        """Flags the device's recording for its owner to stop; None if no live lease."""
+
+    @abc.abstractmethod
+    def stop_requests(self, owner: str) -> List[str]:
+        """UDIDs of ``owner``'s devices that another worker asked to stop."""
+
+    @abc.abstractmethod
+    def claim(self, task: str, owner: str, ttl: Optional[float] = None) -> bool:
+        """
+        Elects ``owner`` to run ``task`` for ``ttl`` seconds (the lease TTL by
+        default); False while another worker's claim is live. Claiming again
+        extends the owner's claim.
+        """
+
+class DatabaseCoordinationStore(CoordinationStore):
+    """
+    Leases kept in the device_leases table, task claims in task_leases.
+
+    Each operation is one conditional statement and commit, so the row lock
+    the database takes for it is what arbitrates between workers: of two
+    workers taking over the same expired lease, or inserting the same
+    new one, exactly one succeeds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = LEASE_TTL_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.ttl = ttl
+        self._session_factory = session_factory
+
+    def acquire(self, udid: str, owner: str, filename: str, started_at: float) -> bool:
+        now = time.time()
+        values = {
+            "owner": owner,
+            "filename": filename,
+            "started_at": started_at,
+            "expires_at": now + self.ttl,
+            "stop_requested": False,
+        }
+        with self._session_factory() as db:
+            taken_over = db.execute(
+                update(DeviceLease)
+                .where(DeviceLease.udid == udid, DeviceLease.expires_at < now)
+                .values(**values)
+            ).rowcount
+            if not taken_over:
+                try:
+                    db.execute(insert(DeviceLease).values(udid=udid, **values))
+                except IntegrityError:
+                    db.rollback()
+                    return False
+            db.commit()
+        return True
+
+    def release(self, udid: str, owner: str) -> None:
+        with self._session_factory() as db:
+            db.execute(delete(DeviceLease).where(DeviceLease.udid == udid, DeviceLease.owner == owner))
+            db.commit()
+
+    def renew(self, owner: str) -> int:
+        with self._session_factory() as db:
+            renewed = db.execute(
+                update(DeviceLease)
+                .where(DeviceLease.owner == owner)
+                .values(expires_at=time.time() + self.ttl)
+            ).rowcount
+            db.commit()
+        return renewed
+
+    def get(self, udid: str) -> Optional[Lease]:
+        with self._session_factory() as db:
+            row = db.scalar(select(DeviceLease).where(DeviceLease.udid == udid, DeviceLease.expires_at >= time.time()))
+            return self._to_lease(row) if row is not None else None
+
+    def leases(self) -> List[Lease]:
+        with self._session_factory() as db:
+            rows = db.scalars(select(DeviceLease).where(DeviceLease.expires_at >= time.time()))
+            return [self._to_lease(row) for row in rows]
+
+    def request_stop(self, udid: str) -> Optional[Lease]:
+        with self._session_factory() as db:
+            flagged = db.execute(
+                update(DeviceLease)
+                .where(DeviceLease.udid == udid, DeviceLease.expires_at >= time.time())
+                .values(stop_requested=True)
+            ).rowcount
+            db.commit()
+        return self.get(udid) if flagged else None
+
+    def stop_requests(self, owner: str) -> List[str]:
+        with self._session_factory() as db:
+            return list(db.scalars(
+                select(DeviceLease.udid).where(DeviceLease.owner == owner, DeviceLease.stop_requested.is_(True))
+            ))
+
+    def claim(self, task: str, owner: str, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._session_factory() as db:
+            claimed = db.execute(
+                update(TaskLease)
+                .where(TaskLease.name == task, or_(TaskLease.owner == owner, TaskLease.expires_at < now))
+                .values(owner=owner, expires_at=expires_at)
+            ).rowcount
+            if not claimed:
+                try:
+                    db.execute(insert(TaskLease).values(name=task, owner=owner, expires_at=expires_at))
+                except IntegrityError:
+                    db.rollback()
+                    return False
+            db.commit()
+        return True
+
+    @staticmethod
+    def _to_lease(row: DeviceLease) -> Lease:
+        return Lease(
+            udid=row.udid,
+            owner=row.owner,
+            filename=row.filename,
+            started_at=row.started_at,
+            expires_at=row.expires_at,
+            stop_requested=row.stop_requested
+        )
+
+def coordination_store_from_env() -> Optional[CoordinationStore]:
+    """
+    The store selected by COORDINATION (``database``), or None for a single worker.
+
+    Raises:
+        ValueError: For an unknown backend, or with RECORDING_UPLOAD_URL set,
+            whose upload tokens only the worker that issued them knows
+    """
+    backend = os.getenv("COORDINATION", "").lower()
+    if backend and os.getenv("RECORDING_UPLOAD_URL"):
+        raise ValueError("RECORDING_UPLOAD_URL requires a single worker; unset it or COORDINATION")
+    if backend == "database":
+        return DatabaseCoordinationStore()
+    if backend:
+        raise ValueError(f"Unknown COORDINATION backend: {backend}")
+    return None
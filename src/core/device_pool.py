@@ -0,0 +1,764 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from src.core.coordination import (
+    LEASE_POLL_SECONDS,
+    LEASE_TTL_SECONDS,
+    CoordinationStore,
+    Lease,
+    coordination_store_from_env,
+    worker_id,
+)
+from src.core.driver import MobileDriver
+from src.core.events import EventBroadcaster
+from src.core.postprocess import PostProcessor
+from src.core.recorder import ScreenRecorder
+from src.core.segments import SegmentRotator, segment_time_limit
+from src.database import crud, get_db_context, RecordingStatus
+from src.database.write_behind import WriteBehindQueue
+from src.utils.concurrency import run_blocking
+from src.utils.file_utils import recording_path
+from src.utils.logger import logger
+from src.utils.profiling import traced
+from src.utils.time_utils import get_file_safe_timestamp
+
+# Device id used by the single-device /recording/* routes. Its driver targets
+# the UDID from the environment, exactly like MobileDriver.get_driver().
+DEFAULT_DEVICE = "default"
+
+# Seconds between background liveness checks of idle sessions (0 disables)
+DRIVER_KEEPALIVE_SECONDS = float(os.getenv("DRIVER_KEEPALIVE_SECONDS", "60"))
+
+# A start re-checks the session if it was last seen alive longer ago than this
+DRIVER_HEALTH_MAX_AGE = float(os.getenv("DRIVER_HEALTH_MAX_AGE", "30"))
+
+# Comma-separated UDIDs sessions may be opened for, besides DEFAULT_DEVICE;
+# unset allows any
+DEVICE_UDIDS = [u.strip() for u in os.getenv("DEVICE_UDIDS", "").split(",") if u.strip()]
+
+# Driver sessions kept open at once; the least recently used idle one is
+# closed to make room for another device
+MAX_DEVICE_SESSIONS = int(os.getenv("MAX_DEVICE_SESSIONS", "64"))
+
+# Seconds a stop waits for the worker owning the recording to carry it out
+REMOTE_STOP_TIMEOUT = float(os.getenv("REMOTE_STOP_TIMEOUT", "120"))
+
+# With coordination, how long the worker elected to warm up sessions keeps the
+# job; workers starting within this window skip their warm-up
+WARMUP_CLAIM_SECONDS = 300.0
+
+class DeviceStateError(Exception):
+    """Raised when a device is not in the state a start/stop call expects."""
+
+@dataclass
+class ActiveRecording:
+    """An in-flight recording on one device."""
+    filename: str
+    db_id: str
+    start_time: float
+    created_at: Optional[datetime] = None
+    # Set for segmented recordings
+    rotator: Optional[SegmentRotator] = None
+
+class RecordingResult(NamedTuple):
+    """Final state of a stopped recording whose database write was queued."""
+    id: str
+    filename: str
+    size_bytes: int
+    created_at: datetime
+    duration_seconds: Optional[int]
+    status: RecordingStatus
+
+class DeviceSession:
+    """One device: its driver session, recorder and recording state."""
+
+    def __init__(self, udid: str, driver: object, create_seconds: float = 0.0):
+        self.udid = udid
+        self.driver = driver
+        self.recorder = ScreenRecorder(driver)
+        # Serializes start/stop on this device; other devices are unaffected
+        self.lock = threading.Lock()
+        self.active: Optional[ActiveRecording] = None
+        self.create_seconds = create_seconds
+        self.recreations = 0
+        # time.monotonic() of the last proof that the session is alive
+        self.checked_at = time.monotonic()
+        # time.monotonic() of the last lookup, for evicting idle sessions
+        self.used_at = time.monotonic()
+
+    def replace_driver(self, driver: object, create_seconds: float) -> None:
+        """Swaps in a new driver session; the caller holds ``lock``."""
+        self.driver = driver
+        self.recorder.driver = driver
+        self.create_seconds = create_seconds
+        self.recreations += 1
+        self.checked_at = time.monotonic()
+
+    def session_stats(self) -> dict:
+        """Session age and creation metrics of the device."""
+        return {
+            "udid": self.udid,
+            "session_id": getattr(self.driver, "session_id", None),
+            "create_seconds": self.create_seconds,
+            "recreations": self.recreations,
+            "checked_seconds_ago": time.monotonic() - self.checked_at,
+        }
+
+    def status(self) -> dict:
+        """Snapshot of the device's recording state."""
+        active = self.active
+        return {
+            "udid": self.udid,
+            "is_recording": active is not None,
+            "filename": active.filename if active else None,
+            "duration": time.time() - active.start_time if active else None,
+        }
+
+def _create_driver(udid: str) -> object:
+    return MobileDriver.create_driver(None if udid == DEFAULT_DEVICE else udid)
+
+def _safe_udid(udid: str) -> str:
+    return re.sub(r"[^A-Za-z0-9-]", "", udid)
+
+class DevicePool:
+    """
+    Registry of device sessions keyed by UDID.
+
+    Keeps one driver session per device, created on first use or up front by
+    ``warm_up``. A keepalive thread probes idle sessions and recreates dead
+    ones, and a start re-checks a session not seen alive recently, so a lost
+    session costs a reconnect rather than a failed request. Each device has
+    its own lock, so recordings on different devices run concurrently while
+    calls for the same device are serialized. Sessions are only opened for
+    ``allowed_udids`` (any UDID if None), and at most ``max_sessions`` are
+    kept: the least recently used idle one makes way for a new device.
+    Recording state is held in
+    memory, so without a ``coordination`` store every device must be driven
+    through a single worker process.
+
+    With one, starting a recording takes a lease on the device, and the
+    worker holding it renews it while recording. Other workers report the
+    recording's status from the lease and stop it by flagging the lease,
+    which the owner notices within LEASE_POLL_SECONDS and acts on. A worker
+    that dies stops renewing, so its devices can be started again once the
+    lease expires. Opening a session on a device ends any other session on
+    it, so a worker leaves devices leased by others alone: it neither warms
+    up, probes nor recreates their sessions, and only one elected worker
+    runs the startup warm-up.
+
+    With a ``write_behind`` queue, status/size/duration updates are queued
+    and written in batches instead of committed inside the request.
+
+    Lifecycle transitions (started, stopping, completed, failed) are
+    published on ``events`` for the /events stream. With a
+    ``post_processor``, each saved single-file recording is queued for the
+    post-stop pipeline.
+    """
+
+    def __init__(
+        self,
+        driver_factory: Optional[Callable[[str], object]] = None,
+        write_behind: Optional[WriteBehindQueue] = None,
+        post_processor: Optional[PostProcessor] = None,
+        coordination: Optional[CoordinationStore] = None,
+        allowed_udids: Optional[Iterable[str]] = None,
+        max_sessions: int = MAX_DEVICE_SESSIONS
+    ):
+        self._driver_factory = driver_factory or _create_driver
+        self.allowed_udids = {DEFAULT_DEVICE, *allowed_udids} if allowed_udids else None
+        self.max_sessions = max_sessions
+        self.write_behind = write_behind
+        self.post_processor = post_processor
+        self.coordination = coordination
+        self.owner = worker_id()
+        self._devices: Dict[str, DeviceSession] = {}
+        self._creation_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.events = EventBroadcaster(snapshot=self.snapshot)
+        self._session_metrics = {
+            "created": 0,
+            "failed": 0,
+            "dead_detected": 0,
+            "total_create_seconds": 0.0,
+            "max_create_seconds": 0.0,
+        }
+        self._keepalive: Optional[threading.Thread] = None
+        self._keepalive_stop = threading.Event()
+        self._coordinator: Optional[threading.Thread] = None
+        self._coordinator_stop = threading.Event()
+        # Devices whose requested stop is being carried out
+        self._remote_stops: Set[str] = set()
+
+    def get_device(self, udid: str) -> DeviceSession:
+        """
+        Returns the session for ``udid``, creating the driver if needed.
+
+        Raises:
+            DeviceStateError: If ``udid`` is not an allowed device, or every
+                session slot is taken by a busy device
+        """
+        device = self._devices.get(udid)
+        if device is not None:
+            device.used_at = time.monotonic()
+            return device
+        if self.allowed_udids is not None and udid not in self.allowed_udids:
+            raise DeviceStateError(f"Unknown device: {udid}")
+
+        # Session creation can take tens of seconds on real devices, so only
+        # callers for the same UDID wait on it. The lock is only kept while
+        # a creation is pending, so unknown or failing UDIDs leave nothing behind.
+        with self._lock:
+            creation_lock = self._creation_locks.setdefault(udid, threading.Lock())
+        try:
+            with creation_lock:
+                device = self._devices.get(udid)
+                if device is None:
+                    self._make_room()
+                    driver, create_seconds = self._create_session(udid)
+                    device = DeviceSession(udid, driver, create_seconds)
+                    with self._lock:
+                        self._devices[udid] = device
+                    logger.info(f"Registered device: {udid}")
+        finally:
+            with self._lock:
+                if self._creation_locks.get(udid) is creation_lock:
+                    del self._creation_locks[udid]
+        return device
+
+    def _make_room(self) -> None:
+        """Closes least recently used idle sessions until another one fits."""
+        while len(self._devices) >= self.max_sessions:
+            for device in sorted(self.devices(), key=lambda d: d.used_at):
+                if device.active is None and device.lock.acquire(blocking=False):
+                    break
+            else:
+                raise DeviceStateError(f"All {self.max_sessions} device sessions are busy")
+            try:
+                if device.active is not None:
+                    continue
+                with self._lock:
+                    self._devices.pop(device.udid, None)
+            finally:
+                device.lock.release()
+            logger.info(f"Closing idle driver session for {device.udid} to make room")
+            try:
+                device.driver.quit()
+            except Exception as e:
+                logger.error(f"Error while quitting driver for {device.udid}: {e}")
+
+    def _create_session(self, udid: str) -> Tuple[object, float]:
+        """Creates a driver for ``udid`` and records how long it took."""
+        started = time.perf_counter()
+        try:
+            driver = self._driver_factory(udid)
+        except Exception:
+            with self._lock:
+                self._session_metrics["failed"] += 1
+            raise
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            metrics = self._session_metrics
+            metrics["created"] += 1
+            metrics["total_create_seconds"] += elapsed
+            metrics["max_create_seconds"] = max(metrics["max_create_seconds"], elapsed)
+        logger.info(f"Driver session for {udid} created in {elapsed:.2f}s")
+        return driver, elapsed
+
+    def _leased_elsewhere(self, udid: str) -> bool:
+        """Whether another worker holds a live lease on the device."""
+        if self.coordination is None:
+            return False
+        lease = self.coordination.get(udid)
+        return lease is not None and lease.owner != self.owner
+
+    def _ensure_alive(self, device: DeviceSession, max_age: float = 0.0) -> None:
+        """
+        Recreates the device's session if it is dead. The caller holds the
+        device lock. Sessions proven alive within ``max_age`` are not probed,
+        nor those of devices another worker is recording on.
+        """
+        if time.monotonic() - device.checked_at < max_age:
+            return
+        if self._leased_elsewhere(device.udid):
+            return
+        if MobileDriver.is_session_alive(device.driver):
+            device.checked_at = time.monotonic()
+            return
+
+        with self._lock:
+            self._session_metrics["dead_detected"] += 1
+        logger.warning(f"Driver session for {device.udid} is dead, recreating it")
+        try:
+            device.driver.quit()
+        except Exception:
+            pass
+        driver, create_seconds = self._create_session(device.udid)
+        device.replace_driver(driver, create_seconds)
+
+    def warm_up(self, udids: Iterable[str]) -> None:
+        """
+        Creates sessions for ``udids`` in parallel so no request pays for it.
+        With coordination only the worker that claims the warm-up does so,
+        and devices leased by other workers are skipped.
+        """
+        udids = list(udids)
+        if self.coordination is not None and udids:
+            if not self.coordination.claim("driver-warmup", self.owner, ttl=WARMUP_CLAIM_SECONDS):
+                logger.info("Another worker is warming up driver sessions")
+                return
+            leased = {lease.udid for lease in self.coordination.leases() if lease.owner != self.owner}
+            udids = [udid for udid in udids if udid not in leased]
+
+        def create(udid: str) -> None:
+            try:
+                self.get_device(udid)
+            except Exception as e:
+                logger.error(f"Failed to warm up driver session for {udid}: {e}")
+
+        threads = [threading.Thread(target=create, args=(udid,), name=f"warmup-{udid}") for udid in udids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def check_sessions(self) -> None:
+        """
+        Probes every idle session and recreates the dead ones. With
+        coordination, devices leased by other workers are skipped, and a dead
+        session is left for the next start here to recreate under its lease:
+        another worker may be about to record on the device.
+        """
+        leased: Set[str] = set()
+        if self.coordination is not None:
+            leased = {lease.udid for lease in self.coordination.leases() if lease.owner != self.owner}
+        for device in self.devices():
+            # A busy device is proving its session right now; skip it
+            if device.active is not None or device.udid in leased or not device.lock.acquire(blocking=False):
+                continue
+            try:
+                if device.active is None:
+                    if self.coordination is None:
+                        self._ensure_alive(device)
+                    elif MobileDriver.is_session_alive(device.driver):
+                        device.checked_at = time.monotonic()
+                    else:
+                        logger.warning(f"Driver session for {device.udid} is dead, the next start recreates it")
+                        # Makes the next start probe it again
+                        device.checked_at = time.monotonic() - DRIVER_HEALTH_MAX_AGE
+            except Exception as e:
+                logger.error(f"Failed to recreate driver session for {device.udid}: {e}")
+            finally:
+                device.lock.release()
+
+    def start_keepalive(self, interval: float = DRIVER_KEEPALIVE_SECONDS) -> None:
+        """Starts the background thread that runs check_sessions every ``interval``."""
+        if interval <= 0 or self._keepalive is not None:
+            return
+
+        def run() -> None:
+            while not self._keepalive_stop.wait(interval):
+                self.check_sessions()
+
+        self._keepalive_stop.clear()
+        self._keepalive = threading.Thread(target=run, name="driver-keepalive", daemon=True)
+        self._keepalive.start()
+
+    def stop_keepalive(self) -> None:
+        if self._keepalive is not None:
+            self._keepalive_stop.set()
+            self._keepalive.join()
+            self._keepalive = None
+
+    def session_stats(self) -> dict:
+        """Session creation latency, dead-session counts and per-device ages."""
+        with self._lock:
+            metrics = dict(self._session_metrics)
+        metrics["mean_create_seconds"] = (
+            metrics["total_create_seconds"] / metrics["created"] if metrics["created"] else 0.0
+        )
+        metrics["devices"] = [device.session_stats() for device in self.devices()]
+        return metrics
+
+    def devices(self) -> List[DeviceSession]:
+        """Returns all registered devices."""
+        with self._lock:
+            return list(self._devices.values())
+
+    def snapshot(self) -> List[dict]:
+        """Recording state of every registered device, and of devices recorded by other workers."""
+        statuses = {device.udid: device.status() for device in self.devices()}
+        if self.coordination is not None:
+            for lease in self.coordination.leases():
+                if lease.owner != self.owner:
+                    statuses[lease.udid] = self._lease_status(lease)
+        return list(statuses.values())
+
+    def device_status(self, udid: str) -> dict:
+        """Recording state of one device, wherever it is recorded."""
+        device = self._devices.get(udid)
+        if device is not None and device.active is not None:
+            return device.status()
+        if self.coordination is not None:
+            lease = self.coordination.get(udid)
+            if lease is not None and lease.owner != self.owner:
+                return self._lease_status(lease)
+        return device.status() if device is not None else {"udid": udid, "is_recording": False}
+
+    @staticmethod
+    def _lease_status(lease: Lease) -> dict:
+        return {
+            "udid": lease.udid,
+            "is_recording": True,
+            "filename": lease.filename,
+            "duration": time.time() - lease.started_at,
+        }
+
+    def active_count(self) -> int:
+        """Number of devices currently recording."""
+        return sum(1 for device in self.devices() if device.active is not None)
+
+    @traced("pool.start_recording")
+    def start_recording(
+        self,
+        db: Session,
+        udid: str,
+        filename_prefix: str = "recording",
+        segment_seconds: Optional[float] = None,
+        output_dir: Optional[Path] = None,
+        video_quality: str = "medium"
+    ) -> ActiveRecording:
+        """
+        Creates the database entry and starts recording on a device.
+
+        With ``segment_seconds`` the recording is rotated on that interval and
+        each segment is saved to ``output_dir`` while the next one records.
+
+        Args:
+            db: Database session
+            udid: Device to record
+            filename_prefix: Prefix for the generated filename
+            segment_seconds: Segment length for a segmented recording
+            output_dir: Directory segments are saved to (segmented only)
+            video_quality: low, medium, or high
+
+        Returns:
+            The new ActiveRecording
+        """
+        if segment_seconds is not None and output_dir is None:
+            raise ValueError("output_dir is required for segmented recordings")
+
+        if udid == DEFAULT_DEVICE:
+            filename = f"{filename_prefix}_{get_file_safe_timestamp()}.mp4"
+        else:
+            filename = f"{filename_prefix}_{_safe_udid(udid)}_{get_file_safe_timestamp()}.mp4"
+
+        # Take the lease before touching the session: creating or recreating
+        # one on a device another worker records on would end its recording
+        if self.coordination is not None and not self.coordination.acquire(udid, self.owner, filename, time.time()):
+            raise DeviceStateError("Recording already in progress")
+        try:
+            device = self.get_device(udid)
+        except Exception:
+            self._release(udid)
+            raise
+
+        with device.lock:
+            if self._devices.get(udid) is not device:
+                # Closed by _make_room while this call waited for the lock
+                self._release(udid)
+                raise DeviceStateError(f"Driver session for {udid} was closed to make room, retry")
+            if device.active is not None:
+                raise DeviceStateError("Recording already in progress")
+
+            db_recording = None
+            try:
+                self._ensure_alive(device, max_age=DRIVER_HEALTH_MAX_AGE)
+                start_time = time.time()
+                db_recording = crud.create_recording(
+                    db=db,
+                    filename=filename,
+                    device_name=None if udid == DEFAULT_DEVICE else udid
+                )
+                if segment_seconds is None:
+                    device.recorder.start_recording(video_quality=video_quality)
+                else:
+                    device.recorder.start_recording(
+                        time_limit=segment_time_limit(segment_seconds),
+                        video_quality=video_quality
+                    )
+            except Exception:
+                # Update DB status to failed if entry was created
+                if db_recording is not None:
+                    self._update(db, str(db_recording.id), status=RecordingStatus.FAILED)
+                    self._publish("failed", udid, filename)
+                self._release(udid)
+                raise
+
+            device.checked_at = time.monotonic()
+            device.active = ActiveRecording(
+                filename=filename,
+                db_id=str(db_recording.id),
+                start_time=start_time,
+                created_at=db_recording.created_at
+            )
+            if segment_seconds is not None:
+                device.active.rotator = SegmentRotator(
+                    device.recorder,
+                    device.lock,
+                    device.active.db_id,
+                    filename,
+                    output_dir,
+                    segment_seconds,
+                    video_quality
+                )
+                device.active.rotator.start()
+            self._publish("started", udid, filename, duration=0.0)
+            return device.active
+
+    @traced("pool.stop_recording")
+    def stop_recording(
+        self,
+        db: Session,
+        udid: str,
+        output_dir: Path
+    ) -> Optional[Union[Row, RecordingResult]]:
+        """
+        Stops recording on a device, saves the video and updates the database.
+
+        For a segmented recording the last segment is saved and the call waits
+        until all earlier segments are stored; the row's size is their total.
+
+        Args:
+            db: Database session
+            udid: Device to stop
+            output_dir: Directory the video is saved to
+
+        Returns:
+            Updated recording row or None if the database entry is gone
+        """
+        device = self._devices.get(udid)
+        active = None
+        if device is not None:
+            with device.lock:
+                active = device.active
+        if active is None:
+            if self.coordination is not None:
+                return self._stop_remote(db, udid)
+            raise DeviceStateError("No recording in progress")
+
+        # The rotator takes the device lock to rotate, so it is stopped before
+        # the lock is taken again for the final stop.
+        if active.rotator is not None:
+            active.rotator.stop()
+
+        with device.lock:
+            if device.active is not active:
+                raise DeviceStateError("No recording in progress")
+
+            self._publish("stopping", udid, active.filename, duration=time.time() - active.start_time)
+            try:
+                # Stop recording and save file
+                if active.rotator is None:
+                    saved_path = device.recorder.stop_recording(recording_path(output_dir, active.filename))
+                    size_bytes = saved_path.stat().st_size if saved_path else 0
+                else:
+                    saved_path = device.recorder.stop_recording(active.rotator.next_segment_path())
+                    size_bytes = active.rotator.finish(saved_path)
+                duration_seconds = int(time.time() - active.start_time)
+
+                row = self._update(
+                    db,
+                    active.db_id,
+                    size_bytes=size_bytes,
+                    duration_seconds=duration_seconds,
+                    status=RecordingStatus.COMPLETED
+                )
+                self._publish(
+                    "completed",
+                    udid,
+                    active.filename,
+                    duration=duration_seconds,
+                    size_bytes=size_bytes
+                )
+                if self.post_processor is not None and active.rotator is None and saved_path:
+                    self.post_processor.submit(active.db_id, saved_path)
+                if self.write_behind is None:
+                    return row
+                return RecordingResult(
+                    id=active.db_id,
+                    filename=active.filename,
+                    size_bytes=size_bytes,
+                    created_at=active.created_at,
+                    duration_seconds=duration_seconds,
+                    status=RecordingStatus.COMPLETED
+                )
+            except Exception:
+                try:
+                    self._update(db, active.db_id, status=RecordingStatus.FAILED)
+                except Exception as e:
+                    logger.error(f"Failed to mark recording {active.filename} as failed: {e}")
+                self._publish("failed", udid, active.filename)
+                raise
+            finally:
+                device.active = None
+                self._release(udid)
+
+    def _release(self, udid: str) -> None:
+        if self.coordination is None:
+            return
+        try:
+            self.coordination.release(udid, self.owner)
+        except Exception as e:
+            # The lease expires on its own once it is no longer renewed
+            logger.error(f"Failed to release lease on {udid}: {e}")
+
+    def _stop_remote(self, db: Session, udid: str) -> Optional[Row]:
+        """Asks the worker recording ``udid`` to stop and waits until it has."""
+        lease = self.coordination.request_stop(udid)
+        if lease is None or lease.owner == self.owner:
+            raise DeviceStateError("No recording in progress")
+
+        deadline = time.monotonic() + REMOTE_STOP_TIMEOUT
+        while True:
+            current = self.coordination.get(udid)
+            if current is None or current.owner != lease.owner or current.filename != lease.filename:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Worker {lease.owner} did not stop the recording on {udid}")
+            time.sleep(LEASE_POLL_SECONDS)
+
+        logger.info(f"Recording {lease.filename} stopped by its owner {lease.owner}")
+        return crud.update_recording_by_filename(db=db, filename=lease.filename)
+
+    def start_coordination(
+        self,
+        output_dir: Path,
+        poll_interval: float = LEASE_POLL_SECONDS,
+        renew_interval: float = LEASE_TTL_SECONDS / 3
+    ) -> None:
+        """
+        Starts the thread that renews this worker's leases and carries out
+        stops other workers requested. Does nothing without a coordination store.
+        """
+        if self.coordination is None or self._coordinator is not None:
+            return
+
+        def run() -> None:
+            renewed_at = 0.0
+            while not self._coordinator_stop.wait(poll_interval):
+                if self.active_count() == 0:
+                    continue
+                try:
+                    if time.monotonic() - renewed_at >= renew_interval:
+                        self.coordination.renew(self.owner)
+                        renewed_at = time.monotonic()
+                    for udid in self.coordination.stop_requests(self.owner):
+                        if udid not in self._remote_stops:
+                            self._remote_stops.add(udid)
+                            threading.Thread(
+                                target=self._stop_requested, args=(udid, output_dir), name=f"remote-stop-{udid}"
+                            ).start()
+                except Exception as e:
+                    logger.error(f"Lease maintenance failed: {e}")
+
+        self._coordinator_stop.clear()
+        self._coordinator = threading.Thread(target=run, name="device-leases", daemon=True)
+        self._coordinator.start()
+        logger.info(f"Device coordination enabled as {self.owner}")
+
+    def _stop_requested(self, udid: str, output_dir: Path) -> None:
+        try:
+            with get_db_context() as db:
+                self.stop_recording(db, udid, output_dir)
+        except DeviceStateError:
+            # Nothing recording here any more; drop the stale lease
+            self._release(udid)
+        except Exception as e:
+            logger.error(f"Requested stop on {udid} failed: {e}")
+        finally:
+            self._remote_stops.discard(udid)
+
+    def stop_coordination(self) -> None:
+        if self._coordinator is not None:
+            self._coordinator_stop.set()
+            self._coordinator.join()
+            self._coordinator = None
+
+    def _publish(self, event: str, udid: str, filename: str, **data) -> None:
+        self.events.publish(event, {
+            "udid": udid,
+            "filename": filename,
+            "is_recording": event in ("started", "stopping"),
+            **data
+        })
+
+    def _update(self, db: Session, recording_id: str, **values) -> Optional[Row]:
+        """Applies a lifecycle transition now, or queues it when write-behind is on."""
+        if self.write_behind is not None:
+            self.write_behind.submit(recording_id, **values)
+            return None
+        return crud.update_recording(db=db, recording_id=recording_id, **values)
+
+    async def start_many(
+        self,
+        udids: Iterable[str],
+        filename_prefix: str = "recording",
+        segment_seconds: Optional[float] = None,
+        output_dir: Optional[Path] = None,
+        video_quality: str = "medium"
+    ) -> Dict[str, Union[ActiveRecording, Exception]]:
+        """Starts recordings on several devices in parallel, one DB session each."""
+        def start(udid: str) -> ActiveRecording:
+            with get_db_context() as db:
+                return self.start_recording(db, udid, filename_prefix, segment_seconds, output_dir, video_quality)
+
+        return await self._run_parallel(udids, start)
+
+    async def stop_many(
+        self,
+        udids: Iterable[str],
+        output_dir: Path
+    ) -> Dict[str, Union[Optional[Row], RecordingResult, Exception]]:
+        """Stops recordings on several devices in parallel, one DB session each."""
+        def stop(udid: str) -> Optional[Union[Row, RecordingResult]]:
+            with get_db_context() as db:
+                return self.stop_recording(db, udid, output_dir)
+
+        return await self._run_parallel(udids, stop)
+
+    async def _run_parallel(self, udids: Iterable[str], func: Callable[[str], object]) -> Dict[str, object]:
+        udids = list(dict.fromkeys(udids))
+        results = await asyncio.gather(
+            *(run_blocking(func, udid) for udid in udids),
+            return_exceptions=True
+        )
+        return dict(zip(udids, results))
+
+    def quit_all(self) -> None:
+        """Quits every driver session and forgets all devices."""
+        self.stop_keepalive()
+        for device in self.devices():
+            try:
+                device.driver.quit()
+            except Exception as e:
+                logger.error(f"Error while quitting driver for {device.udid}: {e}")
+        with self._lock:
+            self._devices.clear()
+            self._creation_locks.clear()
+
+device_pool = DevicePool(
+    write_behind=WriteBehindQueue.from_env(on_flush=crud.invalidate_cache),
+    post_processor=PostProcessor.from_env(),
+    coordination=coordination_store_from_env(),
+    allowed_udids=DEVICE_UDIDS
+)
@@ -12,31 +12,56 @@ class MobileDriver:
     def get_driver(cls) -> object:
         """Returns the singleton driver instance, creating it if needed."""
         if cls._instance is None:
-            try:
-                # Check for Mock Mode
-                if os.getenv("MOCK_MODE", "false").lower() == "true":
-                    from src.simulation.mock_driver import MockDriver
-                    logger.info("MOCK_MODE is enabled. Initializing MockDriver.")
-                    cls._instance = MockDriver()
-                    return cls._instance
+            cls._instance = cls.create_driver()
+        return cls._instance
 
-                logger.info("Initializing Appium Driver...")
-                caps = get_ios_capabilities()
-                server_url = os.getenv("APPIUM_SERVER_URL", "http://localhost:4723")
-                
-                # Appium 2.x standard way
-                options = AppiumOptions()
-                options.load_capabilities(caps)
-                
-                cls._instance = webdriver.Remote(server_url, options=options)
-                logger.info("Driver initialized successfully.")
-            except Exception as e:
-                logger.error(f"Failed to initialize driver: {e}")
-                if "WinError 10061" in str(e) or "Connection refused" in str(e):
-                    logger.warning("\n\n(Hint) Connection refused. If you are running locally on Windows without a real device, try running in Mock Mode:\n    $env:MOCK_MODE='true'; pytest\n")
-                raise
+    @classmethod
+    def create_driver(cls, udid: Optional[str] = None) -> object:
+        """
+        Creates a new driver session, independent of the singleton.
+        
+        Args:
+            udid: Target device UDID; defaults to the UDID environment variable
+        """
+        try:
+            # Check for Mock Mode
+            if os.getenv("MOCK_MODE", "false").lower() == "true":
+                from src.simulation.mock_driver import MockDriver
+                logger.info("MOCK_MODE is enabled. Initializing MockDriver.")
+                return MockDriver(udid=udid)
 
-        return cls._instance
+            target = f" for {udid}" if udid else ""
+            logger.info(f"Initializing Appium Driver{target}...")
+            caps = get_ios_capabilities(udid=udid)
+            server_url = os.getenv("APPIUM_SERVER_URL", "http://localhost:4723")
+            
+            # Appium 2.x standard way
+            options = AppiumOptions()
+            options.load_capabilities(caps)
+            
+            driver = webdriver.Remote(server_url, options=options)
+            logger.info("Driver initialized successfully.")
+            return driver
+        except Exception as e:
+            logger.error(f"Failed to initialize driver: {e}")
+            if "WinError 10061" in str(e) or "Connection refused" in str(e):
+                logger.warning("\n\n(Hint) Connection refused. If you are running locally on Windows without a real device, try running in Mock Mode:\n    $env:MOCK_MODE='true'; pytest\n")
+            raise
+
+    @staticmethod
+    def is_session_alive(driver: object) -> bool:
+        """
+        Checks that a driver session still exists on the Appium server.
+        
+        Reads the session timeouts, a single session-scoped round trip that
+        WDA answers without touching the device UI.
+        """
+        try:
+            driver.timeouts
+            return True
+        except Exception as e:
+            logger.warning(f"Driver session {getattr(driver, 'session_id', None)} is not alive: {e}")
+            return False
 
     @classmethod
     def quit_driver(cls) -> None:
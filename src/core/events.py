@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator, Callable, List, Optional, Set
+
+from src.utils.concurrency import run_blocking
+from src.utils.logger import logger
+
+# Events buffered per subscriber before it is considered too slow
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "64"))
+
+# Seconds between live duration updates while a device is recording
+EVENTS_TICK_SECONDS = float(os.getenv("EVENTS_TICK_SECONDS", "1"))
+
+# Marker queued in place of the backlog of a subscriber that fell behind
+RESYNC = b""
+
+def format_sse(event: str, data: object) -> bytes:
+    """Encodes one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
+class Subscription:
+    """One subscriber's bounded queue of encoded events."""
+
+    def __init__(self, broadcaster: "EventBroadcaster", maxsize: int):
+        self._broadcaster = broadcaster
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize)
+        self.resyncs = 0
+
+    def offer(self, message: bytes) -> None:
+        """
+        Queues a message without ever blocking the producer.
+
+        A full queue means the client is not keeping up: its backlog is
+        replaced by a single resync marker, after which it is sent a fresh
+        snapshot instead of every missed transition.
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.resyncs += 1
+
+    async def get(self) -> bytes:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self._broadcaster.unsubscribe(self)
+
+class EventBroadcaster:
+    """
+    Fans recording state changes out to any number of subscribers.
+
+    ``publish`` may be called from any thread; the message is encoded once
+    and handed to every subscriber's queue on the event loop. Subscribers
+    never slow the producer down (see ``Subscription.offer``). While anyone
+    is subscribed, a single ticker task publishes the duration of active
+    recordings every ``tick_seconds``. ``snapshot`` may block (it reads
+    other workers' leases from the database), so it runs on the worker pool.
+    """
+
+    def __init__(
+        self,
+        snapshot: Callable[[], List[dict]],
+        queue_size: int = EVENTS_QUEUE_SIZE,
+        tick_seconds: float = EVENTS_TICK_SECONDS
+    ):
+        self.snapshot = snapshot
+        self.queue_size = queue_size
+        self.tick_seconds = tick_seconds
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ticker: Optional[asyncio.Task] = None
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """Adds a subscriber; must be called on the event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First subscriber, or the loop was restarted (tests, reloads)
+            self._loop = loop
+            self._subscribers.clear()
+            self._ticker = None
+        subscription = Subscription(self, self.queue_size)
+        self._subscribers.add(subscription)
+        if self._ticker is None or self._ticker.done():
+            self._ticker = loop.create_task(self._tick())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: str, data: dict) -> None:
+        """Sends an event to all current subscribers; safe from any thread."""
+        loop = self._loop
+        if loop is None or not self._subscribers or loop.is_closed():
+            return
+        message = format_sse(event, data)
+        try:
+            in_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self._dispatch(message)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._dispatch, message)
+            except RuntimeError:
+                # Loop closed between the check and the call
+                pass
+
+    def _dispatch(self, message: bytes) -> None:
+        for subscription in list(self._subscribers):
+            subscription.offer(message)
+
+    async def _tick(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.tick_seconds)
+            try:
+                active = [device for device in await run_blocking(self.snapshot) if device["is_recording"]]
+            except Exception as e:
+                logger.error(f"Failed to read recording state for events: {e}")
+                continue
+            if active:
+                self.publish("duration", {"devices": active})
+
+    async def stream(self, max_seconds: float, keepalive_seconds: float = 15.0) -> AsyncIterator[bytes]:
+        """
+        Subscribes and yields the SSE body for the new subscriber.
+
+        Starts with a snapshot of every device and ends after ``max_seconds``
+        so server shutdown is never held up for long; the ``retry`` hint makes
+        EventSource reconnect straight away.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_seconds
+        subscription = self.subscribe()
+        try:
+            yield b"retry: 1000\n\n" + format_sse("snapshot", {"devices": await run_blocking(self.snapshot)})
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                try:
+                    message = await asyncio.wait_for(subscription.get(), min(keepalive_seconds, remaining))
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if message == RESYNC:
+                    message = format_sse("snapshot", {"devices": await run_blocking(self.snapshot)})
+                yield message
+        finally:
+            subscription.close()
@@ -0,0 +1,211 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.utils.logger import logger
+from src.utils.mp4 import Mp4Error, extract_poster, faststart
+
+# Processes running pipeline stages
+POSTPROCESS_WORKERS = int(os.getenv("POSTPROCESS_WORKERS", "2"))
+
+# Attempts after the first one for a job whose stages raised
+POSTPROCESS_RETRIES = int(os.getenv("POSTPROCESS_RETRIES", "2"))
+
+# A stage takes the video path and returns Recording column values to store
+Stage = Callable[[Path], dict]
+
+STAGES: Dict[str, Stage] = {}
+
+def register_stage(name: str) -> Callable[[Stage], Stage]:
+    """
+    Registers a pipeline stage under ``name``.
+
+    Stages run in worker processes, so they must be module-level functions
+    in a module the workers import (this one, or one imported by it).
+    """
+    def decorator(func: Stage) -> Stage:
+        STAGES[name] = func
+        return func
+    return decorator
+
+@register_stage("faststart")
+def faststart_stage(path: Path) -> dict:
+    faststart(path)
+    return {"faststart": True}
+
+@register_stage("thumbnail")
+def thumbnail_stage(path: Path) -> dict:
+    poster = path.with_name(f"{path.stem}.poster.jpg")
+    if not extract_poster(path, poster):
+        return {}
+    return {"thumbnail_filename": poster.name}
+
+def run_stages(path: str, stage_names: List[str]) -> dict:
+    """
+    Runs stages on one video, in order; executes in a worker process.
+
+    A failing stage does not stop the ones after it.
+
+    Returns:
+        ``values`` (merged column values), ``timings`` (seconds per stage),
+        ``errors`` (message per failed stage) and ``permanent`` (failed
+        stages that a retry cannot fix, such as on a file that is not an MP4)
+    """
+    report = {"values": {}, "timings": {}, "errors": {}, "permanent": []}
+    for name in stage_names:
+        started = time.perf_counter()
+        try:
+            report["values"].update(STAGES[name](Path(path)))
+        except Exception as e:
+            report["errors"][name] = f"{type(e).__name__}: {e}"
+            if isinstance(e, Mp4Error):
+                report["permanent"].append(name)
+        report["timings"][name] = time.perf_counter() - started
+    return report
+
+@dataclass
+class ProcessingJob:
+    """A queued or running pipeline run for one recording."""
+    recording_id: str
+    path: Path
+    attempts: int = 0
+    report: Optional[dict] = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+class PostProcessor:
+    """
+    Runs the post-stop pipeline on saved recordings in a process pool.
+
+    Jobs are keyed by recording: submitting one that is already queued or
+    running returns the existing job. A job whose stages raised is retried
+    with exponential backoff up to ``max_retries`` times, unless every
+    failure is permanent (an invalid MP4 stays invalid); the final report
+    is stored on the recording through ``crud.update_recording_processing``.
+    """
+
+    def __init__(
+        self,
+        stages: Optional[List[str]] = None,
+        workers: int = POSTPROCESS_WORKERS,
+        max_retries: int = POSTPROCESS_RETRIES,
+        retry_delay: float = 1.0
+    ):
+        self.stages = list(stages or STAGES)
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._jobs: Dict[str, ProcessingJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._counters = {"submitted": 0, "deduplicated": 0, "retried": 0, "completed": 0, "failed": 0}
+        self._stage_seconds: Dict[str, float] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["PostProcessor"]:
+        """
+        Builds the pipeline from POSTPROCESS* variables, or None if disabled.
+        Off by default under MOCK_MODE, whose payloads are not MP4 files.
+        """
+        mock_mode = os.getenv("MOCK_MODE", "false").lower() == "true"
+        if os.getenv("POSTPROCESS", "false" if mock_mode else "true").lower() != "true":
+            return None
+        stages = [s.strip() for s in os.getenv("POSTPROCESS_STAGES", "").split(",") if s.strip()]
+        return cls(stages=stages or None)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers do not inherit the server's threads and locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, recording_id: str, path: Path) -> ProcessingJob:
+        """Queues a recording for processing unless it is already queued."""
+        recording_id = str(recording_id)
+        with self._lock:
+            job = self._jobs.get(recording_id)
+            if job is not None:
+                self._counters["deduplicated"] += 1
+                return job
+            job = ProcessingJob(recording_id, Path(path))
+            self._jobs[recording_id] = job
+            self._counters["submitted"] += 1
+        self._run(job)
+        return job
+
+    def _run(self, job: ProcessingJob) -> None:
+        job.attempts += 1
+        try:
+            future = self._get_executor().submit(run_stages, str(job.path), self.stages)
+        except Exception as e:
+            # Shut down or broken pool
+            self._finish(job, {"values": {}, "timings": {}, "errors": {"pipeline": str(e)}})
+            return
+        future.add_done_callback(lambda f: self._on_done(job, f))
+
+    def _on_done(self, job: ProcessingJob, future: Future) -> None:
+        try:
+            report = future.result()
+        except Exception as e:
+            report = {"values": {}, "timings": {}, "errors": {"pipeline": f"{type(e).__name__}: {e}"}}
+
+        retryable = set(report["errors"]) - set(report.get("permanent", ()))
+        if retryable and job.attempts <= self.max_retries:
+            delay = self.retry_delay * 2 ** (job.attempts - 1)
+            logger.warning(f"Processing {job.path.name} failed ({report['errors']}), retrying in {delay:.1f}s")
+            with self._lock:
+                self._counters["retried"] += 1
+            timer = threading.Timer(delay, self._run, (job,))
+            timer.daemon = True
+            timer.start()
+            return
+        # Storing hits the database; keep it off the pool's result thread
+        threading.Thread(target=self._finish, args=(job, report), daemon=True).start()
+
+    def _finish(self, job: ProcessingJob, report: dict) -> None:
+        from src.database import crud, get_db_context
+
+        status = "failed" if report["errors"] else "completed"
+        try:
+            with get_db_context() as db:
+                crud.update_recording_processing(
+                    db,
+                    job.recording_id,
+                    processing_status=status,
+                    processing_timings=report["timings"],
+                    **report["values"]
+                )
+        except Exception as e:
+            logger.error(f"Failed to store processing results for {job.path.name}: {e}")
+
+        timings = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in report["timings"].items())
+        logger.info(f"Processed {job.path.name}: {status} ({timings})")
+        with self._lock:
+            self._counters[status] += 1
+            for name, seconds in report["timings"].items():
+                self._stage_seconds[name] = self._stage_seconds.get(name, 0.0) + seconds
+            self._jobs.pop(job.recording_id, None)
+        job.report = report
+        job.done.set()
+
+    def stats(self) -> dict:
+        """Job counters and total seconds spent per stage."""
+        with self._lock:
+            return {
+                **self._counters,
+                "pending": len(self._jobs),
+                "stages": list(self.stages),
+                "stage_seconds": dict(self._stage_seconds),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
@@ -1,14 +1,34 @@
+import os
 from pathlib import Path
 from typing import Optional
 from appium.webdriver.webdriver import WebDriver
 from src.core.driver import MobileDriver
+from src.core.uploads import UploadRegistry, upload_registry
 from src.utils.file_utils import save_video
 from src.utils.logger import logger
+from src.utils.metrics import DRIVER_START_SECONDS, DRIVER_STOP_SECONDS
+from src.utils.profiling import span, traced
 
 class ScreenRecorder:
-    def __init__(self, driver: WebDriver = None):
+    def __init__(
+        self,
+        driver: WebDriver = None,
+        upload_url: Optional[str] = None,
+        uploads: UploadRegistry = upload_registry
+    ):
+        """
+        Args:
+            driver: Driver session; defaults to the MobileDriver singleton
+            upload_url: Base URL of this API as reachable from the Appium
+                server (RECORDING_UPLOAD_URL). When set, stopped recordings are
+                uploaded to /uploads/<token> instead of returned as base64.
+            uploads: Registry the upload route resolves tokens against
+        """
         self.driver = driver or MobileDriver.get_driver()
+        self.upload_url = upload_url or os.getenv("RECORDING_UPLOAD_URL")
+        self.uploads = uploads
 
+    @traced("recorder.start_recording")
     def start_recording(self, video_type: str = "mp4", time_limit: int = 180, video_quality: str = "medium") -> None:
         """
         Starts screen recording on the iOS device.
@@ -19,22 +39,50 @@ class ScreenRecorder:
             video_quality: low, medium, or high
         """
         try:
-            logger.info("Starting screen recording...")
-            self.driver.start_recording_screen(
-                videoType=video_type,
-                timeLimit=time_limit,
-                videoQuality=video_quality,
-                forceRestart=True
-            )
-            logger.info("Screen recording started.")
+            logger.debug("Starting screen recording...")
+            with DRIVER_START_SECONDS.time(), span("driver.start_recording_screen"):
+                self.driver.start_recording_screen(
+                    videoType=video_type,
+                    timeLimit=time_limit,
+                    videoQuality=video_quality,
+                    forceRestart=True
+                )
+            logger.debug("Screen recording started.")
         except Exception as e:
             logger.error(f"Failed to start recording: {e}")
             raise
 
+    def rotate_recording(self, **start_kwargs) -> Optional[str]:
+        """
+        Ends the current recording and immediately starts the next one.
+        
+        The finished video is returned undecoded so the caller can save it
+        while the next recording is already running.
+        
+        Args:
+            **start_kwargs: Arguments for start_recording of the next recording
+            
+        Returns:
+            Base64 video data of the finished recording, or None if empty.
+        """
+        try:
+            with DRIVER_STOP_SECONDS.time(), span("driver.stop_recording_screen"):
+                video_base64 = self.driver.stop_recording_screen()
+        except Exception as e:
+            logger.error(f"Failed to stop recording for rotation: {e}")
+            raise
+        self.start_recording(**start_kwargs)
+        return video_base64 or None
+
+    @traced("recorder.stop_recording")
     def stop_recording(self, output_path: Path) -> Path:
         """
         Stops screen recording and saves the file.
         
+        With an upload URL the driver PUTs the video to this API, which
+        streams it to ``output_path``. A driver that ignores ``remotePath``
+        and returns base64 anyway is decoded as usual.
+        
         Args:
             output_path: The file path where the video should be saved.
             
@@ -42,8 +90,12 @@ class ScreenRecorder:
             The absolute path to the saved video file.
         """
         try:
-            logger.info("Stopping screen recording...")
-            video_base64 = self.driver.stop_recording_screen()
+            logger.debug("Stopping screen recording...")
+            if self.upload_url:
+                return self._stop_with_upload(output_path)
+
+            with DRIVER_STOP_SECONDS.time(), span("driver.stop_recording_screen"):
+                video_base64 = self.driver.stop_recording_screen()
             
             if not video_base64:
                 logger.warning("No video data returned from stop_recording_screen")
@@ -55,3 +107,30 @@ class ScreenRecorder:
         except Exception as e:
             logger.error(f"Failed to stop recording: {e}")
             raise
+
+    def _stop_with_upload(self, output_path: Path) -> Optional[Path]:
+        token = self.uploads.expect(output_path)
+        try:
+            with DRIVER_STOP_SECONDS.time(), span("driver.stop_recording_screen"):
+                video_base64 = self.driver.stop_recording_screen(
+                    remotePath=f"{self.upload_url.rstrip('/')}/uploads/{token}",
+                    method="PUT"
+                )
+        except Exception:
+            self.uploads.discard(token)
+            raise
+
+        if video_base64:
+            # Fallback: the driver returned the video inline
+            self.uploads.discard(token)
+            save_video(video_base64, output_path)
+            return output_path
+
+        # Appium finishes the upload before it answers, so this rarely waits
+        with span("recorder.upload_wait"):
+            size_bytes = self.uploads.wait(token)
+        if not size_bytes:
+            logger.warning("No video data uploaded by stop_recording_screen")
+            output_path.unlink(missing_ok=True)
+            return None
+        return output_path
@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy.engine import Row
+
+from src.core.device_pool import DEFAULT_DEVICE, DevicePool, DeviceStateError
+from src.database import crud, get_db_context, RecordingStatus
+from src.utils.file_utils import recording_path
+from src.utils.logger import logger
+
+# Seconds between sweeps after the one at startup (0 disables the sweeper)
+RECORDING_SWEEP_SECONDS = float(os.getenv("RECORDING_SWEEP_SECONDS", "300"))
+
+# Rows younger than this are left alone: a start commits its row just
+# before the recording becomes active
+RECORDING_SWEEP_MIN_AGE_SECONDS = float(os.getenv("RECORDING_SWEEP_MIN_AGE_SECONDS", "60"))
+
+# Rows read and updated per transaction
+RECORDING_SWEEP_BATCH = int(os.getenv("RECORDING_SWEEP_BATCH", "1000"))
+
+# Try to stop and save what a device is still recording for an orphaned row
+RECORDING_SWEEP_SALVAGE = os.getenv("RECORDING_SWEEP_SALVAGE", "true").lower() == "true"
+
+class RecordingSweeper:
+    """
+    Resolves recordings left IN_PROGRESS by a process that died mid-recording.
+
+    Each sweep pages through IN_PROGRESS rows older than ``min_age`` on the
+    (status, created_at) index, skipping those this worker or, with a
+    coordination store, another live worker is still recording. Of the rest:
+
+    - rows whose segments were already stored (size > 0) are marked
+      COMPLETED with what was saved;
+    - the newest row per device is salvaged: its device may still be
+      recording until the time limit, so the recording is stopped and the
+      video saved under the row's filename. With coordination the device's
+      lease is taken for the salvage, and a device another worker took in
+      the meantime is skipped until the next sweep;
+    - everything else, and salvages that return no video, is marked FAILED.
+
+    Status changes are applied with one UPDATE per batch of ``batch_size``
+    rows, so a large backlog costs a few statements per thousand rows.
+    """
+
+    def __init__(
+        self,
+        pool: DevicePool,
+        output_dir: Path,
+        min_age: float = RECORDING_SWEEP_MIN_AGE_SECONDS,
+        batch_size: int = RECORDING_SWEEP_BATCH,
+        salvage: bool = RECORDING_SWEEP_SALVAGE
+    ):
+        self.pool = pool
+        self.output_dir = output_dir
+        self.min_age = min_age
+        self.batch_size = batch_size
+        self.salvage = salvage
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def sweep(self) -> Dict[str, int]:
+        """Runs one pass and returns how many rows were found and how each was resolved."""
+        report = {"stale": 0, "completed": 0, "salvaged": 0, "failed": 0}
+        if self.pool.write_behind is not None:
+            # Queued completions would otherwise look orphaned
+            self.pool.write_behind.flush()
+
+        live_ids = {device.active.db_id for device in self.pool.devices() if device.active is not None}
+        live_files: Set[str] = set()
+        leased: Set[str] = set()
+        if self.pool.coordination is not None:
+            for lease in self.pool.coordination.leases():
+                live_files.add(lease.filename)
+                leased.add(lease.udid)
+
+        cutoff = datetime.utcnow() - timedelta(seconds=self.min_age)
+        # Newest orphan per device so far; rows arrive oldest first
+        candidates: Dict[str, Row] = {}
+        after = None
+        while not self._stop.is_set():
+            with get_db_context() as db:
+                rows = crud.get_stale_recordings(db, cutoff, after, limit=self.batch_size)
+                if not rows:
+                    break
+                after = (rows[-1].created_at, rows[-1].id)
+
+                failed: List[str] = []
+                completed: List[str] = []
+                for row in rows:
+                    if str(row.id) in live_ids or row.filename in live_files:
+                        continue
+                    report["stale"] += 1
+                    udid = row.device_name or DEFAULT_DEVICE
+                    if row.size_bytes:
+                        completed.append(str(row.id))
+                    elif self.salvage and udid not in leased:
+                        previous = candidates.get(udid)
+                        if previous is not None:
+                            failed.append(str(previous.id))
+                        candidates[udid] = row
+                    else:
+                        failed.append(str(row.id))
+
+                if completed:
+                    report["completed"] += crud.update_recordings_status(
+                        db, completed, RecordingStatus.COMPLETED, batch_size=self.batch_size
+                    )
+                if failed:
+                    report["failed"] += crud.update_recordings_status(
+                        db, failed, RecordingStatus.FAILED, batch_size=self.batch_size
+                    )
+            if len(rows) < self.batch_size:
+                break
+
+        coordination = self.pool.coordination
+        for udid, row in candidates.items():
+            if self._stop.is_set():
+                break
+            # Stopping the recorder of a device another worker has started
+            # recording on since the leases were read would end its recording
+            if coordination is not None and not coordination.acquire(udid, self.pool.owner, row.filename, time.time()):
+                report["stale"] -= 1
+                continue
+            try:
+                with get_db_context() as db:
+                    if self._salvage(db, udid, row):
+                        report["salvaged"] += 1
+                    else:
+                        crud.update_recording(db, str(row.id), status=RecordingStatus.FAILED)
+                        report["failed"] += 1
+            finally:
+                if coordination is not None:
+                    coordination.release(udid, self.pool.owner)
+
+        if report["stale"]:
+            logger.warning(f"Resolved orphaned recordings: {report}")
+        return report
+
+    def _salvage(self, db, udid: str, row: Row) -> bool:
+        """Stops whatever ``udid`` is still recording and stores it as ``row``'s video."""
+        try:
+            device = self.pool.get_device(udid)
+            with device.lock:
+                if device.active is not None:
+                    raise DeviceStateError("Device is recording again")
+                saved_path = device.recorder.stop_recording(recording_path(self.output_dir, row.filename))
+            size_bytes = saved_path.stat().st_size if saved_path else 0
+        except Exception as e:
+            logger.warning(f"Could not salvage {row.filename} from {udid}: {e}")
+            return False
+        if not size_bytes:
+            return False
+        crud.update_recording(db, str(row.id), size_bytes=size_bytes, status=RecordingStatus.COMPLETED)
+        logger.info(f"Salvaged orphaned recording {row.filename} ({size_bytes} bytes)")
+        return True
+
+    def start(self, interval: float = RECORDING_SWEEP_SECONDS) -> None:
+        """Sweeps now and then every ``interval`` seconds, on a background thread."""
+        if interval <= 0 or self._thread is not None:
+            return
+
+        def run() -> None:
+            while True:
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"Recording sweep failed: {e}")
+                if self._stop.wait(interval):
+                    return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="recording-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,135 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from src.database import crud, get_db_context
+from src.utils.file_utils import recording_path, save_video
+from src.utils.logger import logger
+
+# iOS caps a single screen recording at 30 minutes
+MAX_SEGMENT_SECONDS = 1800
+
+def segment_filename(filename: str, index: int) -> str:
+    """Name of segment ``index`` of a recording, e.g. ``rec.part003.mp4``."""
+    path = Path(filename)
+    return f"{path.stem}.part{index:03d}{path.suffix}"
+
+def segment_time_limit(segment_seconds: float) -> int:
+    """Device-side time limit for one segment, with headroom for rotation."""
+    return min(MAX_SEGMENT_SECONDS, int(segment_seconds) + 60)
+
+class SegmentRotator:
+    """
+    Splits a long recording into segments of ``segment_seconds``.
+
+    A background thread rotates the device recording on each tick: it stops
+    the current segment and starts the next one straight away, holding the
+    device lock only for that. The finished segment is then decoded, saved
+    and added to the database on a per-recording worker, in order, while the
+    next segment records. Memory is bounded by one segment's payload instead
+    of the whole session.
+
+    A failed rotation ends the rotating and is kept in ``error``; ``finish``
+    raises it, so the recording is marked failed rather than completed with
+    segments missing.
+    """
+
+    def __init__(
+        self,
+        recorder,
+        device_lock: threading.Lock,
+        recording_id: str,
+        filename: str,
+        output_dir: Path,
+        segment_seconds: float,
+        video_quality: str = "medium"
+    ):
+        self.recorder = recorder
+        self.device_lock = device_lock
+        self.recording_id = recording_id
+        self.filename = filename
+        self.output_dir = output_dir
+        self.segment_seconds = segment_seconds
+        self.video_quality = video_quality
+        self.next_index = 0
+        self.total_bytes = 0
+        self.error: Optional[Exception] = None
+        self._futures: List[Future] = []
+        self._stop = threading.Event()
+        # One worker keeps segments in order and limits the backlog per device
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"segments-{Path(filename).stem}")
+        self._thread = threading.Thread(target=self._run, name=f"rotate-{Path(filename).stem}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        logger.info(f"Segmenting {self.filename} every {self.segment_seconds}s")
+
+    def stop(self) -> None:
+        """Stops rotating; a rotation already underway completes first."""
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def next_segment_path(self) -> Path:
+        return recording_path(self.output_dir, segment_filename(self.filename, self.next_index))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.segment_seconds):
+            with self.device_lock:
+                if self._stop.is_set():
+                    return
+                try:
+                    video_base64 = self.recorder.rotate_recording(
+                        time_limit=segment_time_limit(self.segment_seconds),
+                        video_quality=self.video_quality
+                    )
+                except Exception as e:
+                    # finish() raises it, so the final stop marks the recording failed
+                    logger.error(f"Segment rotation failed for {self.filename}: {e}")
+                    self.error = e
+                    return
+            if video_base64:
+                self._submit(self._save_segment, self.next_index, video_base64)
+                self.next_index += 1
+
+    def _submit(self, func, *args) -> None:
+        self._futures.append(self._executor.submit(func, *args))
+
+    def _save_segment(self, index: int, video_base64: str) -> None:
+        path = recording_path(self.output_dir, segment_filename(self.filename, index))
+        save_video(video_base64, path)
+        self._add_segment(index, path)
+
+    def _add_segment(self, index: int, path: Path) -> None:
+        size_bytes = path.stat().st_size
+        with get_db_context() as db:
+            crud.add_recording_segment(db, self.recording_id, index, path.name, size_bytes)
+        self.total_bytes += size_bytes
+
+    def finish(self, final_path: Optional[Path]) -> int:
+        """
+        Records the final segment and waits for pending saves.
+
+        Must be called after stop() with the path the final segment was saved
+        to, or None if the device returned no data.
+
+        Returns:
+            Total size of all segments in bytes
+
+        Raises:
+            Exception: The error of a failed rotation, or else the first error
+                raised while saving a segment
+        """
+        self.stop()
+        if final_path is not None:
+            self._submit(self._add_segment, self.next_index, final_path)
+            self.next_index += 1
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+        if self.error is not None:
+            raise self.error
+        return self.total_bytes
@@ -0,0 +1,175 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from src.database import crud, get_db_context, Recording, RecordingStatus
+from src.utils.file_utils import ColdTier, ContentAddressedStorage, LocalColdTier
+from src.utils.logger import logger
+
+# Seconds between storage sweeps (0 disables the background janitor)
+STORAGE_SWEEP_SECONDS = float(os.getenv("STORAGE_SWEEP_SECONDS", "600"))
+
+def cold_tier_from_env() -> Optional[ColdTier]:
+    """The cold tier configured by STORAGE_COLD_DIR, or None."""
+    cold_dir = os.getenv("STORAGE_COLD_DIR")
+    return LocalColdTier(Path(cold_dir)) if cold_dir else None
+
+class StorageJanitor:
+    """
+    Keeps local recording storage deduplicated and within its limits.
+
+    Each sweep ingests settled files into the content-addressed store, evicts
+    recordings older than ``max_age`` and then least recently accessed ones
+    until usage is below ``low_watermark`` of ``quota_bytes``, and finally
+    reclaims objects no name refers to.
+
+    Eviction works on whole recordings (file, segments and poster) and keeps
+    the database consistent with the disk. With a cold tier, files are copied
+    there and the row is marked archived before the local copy goes, and a
+    download restores them. Without one, the row is deleted first, so a
+    crash can leave an unreferenced file but never a row without its file.
+    Recordings still in progress are never evicted.
+    """
+
+    def __init__(
+        self,
+        storage: ContentAddressedStorage,
+        quota_bytes: Optional[int] = None,
+        max_age: Optional[timedelta] = None,
+        settle_seconds: float = 60.0,
+        low_watermark: float = 0.9,
+        batch_size: int = 500
+    ):
+        self.storage = storage
+        self.quota_bytes = quota_bytes
+        self.max_age = max_age
+        self.settle_seconds = settle_seconds
+        self.low_watermark = low_watermark
+        self.batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_env(cls, root: Path) -> "StorageJanitor":
+        """Builds the janitor for ``root`` from STORAGE_* variables."""
+        quota_gb = os.getenv("STORAGE_QUOTA_GB")
+        max_age_days = os.getenv("STORAGE_MAX_AGE_DAYS")
+        return cls(
+            ContentAddressedStorage(root, cold_tier=cold_tier_from_env()),
+            quota_bytes=int(float(quota_gb) * 1024 ** 3) if quota_gb else None,
+            max_age=timedelta(days=float(max_age_days)) if max_age_days else None,
+            settle_seconds=float(os.getenv("STORAGE_SETTLE_SECONDS", "60"))
+        )
+
+    def sweep(self) -> Dict[str, int]:
+        """Runs one ingest/evict/collect pass and returns what it did."""
+        report = {"ingested": self.storage.ingest_settled(self.settle_seconds), "evicted": 0, "freed_bytes": 0}
+
+        if self.max_age is not None:
+            cutoff = datetime.utcnow() - self.max_age
+            with get_db_context() as db:
+                while True:
+                    batch = crud.get_recordings_created_before(db, cutoff, limit=self.batch_size)
+                    for recording in batch:
+                        report["freed_bytes"] += self.evict_recording(db, recording)
+                        report["evicted"] += 1
+                    if len(batch) < self.batch_size:
+                        break
+
+        if self.quota_bytes is not None:
+            evicted, freed = self._enforce_quota()
+            report["evicted"] += evicted
+            report["freed_bytes"] += freed
+
+        report["collected_bytes"] = self.storage.collect_garbage()
+        logger.info(f"Storage sweep: {report}")
+        return report
+
+    def _enforce_quota(self) -> tuple:
+        usage = self.storage.usage_bytes()
+        if usage <= self.quota_bytes:
+            return 0, 0
+
+        target = self.quota_bytes * self.low_watermark
+        evicted, freed = 0, 0
+        seen: Set[str] = set()
+        files = sorted(self.storage.iter_files(), key=lambda f: f.accessed_at)
+        with get_db_context() as db:
+            for stored in files:
+                if usage - freed <= target:
+                    break
+                recording = crud.get_recording_owning_file(db, stored.filename)
+                if recording is None or str(recording.id) in seen:
+                    continue
+                seen.add(str(recording.id))
+                if recording.status == RecordingStatus.IN_PROGRESS:
+                    continue
+                freed += self.evict_recording(db, recording)
+                evicted += 1
+        logger.info(f"Storage over quota ({usage} > {self.quota_bytes} bytes): evicted {evicted} recordings")
+        return evicted, freed
+
+    def evict_recording(self, db, recording: Recording) -> int:
+        """Removes a recording's local files; returns the bytes this frees."""
+        names = recording_file_names(recording)
+        poster = None
+        if recording.thumbnail_filename:
+            poster = self.storage.path_for(recording.filename).with_name(recording.thumbnail_filename)
+
+        archive = self.storage.cold_tier is not None
+        if archive:
+            needs_copy = recording.archived_at is None
+            for name in names:
+                if needs_copy and self.storage.path_for(name).exists():
+                    self.storage.cold_tier.put(name, self.storage.path_for(name))
+            if needs_copy:
+                crud.mark_recording_archived(db, str(recording.id))
+        else:
+            crud.delete_recording(db, str(recording.id))
+
+        freed = sum(self.storage.remove(name) for name in names)
+        if poster is not None:
+            poster.unlink(missing_ok=True)
+        logger.info(f"Evicted {recording.filename} ({'archived' if archive else 'deleted'})")
+        return freed
+
+    def start(self, interval: float = STORAGE_SWEEP_SECONDS) -> None:
+        """Runs sweep every ``interval`` seconds on a background thread."""
+        if interval <= 0 or self._thread is not None:
+            return
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"Storage sweep failed: {e}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="storage-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+def recording_file_names(recording: Recording) -> List[str]:
+    """Names of a recording's video files: its own and its segments'."""
+    return [recording.filename] + [segment.filename for segment in recording.segments]
+
+def delete_recording_files(
+    storage: ContentAddressedStorage,
+    names: List[str],
+    thumbnail_filename: Optional[str] = None
+) -> None:
+    """Removes a recording's files, locally and from the cold tier."""
+    if thumbnail_filename:
+        storage.path_for(names[0]).with_name(thumbnail_filename).unlink(missing_ok=True)
+    for name in names:
+        storage.remove(name)
+        if storage.cold_tier is not None:
+            storage.cold_tier.delete(name)
@@ -0,0 +1,122 @@
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from src.utils.concurrency import run_blocking
+from src.utils.file_utils import atomic_write
+from src.utils.logger import logger
+
+# Bytes of an upload body buffered before each disk write
+UPLOAD_WRITE_SIZE = 1024 * 1024
+
+# Seconds ScreenRecorder waits for an upload once the driver call returned
+UPLOAD_TIMEOUT = float(os.getenv("RECORDING_UPLOAD_TIMEOUT", "60"))
+
+class UploadError(Exception):
+    """Raised when an expected recording upload never completed."""
+
+@dataclass
+class PendingUpload:
+    """A recording upload announced to the driver but not yet received."""
+    output_path: Path
+    done: threading.Event = field(default_factory=threading.Event)
+    size_bytes: Optional[int] = None
+    error: Optional[str] = None
+
+class UploadRegistry:
+    """
+    Tracks recording uploads that the Appium server PUTs back to the API.
+
+    ``ScreenRecorder.stop_recording`` registers the target path and hands the
+    driver ``/uploads/<token>`` as ``remotePath``. The upload route streams
+    the request body to that path in chunks, and the recorder waits for it
+    to land. Tokens are single-use and unguessable, so only the driver call
+    that received one can write a recording. They are held in this process,
+    so the upload must reach the worker that stopped the recording: uploads
+    need a single worker, and coordination_store_from_env refuses to set
+    up several.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, PendingUpload] = {}
+        self._lock = threading.Lock()
+
+    def expect(self, output_path: Path) -> str:
+        """Registers an upload for ``output_path`` and returns its token."""
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._pending[token] = PendingUpload(output_path)
+        return token
+
+    def is_expected(self, token: str) -> bool:
+        with self._lock:
+            return token in self._pending
+
+    async def receive(self, token: str, chunks: AsyncIterator[bytes]) -> Optional[int]:
+        """
+        Streams an upload body to its registered path.
+
+        At most UPLOAD_WRITE_SIZE bytes are buffered; disk writes run on the
+        worker pool so the event loop keeps serving other requests.
+
+        Returns:
+            Number of bytes written, or None if the token is unknown
+        """
+        with self._lock:
+            upload = self._pending.get(token)
+        if upload is None or upload.done.is_set():
+            return None
+
+        written = 0
+        try:
+            with atomic_write(upload.output_path) as f:
+                buffer = bytearray()
+                async for chunk in chunks:
+                    buffer += chunk
+                    if len(buffer) >= UPLOAD_WRITE_SIZE:
+                        written += await run_blocking(f.write, bytes(buffer))
+                        buffer.clear()
+                if buffer:
+                    written += await run_blocking(f.write, bytes(buffer))
+        except Exception as e:
+            upload.error = str(e)
+            upload.done.set()
+            raise
+
+        upload.size_bytes = written
+        upload.done.set()
+        logger.info(f"Received upload of {written} bytes to {upload.output_path}")
+        return written
+
+    def wait(self, token: str, timeout: float = UPLOAD_TIMEOUT) -> int:
+        """
+        Waits for an upload to finish and forgets the token.
+
+        Returns:
+            Number of bytes written
+
+        Raises:
+            UploadError: If the upload failed or did not arrive in time
+        """
+        with self._lock:
+            upload = self._pending.get(token)
+        if upload is None:
+            raise UploadError(f"Unknown upload token: {token}")
+        try:
+            if not upload.done.wait(timeout):
+                raise UploadError(f"Upload to {upload.output_path} did not arrive within {timeout}s")
+            if upload.error is not None:
+                raise UploadError(f"Upload to {upload.output_path} failed: {upload.error}")
+            return upload.size_bytes
+        finally:
+            self.discard(token)
+
+    def discard(self, token: str) -> None:
+        """Forgets a token, e.g. when the driver returned base64 instead."""
+        with self._lock:
+            self._pending.pop(token, None)
+
+upload_registry = UploadRegistry()
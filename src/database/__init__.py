@@ -1,13 +1,18 @@
 """Database package initialization"""
-from src.database.models import Recording, RecordingStatus, Base
-from src.database.connection import get_db, get_db_context, init_db, check_db_connection
+from src.database.models import DeviceLease, Recording, RecordingSegment, RecordingStats, RecordingStatus, TaskLease, Base
+from src.database.connection import get_db, get_db_context, init_db, check_db_connection, count_statements
 
 __all__ = [
+    "DeviceLease",
     "Recording",
+    "RecordingSegment",
+    "RecordingStats",
     "RecordingStatus",
+    "TaskLease",
     "Base",
     "get_db",
     "get_db_context",
     "init_db",
-    "check_db_connection"
+    "check_db_connection",
+    "count_statements"
 ]
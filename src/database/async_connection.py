@@ -0,0 +1,109 @@
+import os
+from typing import AsyncGenerator, Awaitable, Callable, Optional, TypeVar, Union
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from src.database import connection
+from src.utils.logger import logger
+
+T = TypeVar("T")
+
+# Serve the read routes through AsyncSession (aiosqlite/asyncpg) instead of
+# the synchronous Session on worker threads. Chosen once, at startup.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+# Async driver used for each synchronous backend
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+def async_database_url(url: str) -> str:
+    """The URL of ``url``'s database with its async driver (``sqlite+aiosqlite``, ``postgresql+asyncpg``)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Returns the async engine for DATABASE_URL, creating it on first use.
+
+    It takes the pool settings and SQLite pragmas of the synchronous engine,
+    so both modes are configured by the same variables. Created lazily so the
+    async drivers are only needed when DB_ASYNC is enabled.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        options = connection.engine_options(connection.DATABASE_URL)
+        if options["poolclass"] is QueuePool:
+            options["poolclass"] = AsyncAdaptedQueuePool
+        options.get("connect_args", {}).pop("check_same_thread", None)
+        _async_engine = create_async_engine(async_database_url(connection.DATABASE_URL), **options)
+        if _async_engine.dialect.name == "sqlite":
+            event.listen(_async_engine.sync_engine, "connect", connection._enable_sqlite_foreign_keys)
+            if connection.SQLITE_PRAGMAS:
+                event.listen(_async_engine.sync_engine, "connect", connection._apply_sqlite_pragmas)
+        event.listen(_async_engine.sync_engine, "before_cursor_execute", connection._count_statement)
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+        logger.info(f"Async database engine created ({_async_engine.dialect.driver})")
+    return _async_engine
+
+def AsyncSessionLocal() -> AsyncSession:
+    """A new AsyncSession on the async engine."""
+    get_async_engine()
+    return _async_session_factory()
+
+async def get_session() -> AsyncGenerator[Union[Session, AsyncSession], None]:
+    """
+    Dependency yielding the session of the configured mode: an AsyncSession
+    with DB_ASYNC, otherwise a synchronous Session. Pair with run_query.
+    """
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = connection.SessionLocal()
+        try:
+            yield db
+        finally:
+            # run_query already returned the connection; this only drops state
+            db.close()
+
+async def run_query(
+    db: Union[Session, AsyncSession],
+    sync_func: Callable[..., T],
+    async_func: Callable[..., Awaitable[T]],
+    *args,
+    **kwargs
+) -> T:
+    """
+    Runs a crud function with the session from get_session.
+
+    The async variant is awaited on the event loop; the synchronous one runs
+    on the threadpool so it does not block the loop.
+    """
+    if isinstance(db, AsyncSession):
+        return await async_func(db, *args, **kwargs)
+
+    def call() -> T:
+        # Return the connection from the same worker thread. A close queued
+        # as separate threadpool work deadlocks once every thread is waiting
+        # for a pooled connection that only such a close would free.
+        try:
+            return sync_func(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    return await run_in_threadpool(call)
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
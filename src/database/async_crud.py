@@ -0,0 +1,117 @@
+"""
+Async variants of the crud functions the read routes use (listings,
+/health and /stats), for AsyncSession (see async_connection). They share
+the sync module's filters and read cache, so both modes return the same
+rows and the synchronous writes of start/stop invalidate cached reads of
+both.
+"""
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import desc, select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database import stats
+from src.database.crud import (
+    TOTAL_COUNT,
+    TOTAL_SIZE,
+    filter_recordings,
+    recording_cache,
+)
+from src.database.models import Recording, RecordingStatus
+
+async def get_recordings(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[RecordingStatus] = None
+) -> List[Recording]:
+    """
+    Get list of recordings with optional filtering and offset pagination.
+
+    Args:
+        db: Async database session
+        skip: Number of records to skip (for pagination)
+        limit: Maximum number of records to return
+        status: Optional status filter
+
+    Returns:
+        List of Recording objects
+    """
+    stmt = filter_recordings(select(Recording), status=status) \
+        .order_by(desc(Recording.created_at)).offset(skip).limit(limit)
+    return list((await db.scalars(stmt)).all())
+
+async def get_recordings_page(
+    db: AsyncSession,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    status: Optional[RecordingStatus] = None,
+    **filters
+) -> List[Row]:
+    """
+    Get a page of recordings using keyset (cursor) pagination.
+
+    See crud.get_recordings_page; the first unfiltered page is served from
+    the same cache.
+
+    Returns:
+        List of rows with id, filename, size_bytes and created_at
+    """
+    if after is None and status is None and not any(v is not None for v in filters.values()):
+        return await recording_cache.get_or_load_async(
+            ("first_page", limit),
+            lambda: _query_recordings_page(db, limit, after, status)
+        )
+    return await _query_recordings_page(db, limit, after, status, **filters)
+
+async def _query_recordings_page(
+    db: AsyncSession,
+    limit: int,
+    after: Optional[Tuple[datetime, uuid.UUID]],
+    status: Optional[RecordingStatus],
+    **filters
+) -> List[Row]:
+    stmt = select(
+        Recording.id,
+        Recording.filename,
+        Recording.size_bytes,
+        Recording.created_at
+    )
+    stmt = filter_recordings(stmt, status=status, **filters)
+    if after is not None:
+        stmt = stmt.where(tuple_(Recording.created_at, Recording.id) < tuple_(*after))
+    stmt = stmt.order_by(desc(Recording.created_at), desc(Recording.id)).limit(limit)
+    return list((await db.execute(stmt)).all())
+
+async def get_total_recordings_count(db: AsyncSession) -> int:
+    """
+    Get total count of recordings from the maintained aggregate, through the cache.
+
+    Args:
+        db: Async database session
+
+    Returns:
+        Total number of recordings
+    """
+    async def load() -> int:
+        return await db.scalar(TOTAL_COUNT)
+    return await recording_cache.get_or_load_async("total_count", load)
+
+async def get_total_size(db: AsyncSession) -> int:
+    """
+    Get total size of all recordings in bytes from the maintained aggregate, through the cache.
+
+    Args:
+        db: Async database session
+
+    Returns:
+        Total size in bytes
+    """
+    async def load() -> int:
+        return await db.scalar(TOTAL_SIZE)
+    return await recording_cache.get_or_load_async("total_size", load)
+
+async def get_recording_stats(db: AsyncSession) -> dict:
+    """See stats.get_recording_stats."""
+    return await db.run_sync(stats.get_recording_stats)
@@ -1,10 +1,14 @@
 import os
-from sqlalchemy import create_engine, text
+import time
+from contextvars import ContextVar
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import QueuePool, StaticPool
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, Optional
 from src.utils.logger import logger
+from src.utils.metrics import DB_COMMIT_SECONDS
 
 # Database configuration
 # Priority:
@@ -32,19 +36,154 @@ def get_database_url():
 
 DATABASE_URL = get_database_url()
 
+# Connection pool sizing, shared by every backend that pools
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Server-side connections are replaced after this many seconds, before
+# server or proxy idle timeouts can cut them (Postgres)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Probe every connection with a round-trip on checkout. Off by default:
+# recycling avoids most stale connections and SQLAlchemy discards a
+# connection that fails with a disconnect error.
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+
+# SQLite: apply the WAL/synchronous/mmap/busy timeout pragmas on connect
+SQLITE_PRAGMAS = os.getenv("SQLITE_PRAGMAS", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+def engine_options(url: str) -> dict:
+    """
+    create_engine arguments for a database URL.
+    
+    SQLite connections are shared across the worker threads that run
+    blocking routes, so they are opened with ``check_same_thread=False``;
+    an in-memory database needs a single shared connection (StaticPool).
+    Server databases use a LIFO QueuePool, so surplus connections go idle
+    and are recycled rather than kept warm.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if parsed.database in (None, "", ":memory:"):
+            return {"poolclass": StaticPool, "connect_args": connect_args}
+        return {
+            "poolclass": QueuePool,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_pre_ping": DB_POOL_PRE_PING,
+            "connect_args": connect_args,
+        }
+    return {
+        "poolclass": QueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_use_lifo": True,
+    }
+
 # Create engine with connection pooling
 engine = create_engine(
     DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,  # Verify connections before using
-    echo=False  # Set to True for SQL query logging
+    echo=False,  # Set to True for SQL query logging
+    **engine_options(DATABASE_URL)
 )
 
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tunes each new SQLite connection.
+    
+    WAL lets readers proceed while one writer commits; synchronous=NORMAL
+    syncs at checkpoints instead of every commit, which WAL keeps safe
+    against corruption (a power loss can drop the last commits); mmap
+    serves reads from the page cache without copies; busy_timeout makes a
+    blocked writer wait instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cursor.close()
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """
+    Makes SQLite enforce foreign keys, which it leaves off by default.
+
+    Not a tuning knob like the pragmas above: deleting a recording relies on
+    ON DELETE CASCADE to remove its segments (``passive_deletes``).
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    if SQLITE_PRAGMAS:
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+
+class StatementCounter:
+    """Number of SQL statements executed while the counter is active."""
+
+    def __init__(self):
+        self.count = 0
+
+_statement_counter: ContextVar[Optional[StatementCounter]] = ContextVar("sql_statement_counter", default=None)
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statement_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+@contextmanager
+def count_statements() -> Generator[StatementCounter, None, None]:
+    """
+    Counts SQL statements issued in the current context.
+    
+    The counter is a shared object, so work handed to threads with a copy of
+    the context (FastAPI dependencies, run_blocking) is counted too.
+    
+    Usage:
+        with count_statements() as counter:
+            crud.update_recording(db, recording_id, status=RecordingStatus.COMPLETED)
+        assert counter.count == 1
+    """
+    counter = StatementCounter()
+    token = _statement_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _statement_counter.reset(token)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@event.listens_for(SessionLocal, "before_commit")
+def _start_commit_timer(session):
+    session.info["commit_started"] = time.perf_counter()
+
+@event.listens_for(SessionLocal, "after_commit")
+def _observe_commit(session):
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        DB_COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+def pool_connections_in_use() -> int:
+    """Connections currently checked out of the engine's pool."""
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if checkedout else 0
+
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency function to get database session.
@@ -79,13 +218,41 @@ def get_db_context():
 def init_db():
     """Initialize database tables"""
     from src.database.models import Base
+    from src.database.stats import install_stats_triggers, reconcile_stats
     try:
+        stats_existed = inspect(engine).has_table("recording_stats")
         Base.metadata.create_all(bind=engine)
+        # create_all skips existing tables, so add columns and indexes
+        # introduced later
+        _add_missing_columns()
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        with engine.begin() as conn:
+            install_stats_triggers(conn)
+        if not stats_existed:
+            # Totals of the recordings stored before the table existed
+            with SessionLocal() as db:
+                reconcile_stats(db)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
         raise
 
+def _add_missing_columns():
+    """Adds nullable model columns that an existing table does not have yet."""
+    from src.database.models import Base
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                logger.info(f"Added column {table.name}.{column.name}")
+
 def check_db_connection() -> bool:
     """Check if database connection is working"""
     try:
@@ -1,10 +1,33 @@
+import os
 import uuid
-from typing import List, Optional
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from src.database.models import Recording, RecordingStatus
+from sqlalchemy import delete, desc, func, select, tuple_, update
+from src.database.models import Recording, RecordingSegment, RecordingStats, RecordingStatus
+from src.utils.cache import TTLCache
 from src.utils.logger import logger
+from src.utils.profiling import traced
 
+# Read-through cache for the lookups the dashboard polls: by-filename
+# metadata, totals and the first list page. Every write in this module clears
+# it, so staleness is bounded by the TTL only for writes made by other
+# processes. CRUD_CACHE_TTL=0 disables it.
+recording_cache = TTLCache(
+    maxsize=int(os.getenv("CRUD_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CRUD_CACHE_TTL", "5"))
+)
+
+def invalidate_cache() -> None:
+    """Drops all cached lookups; called after every write."""
+    recording_cache.clear()
+
+def get_cache_stats() -> dict:
+    """Returns hit/miss counters of the recording cache."""
+    return recording_cache.stats()
+
+@traced()
 def create_recording(
     db: Session,
     filename: str,
@@ -28,10 +51,12 @@ def create_recording(
     )
     db.add(recording)
     db.commit()
+    invalidate_cache()
     db.refresh(recording)
     logger.info(f"Created recording: {filename}")
     return recording
 
+@traced()
 def get_recordings(
     db: Session,
     skip: int = 0,
@@ -58,26 +83,136 @@ def get_recordings(
     recordings = query.order_by(desc(Recording.created_at)).offset(skip).limit(limit).all()
     return recordings
 
-def get_recording_by_id(db: Session, recording_id: str) -> Optional[Recording]:
+@traced()
+def get_recordings_page(
+    db: Session,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    status: Optional[RecordingStatus] = None,
+    **filters
+) -> List[Row]:
     """
-    Get a recording by its ID.
+    Get a page of recordings using keyset (cursor) pagination.
+    
+    Pages are ordered newest first by (created_at, id) and each page starts
+    strictly after the given cursor, so deep pages cost the same as the first
+    one. Only the listed columns are loaded, bypassing the ORM identity map.
     
     Args:
         db: Database session
-        recording_id: UUID of the recording
+        limit: Maximum number of records to return
+        after: (created_at, id) of the last row of the previous page
+        status: Optional status filter
+        **filters: Optional device_name, created_after, created_before and
+            filenames filters (see filter_recordings)
         
     Returns:
-        Recording object or None if not found
+        List of rows with id, filename, size_bytes and created_at
+    """
+    if after is None and status is None and not any(v is not None for v in filters.values()):
+        # The first page is what every dashboard polls
+        return recording_cache.get_or_load(
+            ("first_page", limit),
+            lambda: _query_recordings_page(db, limit, after, status)
+        )
+    return _query_recordings_page(db, limit, after, status, **filters)
+
+def filter_recordings(
+    query,
+    status: Optional[RecordingStatus] = None,
+    device_name: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    filenames: Optional[List[str]] = None
+):
+    """
+    Narrows a Recording query by the filters shared by listings and bulk operations.
+    
+    Args:
+        query: Query over Recording columns
+        status: Optional status filter
+        device_name: Optional device (UDID) filter
+        created_after: Only recordings created at or after this
+        created_before: Only recordings created before this
+        filenames: Only recordings with one of these filenames
+        
+    Returns:
+        The filtered query
     """
+    if status:
+        query = query.filter(Recording.status == status)
+    if device_name is not None:
+        query = query.filter(Recording.device_name == device_name)
+    if created_after is not None:
+        query = query.filter(Recording.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(Recording.created_at < created_before)
+    if filenames is not None:
+        query = query.filter(Recording.filename.in_(filenames))
+    return query
+
+def _query_recordings_page(
+    db: Session,
+    limit: int,
+    after: Optional[Tuple[datetime, uuid.UUID]],
+    status: Optional[RecordingStatus],
+    **filters
+) -> List[Row]:
+    query = db.query(
+        Recording.id,
+        Recording.filename,
+        Recording.size_bytes,
+        Recording.created_at
+    )
+    
+    query = filter_recordings(query, status=status, **filters)
+    if after is not None:
+        query = query.filter(tuple_(Recording.created_at, Recording.id) < tuple_(*after))
+    
+    return query.order_by(desc(Recording.created_at), desc(Recording.id)).limit(limit).all()
+
+def encode_cursor(row: Row) -> str:
+    """Encodes the pagination cursor pointing just after ``row``."""
+    return f"{row.created_at.isoformat()},{row.id}"
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decodes a ``<created_at>,<id>`` pagination cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    created_at, _, recording_id = cursor.partition(",")
+    return datetime.fromisoformat(created_at), uuid.UUID(recording_id)
+
+def _to_uuid(recording_id) -> Optional[uuid.UUID]:
     try:
         if isinstance(recording_id, str):
-            recording_id = uuid.UUID(recording_id)
+            return uuid.UUID(recording_id)
     except ValueError:
         logger.warning(f"Invalid UUID format: {recording_id}")
         return None
+    return recording_id
+
+@traced()
+def get_recording_by_id(db: Session, recording_id: str) -> Optional[Recording]:
+    """
+    Get a recording by its ID.
+    
+    Args:
+        db: Database session
+        recording_id: UUID of the recording
+        
+    Returns:
+        Recording object or None if not found
+    """
+    recording_uuid = _to_uuid(recording_id)
+    if recording_uuid is None:
+        return None
         
-    return db.query(Recording).filter(Recording.id == recording_id).first()
+    return db.query(Recording).filter(Recording.id == recording_uuid).first()
 
+@traced()
 def get_recording_by_filename(db: Session, filename: str) -> Optional[Recording]:
     """
     Get a recording by its filename.
@@ -91,13 +226,83 @@ def get_recording_by_filename(db: Session, filename: str) -> Optional[Recording]
     """
     return db.query(Recording).filter(Recording.filename == filename).first()
 
+@traced()
+def get_recording_summary_by_filename(db: Session, filename: str) -> Optional[Row]:
+    """
+    Get read-only metadata of a recording by its filename, through the cache.
+    
+    Args:
+        db: Database session
+        filename: Name of the recording file
+        
+    Returns:
+        Row with id, filename, size_bytes, created_at and status, or None
+    """
+    return recording_cache.get_or_load(
+        ("by_filename", filename),
+        lambda: db.query(
+            Recording.id,
+            Recording.filename,
+            Recording.size_bytes,
+            Recording.created_at,
+            Recording.status
+        ).filter(Recording.filename == filename).first()
+    )
+
+# Columns returned by single-statement updates, so callers never need to
+# reload the row afterwards
+_RETURNED_COLUMNS = (
+    Recording.id,
+    Recording.filename,
+    Recording.size_bytes,
+    Recording.created_at,
+    Recording.device_name,
+    Recording.duration_seconds,
+    Recording.status,
+)
+
+def _changed_values(
+    size_bytes: Optional[int],
+    duration_seconds: Optional[int],
+    status: Optional[RecordingStatus]
+) -> dict:
+    values = {}
+    if size_bytes is not None:
+        values["size_bytes"] = size_bytes
+    if duration_seconds is not None:
+        values["duration_seconds"] = duration_seconds
+    if status is not None:
+        values["status"] = status
+    return values
+
+def _update_returning(db: Session, criterion, values: dict) -> Optional[Row]:
+    """
+    Applies ``values`` to the row matching ``criterion`` and returns it.
+    
+    Uses a single UPDATE ... RETURNING where the dialect supports it (Postgres,
+    SQLite >= 3.35) and falls back to UPDATE followed by SELECT otherwise.
+    """
+    stmt = update(Recording).where(criterion).values(**values) \
+        .execution_options(synchronize_session=False)
+    
+    if db.get_bind().dialect.update_returning:
+        row = db.execute(stmt.returning(*_RETURNED_COLUMNS)).first()
+    else:
+        db.execute(stmt)
+        row = db.query(*_RETURNED_COLUMNS).filter(criterion).first()
+    
+    db.commit()
+    invalidate_cache()
+    return row
+
+@traced()
 def update_recording(
     db: Session,
     recording_id: str,
     size_bytes: Optional[int] = None,
     duration_seconds: Optional[int] = None,
     status: Optional[RecordingStatus] = None
-) -> Optional[Recording]:
+) -> Optional[Row]:
     """
     Update a recording's metadata.
     
@@ -109,31 +314,29 @@ def update_recording(
         status: Optional status update
         
     Returns:
-        Updated Recording object or None if not found
+        Updated recording row or None if not found
     """
-    recording = get_recording_by_id(db, recording_id)
-    if not recording:
+    recording_uuid = _to_uuid(recording_id)
+    if recording_uuid is None:
         return None
     
-    if size_bytes is not None:
-        recording.size_bytes = size_bytes
-    if duration_seconds is not None:
-        recording.duration_seconds = duration_seconds
-    if status is not None:
-        recording.status = status
+    values = _changed_values(size_bytes, duration_seconds, status)
+    if not values:
+        return db.query(*_RETURNED_COLUMNS).filter(Recording.id == recording_uuid).first()
     
-    db.commit()
-    db.refresh(recording)
-    logger.info(f"Updated recording: {recording.filename}")
-    return recording
+    row = _update_returning(db, Recording.id == recording_uuid, values)
+    if row is not None:
+        logger.info(f"Updated recording: {row.filename}")
+    return row
 
+@traced()
 def update_recording_by_filename(
     db: Session,
     filename: str,
     size_bytes: Optional[int] = None,
     duration_seconds: Optional[int] = None,
     status: Optional[RecordingStatus] = None
-) -> Optional[Recording]:
+) -> Optional[Row]:
     """
     Update a recording's metadata by filename.
     
@@ -145,24 +348,92 @@ def update_recording_by_filename(
         status: Optional status update
         
     Returns:
-        Updated Recording object or None if not found
+        Updated recording row or None if not found
     """
-    recording = get_recording_by_filename(db, filename)
-    if not recording:
+    values = _changed_values(size_bytes, duration_seconds, status)
+    if not values:
+        return db.query(*_RETURNED_COLUMNS).filter(Recording.filename == filename).first()
+    
+    row = _update_returning(db, Recording.filename == filename, values)
+    if row is not None:
+        logger.info(f"Updated recording: {row.filename}")
+    return row
+
+@traced()
+def update_recording_processing(
+    db: Session,
+    recording_id: str,
+    processing_status: str,
+    faststart: Optional[bool] = None,
+    thumbnail_filename: Optional[str] = None,
+    processing_timings: Optional[dict] = None
+) -> Optional[Row]:
+    """
+    Store the results of the post-stop processing pipeline.
+    
+    Args:
+        db: Database session
+        recording_id: UUID of the recording
+        processing_status: "completed" or "failed"
+        faststart: Whether the file now has its moov atom in front
+        thumbnail_filename: Name of the poster image, if one was extracted
+        processing_timings: Seconds spent per pipeline stage
+        
+    Returns:
+        Updated recording row or None if not found
+    """
+    recording_uuid = _to_uuid(recording_id)
+    if recording_uuid is None:
         return None
     
-    if size_bytes is not None:
-        recording.size_bytes = size_bytes
-    if duration_seconds is not None:
-        recording.duration_seconds = duration_seconds
-    if status is not None:
-        recording.status = status
+    values = {"processing_status": processing_status}
+    if faststart is not None:
+        values["faststart"] = faststart
+    if thumbnail_filename is not None:
+        values["thumbnail_filename"] = thumbnail_filename
+    if processing_timings is not None:
+        values["processing_timings"] = processing_timings
+    
+    row = _update_returning(db, Recording.id == recording_uuid, values)
+    if row is not None:
+        logger.info(f"Stored processing results for recording: {row.filename}")
+    return row
+
+@traced()
+def update_recordings_status(
+    db: Session,
+    recording_ids: Iterable[str],
+    status: RecordingStatus,
+    batch_size: int = 500
+) -> int:
+    """
+    Set the status of many recordings with one UPDATE per batch of IDs.
     
+    Args:
+        db: Database session
+        recording_ids: UUIDs of the recordings
+        status: New status
+        batch_size: IDs per statement, kept below driver parameter limits
+        
+    Returns:
+        Number of rows updated
+    """
+    ids = [rid for rid in (_to_uuid(r) for r in recording_ids) if rid is not None]
+    updated = 0
+    for offset in range(0, len(ids), batch_size):
+        result = db.execute(
+            update(Recording)
+            .where(Recording.id.in_(ids[offset:offset + batch_size]))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
     db.commit()
-    db.refresh(recording)
-    logger.info(f"Updated recording: {recording.filename}")
-    return recording
+    invalidate_cache()
+    logger.info(f"Set status {status.value} on {updated} recordings")
+    return updated
 
+@traced()
 def delete_recording(db: Session, recording_id: str) -> bool:
     """
     Delete a recording from the database.
@@ -180,12 +451,278 @@ def delete_recording(db: Session, recording_id: str) -> bool:
     
     db.delete(recording)
     db.commit()
+    invalidate_cache()
     logger.info(f"Deleted recording: {recording.filename}")
     return True
 
+@traced()
+def delete_recordings(
+    db: Session,
+    batch_size: int = 500,
+    on_deleted: Optional[Callable[[List[Tuple[List[str], Optional[str]]]], None]] = None,
+    **filters
+) -> int:
+    """
+    Delete every finished recording matching the filters, one batch per transaction.
+    
+    Each batch is selected, its segments and rows removed with one DELETE
+    per table, and committed before ``on_deleted`` gets the files it owned,
+    so callers remove files only for rows that are gone. Recordings still
+    in progress are never deleted.
+    
+    Args:
+        db: Database session
+        batch_size: Recordings per transaction, kept below driver parameter limits
+        on_deleted: Called after each commit with (file names, thumbnail
+            filename) per deleted recording; the recording's own file first
+        **filters: status, device_name, created_after, created_before or
+            filenames (see filter_recordings)
+        
+    Returns:
+        Number of recordings deleted
+    """
+    deleted = 0
+    while True:
+        query = db.query(Recording.id, Recording.filename, Recording.thumbnail_filename) \
+            .filter(Recording.status != RecordingStatus.IN_PROGRESS)
+        rows = filter_recordings(query, **filters) \
+            .order_by(Recording.created_at) \
+            .limit(batch_size) \
+            .all()
+        if not rows:
+            break
+        
+        ids = [row.id for row in rows]
+        segment_names = get_segment_filenames(db, ids)
+        db.execute(
+            delete(RecordingSegment)
+            .where(RecordingSegment.recording_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            delete(Recording)
+            .where(Recording.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        invalidate_cache()
+        deleted += len(rows)
+        
+        if on_deleted is not None:
+            on_deleted([
+                ([row.filename] + segment_names.get(row.id, []), row.thumbnail_filename)
+                for row in rows
+            ])
+        if len(rows) < batch_size:
+            break
+    
+    logger.info(f"Deleted {deleted} recordings matching {filters}")
+    return deleted
+
+@traced()
+def add_recording_segment(
+    db: Session,
+    recording_id: str,
+    segment_index: int,
+    filename: str,
+    size_bytes: int
+) -> RecordingSegment:
+    """
+    Add a segment to a segmented recording.
+    
+    The recording's size_bytes grows by the segment size in the same
+    transaction, so listings show the running total while it records.
+    
+    Args:
+        db: Database session
+        recording_id: UUID of the logical recording
+        segment_index: Position of the segment, starting at 0
+        filename: Name of the segment file
+        size_bytes: Segment file size in bytes
+        
+    Returns:
+        Created RecordingSegment object
+    """
+    recording_uuid = _to_uuid(recording_id)
+    segment = RecordingSegment(
+        recording_id=recording_uuid,
+        segment_index=segment_index,
+        filename=filename,
+        size_bytes=size_bytes
+    )
+    db.add(segment)
+    db.execute(
+        update(Recording)
+        .where(Recording.id == recording_uuid)
+        .values(size_bytes=Recording.size_bytes + size_bytes)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    invalidate_cache()
+    db.refresh(segment)
+    logger.info(f"Added segment {segment_index} to recording {recording_id}: {filename}")
+    return segment
+
+@traced()
+def get_recording_segments(db: Session, recording_id: str) -> List[RecordingSegment]:
+    """
+    Get the segments of a recording in order.
+    
+    Args:
+        db: Database session
+        recording_id: UUID of the logical recording
+        
+    Returns:
+        List of RecordingSegment objects, empty for single-file recordings
+    """
+    return db.query(RecordingSegment) \
+        .filter(RecordingSegment.recording_id == _to_uuid(recording_id)) \
+        .order_by(RecordingSegment.segment_index) \
+        .all()
+
+@traced()
+def get_segment_filenames(db: Session, recording_ids: Iterable) -> Dict[uuid.UUID, List[str]]:
+    """
+    Get the segment filenames of several recordings with one query.
+    
+    Args:
+        db: Database session
+        recording_ids: UUIDs of the recordings
+        
+    Returns:
+        Segment filenames in order, keyed by recording id; recordings without
+        segments are absent
+    """
+    ids = [rid for rid in (_to_uuid(r) for r in recording_ids) if rid is not None]
+    if not ids:
+        return {}
+    filenames: Dict[uuid.UUID, List[str]] = {}
+    for recording_id, filename in db.query(RecordingSegment.recording_id, RecordingSegment.filename) \
+            .filter(RecordingSegment.recording_id.in_(ids)) \
+            .order_by(RecordingSegment.segment_index):
+        filenames.setdefault(recording_id, []).append(filename)
+    return filenames
+
+@traced()
+def get_segment_by_filename(db: Session, filename: str) -> Optional[RecordingSegment]:
+    """
+    Get a recording segment by its filename.
+    
+    Args:
+        db: Database session
+        filename: Name of the segment file
+        
+    Returns:
+        RecordingSegment object or None if not found
+    """
+    return db.query(RecordingSegment).filter(RecordingSegment.filename == filename).first()
+
+@traced()
+def get_recording_owning_file(db: Session, filename: str) -> Optional[Recording]:
+    """
+    Get the recording a stored file belongs to: its own file or a segment.
+    
+    Args:
+        db: Database session
+        filename: Name of a recording or segment file
+        
+    Returns:
+        Recording object or None if no recording owns the file
+    """
+    recording = get_recording_by_filename(db, filename)
+    if recording is not None:
+        return recording
+    segment = get_segment_by_filename(db, filename)
+    return get_recording_by_id(db, segment.recording_id) if segment else None
+
+@traced()
+def get_recordings_created_before(
+    db: Session,
+    cutoff: datetime,
+    limit: int = 500
+) -> List[Recording]:
+    """
+    Get finished recordings older than ``cutoff`` that are not archived yet.
+    
+    Args:
+        db: Database session
+        cutoff: Only recordings created before this are returned
+        limit: Maximum number of records to return, oldest first
+        
+    Returns:
+        List of Recording objects
+    """
+    return db.query(Recording) \
+        .filter(Recording.status != RecordingStatus.IN_PROGRESS) \
+        .filter(Recording.created_at < cutoff) \
+        .filter(Recording.archived_at.is_(None)) \
+        .order_by(Recording.created_at) \
+        .limit(limit) \
+        .all()
+
+@traced()
+def get_stale_recordings(
+    db: Session,
+    cutoff: datetime,
+    after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    limit: int = 1000
+) -> List[Row]:
+    """
+    Get recordings still IN_PROGRESS that were created before ``cutoff``.
+    
+    Served by the (status, created_at) index, oldest first, a page at a time.
+    
+    Args:
+        db: Database session
+        cutoff: Only recordings created before this are returned
+        after: (created_at, id) of the last row of the previous page
+        limit: Maximum number of records to return
+        
+    Returns:
+        List of rows with id, filename, device_name, size_bytes and created_at
+    """
+    query = db.query(
+        Recording.id,
+        Recording.filename,
+        Recording.device_name,
+        Recording.size_bytes,
+        Recording.created_at
+    ).filter(Recording.status == RecordingStatus.IN_PROGRESS, Recording.created_at < cutoff)
+    if after is not None:
+        query = query.filter(tuple_(Recording.created_at, Recording.id) > tuple_(*after))
+    return query.order_by(Recording.created_at, Recording.id).limit(limit).all()
+
+@traced()
+def mark_recording_archived(db: Session, recording_id: str) -> Optional[Row]:
+    """
+    Record that a recording's files were moved to the cold tier.
+    
+    The poster is not archived, so its filename is cleared.
+    
+    Args:
+        db: Database session
+        recording_id: UUID of the recording
+        
+    Returns:
+        Updated recording row or None if not found
+    """
+    recording_uuid = _to_uuid(recording_id)
+    if recording_uuid is None:
+        return None
+    return _update_returning(
+        db,
+        Recording.id == recording_uuid,
+        {"archived_at": datetime.utcnow(), "thumbnail_filename": None}
+    )
+
+# Totals summed over the recording_stats buckets instead of scanning recordings
+TOTAL_COUNT = select(func.coalesce(func.sum(RecordingStats.count), 0))
+TOTAL_SIZE = select(func.coalesce(func.sum(RecordingStats.size_bytes), 0))
+
+@traced()
 def get_total_recordings_count(db: Session) -> int:
     """
-    Get total count of recordings.
+    Get total count of recordings from the maintained aggregate.
     
     Args:
         db: Database session
@@ -193,11 +730,12 @@ def get_total_recordings_count(db: Session) -> int:
     Returns:
         Total number of recordings
     """
-    return db.query(Recording).count()
+    return recording_cache.get_or_load("total_count", lambda: db.scalar(TOTAL_COUNT))
 
+@traced()
 def get_total_size(db: Session) -> int:
     """
-    Get total size of all recordings in bytes.
+    Get total size of all recordings in bytes from the maintained aggregate.
     
     Args:
         db: Database session
@@ -205,6 +743,4 @@ def get_total_size(db: Session) -> int:
     Returns:
         Total size in bytes
     """
-    from sqlalchemy import func
-    result = db.query(func.sum(Recording.size_bytes)).scalar()
-    return result or 0
+    return recording_cache.get_or_load("total_size", lambda: db.scalar(TOTAL_SIZE))
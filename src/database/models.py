@@ -1,8 +1,9 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, BigInteger, DateTime, Integer, Enum as SQLEnum
+from sqlalchemy import Column, String, BigInteger, Boolean, DateTime, Float, ForeignKey, Integer, Index, JSON, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 import enum
 
 Base = declarative_base()
@@ -25,6 +26,30 @@ class Recording(Base):
     duration_seconds = Column(Integer, nullable=True)
     status = Column(SQLEnum(RecordingStatus), nullable=False, default=RecordingStatus.IN_PROGRESS)
 
+    # Post-stop processing results; NULL until the pipeline has run
+    processing_status = Column(String(20), nullable=True)
+    faststart = Column(Boolean, nullable=True)
+    thumbnail_filename = Column(String(255), nullable=True)
+    # Seconds spent in each pipeline stage, keyed by stage name
+    processing_timings = Column(JSON, nullable=True)
+    # Set once the files were copied to the cold tier; a local copy may remain
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Files of a segmented recording, in order; empty for single-file recordings
+    segments = relationship(
+        "RecordingSegment",
+        order_by="RecordingSegment.segment_index",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_recordings_created_at_id", "created_at", "id"),
+        # Status-filtered listings and stale IN_PROGRESS scans
+        Index("ix_recordings_status_created_at", "status", "created_at"),
+    )
+
     def to_dict(self):
         """Convert model to dictionary"""
         return {
@@ -35,5 +60,74 @@ class Recording(Base):
             "device_name": self.device_name,
             "duration_seconds": self.duration_seconds,
             "status": self.status.value,
+            "processing_status": self.processing_status,
+            "faststart": self.faststart,
+            "thumbnail_filename": self.thumbnail_filename,
+            "archived_at": self.archived_at.timestamp() if self.archived_at else None,
+            "download_url": f"/recordings/{self.filename}"
+        }
+
+class RecordingStats(Base):
+    """
+    Running totals of recordings per (device, status) bucket.
+
+    Maintained by database triggers on ``recordings`` (see stats), so every
+    write updates them in its own transaction. Recordings without a device
+    are counted under the empty device name.
+    """
+    __tablename__ = "recording_stats"
+
+    device_name = Column(String(100), primary_key=True)
+    status = Column(SQLEnum(RecordingStatus), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    size_bytes = Column(BigInteger, nullable=False, default=0)
+    duration_seconds = Column(BigInteger, nullable=False, default=0)
+
+class DeviceLease(Base):
+    """
+    Ownership of a device by the worker process recording on it.
+
+    Times are Unix timestamps. A lease whose ``expires_at`` has passed
+    belongs to a worker that stopped renewing it and may be taken over.
+    """
+    __tablename__ = "device_leases"
+
+    udid = Column(String(100), primary_key=True)
+    owner = Column(String(255), nullable=False, index=True)
+    filename = Column(String(255), nullable=False)
+    started_at = Column(Float, nullable=False)
+    expires_at = Column(Float, nullable=False)
+    # Set by another worker asking the owner to stop the recording
+    stop_requested = Column(Boolean, nullable=False, default=False)
+
+class TaskLease(Base):
+    """
+    The worker that runs a job which must only run once across workers,
+    such as the startup driver warm-up. Expires like a DeviceLease.
+    """
+    __tablename__ = "task_leases"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(255), nullable=False)
+    expires_at = Column(Float, nullable=False)
+
+class RecordingSegment(Base):
+    """One file of a segmented recording"""
+    __tablename__ = "recording_segments"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    recording_id = Column(UUID(as_uuid=True), ForeignKey("recordings.id", ondelete="CASCADE"), nullable=False, index=True)
+    segment_index = Column(Integer, nullable=False)
+    filename = Column(String(255), unique=True, nullable=False, index=True)
+    size_bytes = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            "index": self.segment_index,
+            "filename": self.filename,
+            "size_bytes": self.size_bytes,
+            "created_at": self.created_at.timestamp() if self.created_at else None,
             "download_url": f"/recordings/{self.filename}"
         }
@@ -0,0 +1,269 @@
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy import bindparam, false, func, literal, select, text, union_all, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from src.database.models import Recording, RecordingStats, RecordingStatus
+from src.utils.logger import logger
+
+# Seconds between background reconciliations (0 disables them)
+STATS_RECONCILE_SECONDS = float(os.getenv("STATS_RECONCILE_SECONDS", "3600"))
+
+# Columns whose changes move a recording between buckets or change their sums
+_TRACKED_COLUMNS = ("device_name", "status", "size_bytes", "duration_seconds")
+
+TRIGGER_NAMES = ("recording_stats_insert", "recording_stats_delete", "recording_stats_update")
+
+# Postgres advisory lock serializing trigger installation and reconciliation
+# across workers
+STATS_LOCK_KEY = 0x7265635f73746174
+
+Bucket = Tuple[str, RecordingStatus]
+Totals = Tuple[int, int, int]
+
+def _bucket_upsert(row: str, sign: str) -> str:
+    """SQL adding (sign) ``row``'s count, size and duration to its bucket."""
+    return f"""
+        INSERT INTO recording_stats (device_name, status, count, size_bytes, duration_seconds)
+        VALUES (
+            COALESCE({row}.device_name, ''), {row}.status, {sign}1,
+            {sign}{row}.size_bytes, {sign}COALESCE({row}.duration_seconds, 0)
+        )
+        ON CONFLICT (device_name, status) DO UPDATE SET
+            count = recording_stats.count + excluded.count,
+            size_bytes = recording_stats.size_bytes + excluded.size_bytes,
+            duration_seconds = recording_stats.duration_seconds + excluded.duration_seconds;
+    """
+
+_UPDATE_CHANGED = " OR ".join(f"OLD.{column} IS DISTINCT FROM NEW.{column}" for column in _TRACKED_COLUMNS)
+
+_SQLITE_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS recording_stats_insert AFTER INSERT ON recordings
+        BEGIN {_bucket_upsert("NEW", "+")} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS recording_stats_delete AFTER DELETE ON recordings
+        BEGIN {_bucket_upsert("OLD", "-")} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS recording_stats_update
+        AFTER UPDATE OF {", ".join(_TRACKED_COLUMNS)} ON recordings
+        WHEN {_UPDATE_CHANGED.replace("IS DISTINCT FROM", "IS NOT")}
+        BEGIN {_bucket_upsert("OLD", "-")} {_bucket_upsert("NEW", "+")} END""",
+)
+
+_POSTGRES_FUNCTION = f"""
+    CREATE OR REPLACE FUNCTION recording_stats_apply() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN {_bucket_upsert("OLD", "-")} END IF;
+        IF TG_OP <> 'DELETE' THEN {_bucket_upsert("NEW", "+")} END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+_POSTGRES_TRIGGERS = {
+    "recording_stats_insert": "AFTER INSERT ON recordings FOR EACH ROW",
+    "recording_stats_delete": "AFTER DELETE ON recordings FOR EACH ROW",
+    "recording_stats_update": f"AFTER UPDATE OF {', '.join(_TRACKED_COLUMNS)} ON recordings "
+                              f"FOR EACH ROW WHEN ({_UPDATE_CHANGED})",
+}
+
+def install_stats_triggers(conn: Connection) -> bool:
+    """
+    Creates the triggers that keep recording_stats in step with recordings.
+
+    Every INSERT, DELETE and bucket-changing UPDATE on recordings adjusts
+    the affected buckets in the same transaction, whichever code path issued
+    it (crud, async_crud, write-behind batches, bulk deletes). Existing
+    triggers are kept. On Postgres, workers starting together install them
+    one at a time under an advisory lock.
+
+    Returns:
+        False if the dialect has no trigger support here, in which case the
+        totals are only as fresh as the last reconciliation
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        for ddl in _SQLITE_TRIGGERS:
+            conn.execute(text(ddl))
+        return True
+    if dialect == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": STATS_LOCK_KEY})
+        existing = set(conn.execute(text(
+            "SELECT tgname FROM pg_trigger WHERE tgrelid = 'recordings'::regclass"
+        )).scalars())
+        conn.execute(text(_POSTGRES_FUNCTION))
+        for name, timing in _POSTGRES_TRIGGERS.items():
+            if name not in existing:
+                conn.execute(text(f"CREATE TRIGGER {name} {timing} EXECUTE PROCEDURE recording_stats_apply()"))
+        return True
+    logger.warning(f"No recording_stats triggers for {dialect}; totals are refreshed by reconciliation only")
+    return False
+
+def _totals(count, size_bytes, duration_seconds) -> dict:
+    return {"count": count, "size_bytes": size_bytes, "duration_seconds": duration_seconds}
+
+def get_recording_stats(db: Session) -> dict:
+    """
+    Get recording totals overall, per status and per device.
+
+    Reads the handful of bucket rows of recording_stats, so the cost does
+    not grow with the number of recordings.
+
+    Args:
+        db: Database session
+
+    Returns:
+        count, size_bytes and duration_seconds overall, plus the same totals
+        keyed by status (``by_status``) and by device name (``by_device``,
+        recordings without a device under "")
+    """
+    stats = _totals(0, 0, 0)
+    stats.update(by_status={}, by_device={})
+    for bucket in db.execute(select(RecordingStats)).scalars():
+        if bucket.count == 0:
+            continue
+        for group, key in (("by_status", bucket.status.value), ("by_device", bucket.device_name)):
+            totals = stats[group].setdefault(key, _totals(0, 0, 0))
+            totals["count"] += bucket.count
+            totals["size_bytes"] += bucket.size_bytes
+            totals["duration_seconds"] += bucket.duration_seconds
+        stats["count"] += bucket.count
+        stats["size_bytes"] += bucket.size_bytes
+        stats["duration_seconds"] += bucket.duration_seconds
+    return stats
+
+_APPLY_DRIFT = text("""
+    INSERT INTO recording_stats (device_name, status, count, size_bytes, duration_seconds)
+    VALUES (:device_name, :status, :count, :size_bytes, :duration_seconds)
+    ON CONFLICT (device_name, status) DO UPDATE SET
+        count = recording_stats.count + excluded.count,
+        size_bytes = recording_stats.size_bytes + excluded.size_bytes,
+        duration_seconds = recording_stats.duration_seconds + excluded.duration_seconds
+""").bindparams(bindparam("status", type_=RecordingStats.__table__.c.status.type))
+
+def _bucket_drift(db: Session) -> Tuple[int, Dict[Bucket, Totals]]:
+    """
+    Scans recordings and compares each bucket with its stored totals, in
+    one statement so both sides come from the same snapshot.
+
+    Returns:
+        Number of buckets holding recordings, and the correction (scanned
+        minus stored) of every bucket that is off
+    """
+    device = func.coalesce(Recording.device_name, "")
+    scanned = select(
+        device.label("device_name"),
+        Recording.status.label("status"),
+        func.count().label("count"),
+        func.coalesce(func.sum(Recording.size_bytes), 0).label("size_bytes"),
+        func.coalesce(func.sum(Recording.duration_seconds), 0).label("duration_seconds"),
+        literal(1).label("scanned")
+    ).group_by(device, Recording.status)
+    stored = select(
+        RecordingStats.device_name,
+        RecordingStats.status,
+        -RecordingStats.count,
+        -RecordingStats.size_bytes,
+        -RecordingStats.duration_seconds,
+        literal(0)
+    )
+    both = union_all(scanned, stored).subquery()
+    rows = db.execute(
+        select(
+            both.c.device_name,
+            both.c.status,
+            func.sum(both.c.count),
+            func.sum(both.c.size_bytes),
+            func.sum(both.c.duration_seconds),
+            func.max(both.c.scanned)
+        ).group_by(both.c.device_name, both.c.status)
+    ).all()
+    drift = {(row[0], row[1]): tuple(row[2:5]) for row in rows if any(row[2:5])}
+    return sum(1 for row in rows if row[5]), drift
+
+def reconcile_stats(db: Session, repair: bool = True) -> Dict[str, int]:
+    """
+    Verifies recording_stats against a full scan of recordings.
+
+    The scan and the stored totals are read in one statement, without
+    holding writers off. A drifted bucket is repaired by adding the
+    difference rather than overwriting it: the triggers keep every
+    committed write in step on both sides, so the difference still holds
+    after writes that landed since the read. This also fills the table
+    the first time.
+
+    Two reconciliations must not both add the same difference. On Postgres
+    a transaction-scoped advisory lock lets one run while the others skip;
+    on SQLite the write lock is taken first, so the next one waits and then
+    finds nothing to repair.
+
+    Args:
+        db: Database session
+        repair: Apply the corrections; otherwise only report drift
+
+    Returns:
+        Number of buckets scanned and of buckets that had drifted
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        if not db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": STATS_LOCK_KEY}):
+            db.rollback()
+            logger.info("Another worker is reconciling recording_stats")
+            return {"buckets": 0, "drifted": 0}
+    elif repair:
+        # An UPDATE matching nothing still takes SQLite's write lock
+        db.execute(update(RecordingStats).where(false()).values(count=RecordingStats.count))
+
+    buckets, drift = _bucket_drift(db)
+    if repair and drift:
+        db.execute(_APPLY_DRIFT, [
+            {"device_name": device, "status": status, "count": count, "size_bytes": size, "duration_seconds": duration}
+            for (device, status), (count, size, duration) in drift.items()
+        ])
+    if repair:
+        db.commit()
+    else:
+        db.rollback()
+    if drift:
+        logger.warning(f"recording_stats had drifted in {len(drift)} of {buckets} buckets" + (
+            "; corrected from a full scan" if repair else ""
+        ))
+    return {"buckets": buckets, "drifted": len(drift)}
+
+class StatsReconciler:
+    """
+    Runs reconcile_stats periodically on a background thread.
+
+    With ``elect``, a pass only runs when it returns True, so of several
+    workers only the elected one scans the recordings table.
+    """
+
+    def __init__(self, interval: float = STATS_RECONCILE_SECONDS, elect: Optional[Callable[[], bool]] = None):
+        self.interval = interval
+        self.elect = elect
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        from src.database.connection import SessionLocal
+
+        def run() -> None:
+            while not self._stop.wait(self.interval):
+                db = SessionLocal()
+                try:
+                    if self.elect is None or self.elect():
+                        reconcile_stats(db)
+                except Exception as e:
+                    logger.error(f"Stats reconciliation failed: {e}")
+                finally:
+                    db.close()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="stats-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,248 @@
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+from src.database.connection import SessionLocal
+from src.database.models import Recording, RecordingStatus
+from src.utils.file_utils import atomic_write
+from src.utils.logger import logger
+
+class WriteBehindQueue:
+    """
+    Collects recording lifecycle transitions and writes them in batches.
+
+    Transitions (status, size, duration) are queued in memory and flushed by
+    a background thread every ``flush_interval_ms`` or as soon as
+    ``max_batch`` are pending, with one transaction (one commit/fsync) per
+    batch. Several transitions for the same recording collapse into one row
+    update. On shutdown the queue is flushed; whatever cannot be written is
+    spooled next to ``spool_path`` and replayed by ``recover()`` on next
+    startup.
+
+    Workers sharing a ``spool_path`` each spool to a file of their own
+    (``<stem>.<random>.jsonl``), written under a temporary name and renamed
+    into place, and a replay claims each file by renaming it first. So no
+    spooled transition is replayed twice or lost to another worker's replay.
+    """
+
+    def __init__(
+        self,
+        flush_interval_ms: int = 50,
+        max_batch: int = 100,
+        spool_path: Optional[Path] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        on_flush: Optional[Callable[[], None]] = None
+    ):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.spool_path = spool_path
+        self._session_factory = session_factory
+        self._on_flush = on_flush
+        self._pending: List[dict] = []
+        self._cond = threading.Condition()
+        # Serializes flushes between the background thread and flush() calls
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.flushed = 0
+
+    @classmethod
+    def from_env(cls, **kwargs) -> Optional["WriteBehindQueue"]:
+        """Builds the queue from DB_WRITE_BEHIND* variables, or None if disabled."""
+        if os.getenv("DB_WRITE_BEHIND", "false").lower() != "true":
+            return None
+        return cls(
+            flush_interval_ms=int(os.getenv("DB_WRITE_BEHIND_INTERVAL_MS", "50")),
+            max_batch=int(os.getenv("DB_WRITE_BEHIND_BATCH", "100")),
+            spool_path=Path(os.getenv("DB_WRITE_BEHIND_SPOOL", "output/write_behind.jsonl")),
+            **kwargs
+        )
+
+    def submit(
+        self,
+        recording_id: str,
+        size_bytes: Optional[int] = None,
+        duration_seconds: Optional[int] = None,
+        status: Optional[RecordingStatus] = None
+    ) -> None:
+        """Queues a transition for a recording."""
+        transition = {"id": str(recording_id)}
+        if size_bytes is not None:
+            transition["size_bytes"] = size_bytes
+        if duration_seconds is not None:
+            transition["duration_seconds"] = duration_seconds
+        if status is not None:
+            transition["status"] = RecordingStatus(status).value
+
+        with self._cond:
+            self._pending.append(transition)
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def start(self) -> None:
+        """Starts the background flusher."""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Write-behind enabled: flush every {self.flush_interval * 1000:.0f} ms or {self.max_batch} events"
+        )
+
+    def stop(self) -> None:
+        """Stops the flusher, flushes what is left and spools anything unwritten."""
+        if self._thread is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify()
+            self._thread.join()
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final write-behind flush failed: {e}")
+        self._spool()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._pending) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                # Transitions were put back; retry on the next tick
+                logger.error(f"Write-behind flush failed: {e}")
+
+    def flush(self) -> int:
+        """Writes all pending transitions in one transaction; returns rows updated."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            merged = self._merge(batch)
+            db = None
+            try:
+                db = self._session_factory()
+                # One executemany UPDATE per set of changed columns. Core
+                # statements skip the ORM's matched-row check, so transitions
+                # for rows deleted meanwhile are simply dropped.
+                by_columns: Dict[tuple, List[dict]] = {}
+                for recording_id, values in merged.items():
+                    by_columns.setdefault(tuple(sorted(values)), []).append({"_id": recording_id, **values})
+                table = Recording.__table__
+                for columns, params in by_columns.items():
+                    stmt = update(table) \
+                        .where(table.c.id == bindparam("_id")) \
+                        .values({column: bindparam(column) for column in columns})
+                    db.execute(stmt, params)
+                db.commit()
+            except Exception:
+                if db is not None:
+                    db.rollback()
+                with self._cond:
+                    self._pending[:0] = batch
+                raise
+            finally:
+                if db is not None:
+                    db.close()
+
+            self.flushed += len(batch)
+            if self._on_flush is not None:
+                self._on_flush()
+            logger.debug(f"Write-behind flushed {len(batch)} transitions for {len(merged)} recordings")
+            return len(merged)
+
+    @staticmethod
+    def _merge(batch: List[dict]) -> Dict[uuid.UUID, dict]:
+        merged: Dict[uuid.UUID, dict] = {}
+        for transition in batch:
+            recording_id = uuid.UUID(transition["id"])
+            values = merged.setdefault(recording_id, {})
+            for key, value in transition.items():
+                if key == "status":
+                    values["status"] = RecordingStatus(value)
+                elif key != "id":
+                    values[key] = value
+        return merged
+
+    def _spool(self) -> None:
+        with self._cond:
+            batch, self._pending = self._pending, []
+        if not batch or self.spool_path is None:
+            if batch:
+                logger.error(f"Dropping {len(batch)} unwritten transitions: no spool path configured")
+            return
+        path = self.spool_path.with_name(f"{self.spool_path.stem}.{uuid.uuid4().hex}{self.spool_path.suffix}")
+        with atomic_write(path) as f:
+            for transition in batch:
+                f.write((json.dumps(transition) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        logger.warning(f"Spooled {len(batch)} unwritten transitions to {path}")
+
+    def _spool_files(self) -> List[Path]:
+        """Spool files of every worker, oldest first; includes a legacy ``spool_path`` itself."""
+        files = []
+        for path in [self.spool_path, *self.spool_path.parent.glob(f"{self.spool_path.stem}.*{self.spool_path.suffix}")]:
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                # Absent, or claimed by another worker meanwhile
+                continue
+        return [path for _, path in sorted(files)]
+
+    def recover(self) -> int:
+        """
+        Replays transitions spooled by previous shutdowns; returns how many.
+
+        Each file is claimed by renaming it to ``.<name>.replaying`` and
+        removed once replayed; if the replay fails it is renamed back. A
+        worker that dies mid-replay leaves its claimed files under that name,
+        to be renamed back by hand.
+        """
+        if self.spool_path is None:
+            return 0
+        claimed = []
+        for path in self._spool_files():
+            replaying = path.with_name(f".{path.name}.replaying")
+            try:
+                os.rename(path, replaying)
+            except FileNotFoundError:
+                continue
+            claimed.append((path, replaying))
+        if not claimed:
+            return 0
+
+        batch = []
+        for _, replaying in claimed:
+            with open(replaying) as f:
+                batch.extend(json.loads(line) for line in f if line.strip())
+        with self._cond:
+            self._pending[:0] = batch
+        try:
+            self.flush()
+        except Exception:
+            # Leave them in the spool files only, so stop() does not spool twice
+            with self._cond:
+                del self._pending[:len(batch)]
+            for path, replaying in claimed:
+                os.rename(replaying, path)
+            raise
+        for _, replaying in claimed:
+            replaying.unlink()
+        logger.info(f"Recovered {len(batch)} spooled transitions from {len(claimed)} spool file(s)")
+        return len(batch)
@@ -1,29 +1,224 @@
 import base64
+import math
+import os
+import random
 import time
+import uuid
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, Optional
 from src.utils.logger import logger
 
+# Default size of the simulated video payload (approx 1.5 MB)
+# 1.5 * 1024 * 1024 = 1,572,864 bytes
+DEFAULT_PAYLOAD_SIZE = 1572864
+
+# Size of each chunk sent when simulating an upload to remotePath
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+# Bytes per second of video by Appium videoQuality, roughly what an iPhone
+# screen in H.264 averages (0.5 / 2 / 6 Mbit/s). Used when the payload grows
+# with the recording time.
+QUALITY_BYTE_RATES = {"low": 62_500, "medium": 250_000, "high": 750_000}
+
+@dataclass(frozen=True)
+class Latency:
+    """
+    A distribution of command latencies in seconds.
+
+    Parsed from ``0.1`` (fixed), ``uniform:LOW,HIGH``, ``normal:MEAN,STDDEV``
+    or ``lognormal:MEDIAN,SIGMA``; lognormal gives the long tail real WDA
+    commands have. Samples are never negative.
+    """
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, params = spec.strip().partition(":")
+        if not params:
+            return cls("fixed", float(kind))
+        values = [float(v) for v in params.split(",")]
+        if kind not in ("uniform", "normal", "lognormal") or len(values) != 2:
+            raise ValueError(f"Invalid latency distribution: {spec}")
+        return cls(kind, *values)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        else:
+            value = self.a
+        return max(0.0, value)
+
+@dataclass
+class SimulationProfile:
+    """
+    How a MockDriver behaves, for load tests and capacity planning.
+
+    The defaults reproduce the plain mock: 0.1 s starts, instant stops, a
+    fixed payload and no failures. ``from_env`` reads the MOCK_* variables.
+    """
+    start_latency: Latency = Latency("fixed", 0.1)
+    stop_latency: Latency = Latency()
+    # "fixed": every stop returns payload_size bytes; "duration": the
+    # elapsed recording time (capped at timeLimit) times the byte rate of
+    # the requested videoQuality
+    payload: str = "fixed"
+    byte_rates: Dict[str, int] = field(default_factory=lambda: dict(QUALITY_BYTE_RATES))
+    start_failure_rate: float = 0.0
+    stop_failure_rate: float = 0.0
+    # Makes latencies, failures and session drops repeat run after run; each
+    # device gets its own stream derived from the seed and its UDID
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "SimulationProfile":
+        seed = os.getenv("MOCK_SEED")
+        return cls(
+            start_latency=Latency.parse(os.getenv("MOCK_START_LATENCY", "0.1")),
+            stop_latency=Latency.parse(os.getenv("MOCK_STOP_LATENCY", "0")),
+            payload=os.getenv("MOCK_PAYLOAD", "fixed").lower(),
+            start_failure_rate=float(os.getenv("MOCK_START_FAILURE_RATE", "0")),
+            stop_failure_rate=float(os.getenv("MOCK_STOP_FAILURE_RATE", "0")),
+            seed=int(seed) if seed else None
+        )
+
 class MockDriver:
     """Simulates the Appium driver behavior for testing purposes."""
-    
-    def __init__(self, *args, **kwargs):
-        self.session_id = "mock_session_123"
+
+    def __init__(
+        self,
+        *args,
+        payload_size: int = DEFAULT_PAYLOAD_SIZE,
+        upload: bool = None,
+        http_client=None,
+        create_delay: float = None,
+        session_loss_rate: float = None,
+        udid: Optional[str] = None,
+        profile: Optional[SimulationProfile] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            payload_size: Size of the simulated video in bytes
+            upload: Honour ``remotePath`` on stop by uploading the video like
+                Appium does; defaults to the MOCK_UPLOAD environment variable
+            http_client: httpx.Client used for uploads (e.g. a TestClient)
+            create_delay: Seconds session creation takes, like a WDA bootstrap
+                (MOCK_CREATE_DELAY, default 0)
+            session_loss_rate: Probability that any command finds the session
+                gone (MOCK_SESSION_LOSS_RATE, default 0)
+            udid: Device this session drives; seeds its random stream
+            profile: Latencies, payload model and injected failures;
+                defaults to SimulationProfile.from_env()
+        """
+        if create_delay is None:
+            create_delay = float(os.getenv("MOCK_CREATE_DELAY", "0"))
+        if session_loss_rate is None:
+            session_loss_rate = float(os.getenv("MOCK_SESSION_LOSS_RATE", "0"))
+        if create_delay > 0:
+            time.sleep(create_delay)
+        self.session_id = f"mock_session_{uuid.uuid4().hex[:8]}"
+        self.payload_size = payload_size
+        if upload is None:
+            upload = os.getenv("MOCK_UPLOAD", "false").lower() == "true"
+        self.upload = upload
+        self.http_client = http_client
+        self.session_loss_rate = session_loss_rate
+        self.session_lost = False
+        self.udid = udid
+        self.profile = profile or SimulationProfile.from_env()
+        self.rng = random.Random(f"{self.profile.seed}:{udid}") if self.profile.seed is not None else random.Random()
+        # Set while recording: when it started, its timeLimit and videoQuality
+        self._recording: Optional[tuple] = None
         logger.info("MockDriver initialized.")
 
+    def lose_session(self) -> None:
+        """Simulates the Appium server dropping this session."""
+        self.session_lost = True
+
+    def _check_session(self) -> None:
+        if not self.session_lost and self.session_loss_rate and self.rng.random() < self.session_loss_rate:
+            logger.warning(f"MockDriver: simulating loss of session {self.session_id}")
+            self.session_lost = True
+        if self.session_lost:
+            from selenium.common.exceptions import InvalidSessionIdException
+            raise InvalidSessionIdException(f"A session is either terminated or not started: {self.session_id}")
+
+    @property
+    def timeouts(self):
+        """Simulates reading the session timeouts (used as a liveness probe)."""
+        self._check_session()
+        return SimpleNamespace(implicit_wait=0, page_load=300, script=30)
+
     def start_recording_screen(self, **kwargs):
         """Simulates starting the recording."""
-        logger.info(f"MockDriver: start_recording_screen called with args: {kwargs}")
-        # Simulate some latency
-        time.sleep(0.1)
+        self._check_session()
+        # Formatted lazily: the kwargs dict is only rendered when DEBUG is enabled
+        logger.debug("MockDriver: start_recording_screen called with args: {}", kwargs)
+        time.sleep(self.profile.start_latency.sample(self.rng))
+        self._inject_failure(self.profile.start_failure_rate, "start")
+        self._recording = (time.monotonic(), kwargs.get("timeLimit", 180), kwargs.get("videoQuality", "medium"))
         return True
 
     def stop_recording_screen(self, **kwargs):
-        """Simulates stopping the recording and returning video data."""
-        logger.info("MockDriver: stop_recording_screen called.")
-        # Return a larger dummy base64 string (approx 1.5 MB)
-        # 1.5 * 1024 * 1024 = 1,572,864 bytes
-        dummy_content = b"0" * 1572864
+        """
+        Simulates stopping the recording and returning video data.
+
+        In upload mode a ``remotePath`` makes it stream the video there and
+        return an empty string, as Appium does.
+        """
+        self._check_session()
+        logger.debug("MockDriver: stop_recording_screen called.")
+        time.sleep(self.profile.stop_latency.sample(self.rng))
+        size = self._payload_size()
+        self._recording = None
+        self._inject_failure(self.profile.stop_failure_rate, "stop")
+        remote_path = kwargs.get("remotePath")
+        if remote_path and self.upload:
+            self._upload(remote_path, kwargs.get("method", "PUT"), size)
+            return ""
+        # Return a dummy base64 string of the simulated payload size
+        dummy_content = b"0" * size
         return base64.b64encode(dummy_content).decode('utf-8')
 
+    def _payload_size(self) -> int:
+        if self.profile.payload != "duration" or self._recording is None:
+            return self.payload_size
+        started, time_limit, quality = self._recording
+        elapsed = min(time.monotonic() - started, time_limit)
+        return int(elapsed * self.profile.byte_rates.get(quality, self.profile.byte_rates["medium"]))
+
+    def _inject_failure(self, rate: float, command: str) -> None:
+        if rate and self.rng.random() < rate:
+            from selenium.common.exceptions import WebDriverException
+            logger.warning(f"MockDriver: simulating {command} failure on {self.session_id}")
+            raise WebDriverException(f"Simulated {command}_recording_screen failure")
+
+    def _upload(self, url: str, method: str, size: int) -> None:
+        import httpx
+
+        def chunks():
+            remaining = size
+            while remaining > 0:
+                chunk = min(UPLOAD_CHUNK_SIZE, remaining)
+                remaining -= chunk
+                yield b"0" * chunk
+
+        headers = {"Content-Length": str(size)}
+        if self.http_client is not None:
+            response = self.http_client.request(method, url, content=chunks(), headers=headers)
+        else:
+            with httpx.Client(timeout=None) as client:
+                response = client.request(method, url, content=chunks(), headers=headers)
+        response.raise_for_status()
+        logger.info(f"MockDriver: uploaded {size} bytes to {url}")
+
     def quit(self):
         """Simulates quitting the driver."""
         logger.info("MockDriver: quit called.")
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    A ``ttl`` of 0 disables caching: every lookup calls the loader.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Bumped by clear() so loads that started before it are not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Returns the cached value for ``key``, calling ``loader`` on a miss."""
+        if self.ttl <= 0:
+            return loader()
+
+        hit, value, generation = self._lookup(key)
+        if hit:
+            return value
+        value = loader()
+        self._store(key, value, generation)
+        return value
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Like get_or_load, for a coroutine loader."""
+        if self.ttl <= 0:
+            return await loader()
+
+        hit, value, generation = self._lookup(key)
+        if hit:
+            return value
+        value = await loader()
+        self._store(key, value, generation)
+        return value
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any, int]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, entry[1], self._generation
+            self.misses += 1
+            return False, None, self._generation
+
+    def _store(self, key: Hashable, value: Any, generation: int) -> None:
+        with self._lock:
+            # Skip the store if the cache was cleared while loading, otherwise
+            # a write that raced the load could be hidden for a whole TTL.
+            if generation == self._generation:
+                self._data[key] = (time.monotonic() + self.ttl, value)
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,47 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+from src.utils.logger import logger
+from src.utils.profiling import current_profile
+
+T = TypeVar("T")
+
+# Number of threads available for blocking work (Appium calls, video decoding,
+# disk writes and synchronous database access) issued from async routes.
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", "8"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """Returns the shared worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        logger.info(f"Starting worker pool with {WORKER_POOL_SIZE} threads")
+        _executor = ThreadPoolExecutor(max_workers=WORKER_POOL_SIZE, thread_name_prefix="recorder-worker")
+    return _executor
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a blocking callable on the worker pool without blocking the event loop.
+
+    The caller's context variables are propagated to the worker thread, and
+    a request being profiled with cProfile is profiled there too.
+    """
+    loop = asyncio.get_running_loop()
+    profile = current_profile()
+    if profile is not None:
+        func, args = profile.call, (func, *args)
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Shuts down the worker pool, waiting for queued work by default."""
+    global _executor
+    if _executor is not None:
+        logger.info("Shutting down worker pool...")
+        _executor.shutdown(wait=wait)
+        _executor = None
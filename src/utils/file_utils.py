@@ -1,6 +1,22 @@
-import base64
+import abc
+import binascii
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import IO, Iterator, NamedTuple, Optional, Union
 from src.utils.logger import logger
+from src.utils.metrics import BASE64_PAYLOAD_BYTES, DECODE_SECONDS, DISK_WRITE_SECONDS
+from src.utils.profiling import record_span, traced
+
+# Size of each base64 window handed to the decoder. Must be a multiple of 4 so
+# every window decodes independently; 4 MiB of base64 decodes to 3 MiB of video.
+DECODE_WINDOW_SIZE = 4 * 1024 * 1024
+
+_WHITESPACE = b" \t\r\n\v\f"
 
 def ensure_dir(path: Path) -> None:
     """Ensure that a directory exists."""
@@ -8,14 +24,354 @@ def ensure_dir(path: Path) -> None:
         logger.info(f"Creating directory: {path}")
         path.mkdir(parents=True, exist_ok=True)
 
-def save_video(base64_data: str, output_path: Path) -> None:
-    """Decodes base64 video data and saves it to the specified path."""
+def _iter_base64_windows(base64_data: Union[str, bytes, IO], window_size: int):
+    """Yields ASCII base64 windows from a str, bytes or a readable stream."""
+    if hasattr(base64_data, "read"):
+        while True:
+            window = base64_data.read(window_size)
+            if not window:
+                return
+            yield window.encode("ascii") if isinstance(window, str) else window
+    else:
+        for offset in range(0, len(base64_data), window_size):
+            window = base64_data[offset:offset + window_size]
+            yield window.encode("ascii") if isinstance(window, str) else window
+
+def decode_base64_to_file(
+    base64_data: Union[str, bytes, IO],
+    out: IO[bytes],
+    window_size: int = DECODE_WINDOW_SIZE
+) -> int:
+    """
+    Decodes base64 data into a binary file object in fixed-size windows.
+
+    Only one window (plus at most 3 carried-over characters) is held in memory
+    at a time, so memory use does not grow with the size of the recording.
+
+    Args:
+        base64_data: Base64 payload as str, bytes or a readable stream
+        out: Binary file object the decoded bytes are written to
+        window_size: Number of base64 characters decoded per step (multiple of 4)
+
+    Returns:
+        Number of decoded bytes written
+    """
+    if window_size <= 0 or window_size % 4:
+        raise ValueError(f"window_size must be a positive multiple of 4, got {window_size}")
+
+    written = 0
+    pending = b""
+    # Two clock reads per window; negligible next to decoding 4 MiB
+    decode_seconds = write_seconds = 0.0
+    for window in _iter_base64_windows(base64_data, window_size):
+        started = time.perf_counter()
+        if pending:
+            window = pending + window
+        # Payloads from Appium carry no line breaks, but MIME-style input does.
+        if any(ch in window for ch in _WHITESPACE):
+            window = window.translate(None, _WHITESPACE)
+        aligned = len(window) - len(window) % 4
+        pending = window[aligned:]
+        if aligned:
+            decoded = binascii.a2b_base64(window[:aligned])
+            decoded_at = time.perf_counter()
+            written += out.write(decoded)
+            write_seconds += time.perf_counter() - decoded_at
+            decode_seconds += decoded_at - started
+
+    if pending:
+        raise ValueError(f"Truncated base64 payload: {len(pending)} trailing characters")
+    DECODE_SECONDS.observe(decode_seconds)
+    DISK_WRITE_SECONDS.observe(write_seconds)
+    # Summed over the windows, so they show as one block each in a timeline
+    record_span("save_video.decode", decode_seconds)
+    record_span("save_video.write", write_seconds)
+    return written
+
+@contextmanager
+def atomic_write(output_path: Path) -> Iterator[IO[bytes]]:
+    """
+    Opens a temporary file next to ``output_path`` for writing.
+
+    The file is renamed into place when the block exits cleanly and removed if
+    it raises, so readers never see a partially written video.
+
+    Usage:
+        with atomic_write(output_path) as f:
+            f.write(chunk)
+    """
+    ensure_dir(output_path.parent)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{output_path.name}.", suffix=".part", dir=output_path.parent
+    )
     try:
-        ensure_dir(output_path.parent)
-        video_data = base64.b64decode(base64_data)
-        with open(output_path, "wb") as f:
-            f.write(video_data)
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        # mkstemp creates 0600 files; match what a plain open() would produce
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+@traced("save_video")
+def save_video(base64_data: Union[str, bytes, IO], output_path: Path) -> None:
+    """
+    Decodes base64 video data and saves it to the specified path.
+
+    The payload is decoded window by window into a temporary file next to
+    ``output_path``, which is then renamed into place, so readers never see a
+    partially written video.
+    """
+    if not hasattr(base64_data, "read"):
+        BASE64_PAYLOAD_BYTES.observe(len(base64_data))
+    try:
+        with atomic_write(output_path) as f:
+            decode_base64_to_file(base64_data, f)
         logger.info(f"Video saved successfully to: {output_path}")
     except Exception as e:
         logger.error(f"Failed to save video: {e}")
         raise
+
+# Directory of the content-addressed objects inside a storage root. Shard
+# directories are two hex characters, so the name never collides with them.
+OBJECTS_DIR = ".objects"
+
+_HASH_BUFFER_SIZE = 1024 * 1024
+
+def _shard(key: str) -> str:
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(digest[:2], digest[2:4])
+
+def recording_path(root: Path, filename: str) -> Path:
+    """
+    Path of a recording file under a storage root.
+
+    Files live in two levels of directories keyed by a hash of their name
+    (``root/ab/cd/<filename>``), so no directory grows past a few dozen
+    entries even with millions of recordings. Files written before sharding
+    was introduced are still found at ``root/<filename>``.
+    """
+    sharded = root / _shard(filename) / filename
+    if not sharded.exists():
+        flat = root / filename
+        if flat.exists():
+            return flat
+    return sharded
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MiB blocks."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BUFFER_SIZE), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+class ColdTier(abc.ABC):
+    """
+    Secondary storage that evicted recordings are moved to.
+
+    Objects are keyed by recording filename, as they would be in a bucket.
+    Subclass for a real object store; LocalColdTier is the stand-in.
+    """
+
+    @abc.abstractmethod
+    def put(self, filename: str, path: Path) -> None:
+        ...
+
+    @abc.abstractmethod
+    def get(self, filename: str, output_path: Path) -> bool:
+        """Copies ``filename`` to ``output_path``; False if it is not stored."""
+
+    @abc.abstractmethod
+    def delete(self, filename: str) -> None:
+        ...
+
+class LocalColdTier(ColdTier):
+    """Cold tier kept in a local directory (e.g. a slower, larger volume)."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def put(self, filename: str, path: Path) -> None:
+        with atomic_write(recording_path(self.root, filename)) as out, open(path, "rb") as src:
+            shutil.copyfileobj(src, out, _HASH_BUFFER_SIZE)
+
+    def get(self, filename: str, output_path: Path) -> bool:
+        stored = recording_path(self.root, filename)
+        if not stored.exists():
+            return False
+        with atomic_write(output_path) as out, open(stored, "rb") as src:
+            shutil.copyfileobj(src, out, _HASH_BUFFER_SIZE)
+        return True
+
+    def delete(self, filename: str) -> None:
+        recording_path(self.root, filename).unlink(missing_ok=True)
+
+class StoredFile(NamedTuple):
+    """A recording file found on local storage."""
+    filename: str
+    path: Path
+    size: int
+    accessed_at: float
+    modified_at: float
+    links: int
+
+class ContentAddressedStorage:
+    """
+    Local recording storage with hash-sharded names and deduplicated content.
+
+    Every file keeps its name at ``recording_path(root, filename)``. Once a
+    file has settled, ``ingest`` hardlinks it to ``.objects/ab/cd/<sha256>``;
+    a later file with identical content is replaced by a hardlink to the same
+    object, so the bytes are stored once. Writers always replace files
+    atomically (``atomic_write``), never modify them in place, so a shared
+    inode is never changed underneath another name. An object whose names are
+    all gone has a single link left and is removed by ``collect_garbage``.
+
+    ``touch`` stamps the access time used for LRU eviction explicitly, so it
+    works on volumes mounted with ``noatime``.
+    """
+
+    def __init__(self, root: Path, cold_tier: Optional[ColdTier] = None):
+        self.root = Path(root)
+        self.cold_tier = cold_tier
+
+    def path_for(self, filename: str) -> Path:
+        return recording_path(self.root, filename)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / OBJECTS_DIR / digest[:2] / digest[2:4] / digest
+
+    def ingest(self, path: Path) -> Optional[str]:
+        """
+        Links a file into the object store, deduplicating identical content.
+
+        Returns:
+            The content digest, or None if the file is already linked
+        """
+        st = path.stat()
+        if st.st_nlink > 1:
+            return None
+        digest = file_digest(path)
+        # Hashing is not an access: keep the LRU timestamp as it was
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        object_path = self._object_path(digest)
+        ensure_dir(object_path.parent)
+        try:
+            os.link(path, object_path)
+            return digest
+        except FileExistsError:
+            pass
+
+        # Identical content is stored already: point the name at that inode
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.link")
+        os.link(object_path, tmp_path)
+        os.replace(tmp_path, path)
+        logger.info(f"Deduplicated {path.name} against object {digest[:12]}")
+        return digest
+
+    def ingest_settled(self, min_age: float = 60.0) -> int:
+        """Ingests files not modified for ``min_age`` seconds; returns how many."""
+        cutoff = time.time() - min_age
+        ingested = 0
+        for stored in self.iter_files():
+            if stored.links == 1 and stored.modified_at < cutoff and stored.filename.endswith(".mp4"):
+                try:
+                    if self.ingest(stored.path):
+                        ingested += 1
+                except FileNotFoundError:
+                    # Removed while the sweep was running
+                    pass
+        return ingested
+
+    def collect_garbage(self) -> int:
+        """Removes objects no name links to any more; returns bytes freed."""
+        freed = 0
+        objects_root = self.root / OBJECTS_DIR
+        for path, st in _walk_files(objects_root):
+            if st.st_nlink == 1:
+                path.unlink(missing_ok=True)
+                freed += st.st_size
+        return freed
+
+    def iter_files(self) -> Iterator[StoredFile]:
+        """Yields every named file (sharded and legacy flat), skipping temp files."""
+        for path, st in _walk_files(self.root, skip={OBJECTS_DIR}):
+            if path.name.startswith("."):
+                continue
+            yield StoredFile(path.name, path, st.st_size, st.st_atime, st.st_mtime, st.st_nlink)
+
+    def usage_bytes(self) -> int:
+        """Bytes used on disk, counting each deduplicated inode once."""
+        seen = set()
+        total = 0
+        for _, st in _walk_files(self.root):
+            key = (st.st_dev, st.st_ino)
+            if key not in seen:
+                seen.add(key)
+                total += st.st_size
+        return total
+
+    def touch(self, filename: str) -> None:
+        """Marks a file as just accessed, for LRU eviction."""
+        path = self.path_for(filename)
+        try:
+            st = path.stat()
+            os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+        except FileNotFoundError:
+            pass
+
+    def remove(self, filename: str, archive: bool = False) -> int:
+        """
+        Removes a file's name, copying it to the cold tier first if ``archive``.
+
+        Returns:
+            Bytes this frees locally once collect_garbage has run: the size,
+            unless other names share the content
+        """
+        path = self.path_for(filename)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return 0
+        if archive:
+            if self.cold_tier is None:
+                raise ValueError("No cold tier configured")
+            self.cold_tier.put(filename, path)
+        path.unlink(missing_ok=True)
+        # An ingested file has one extra link from the object store; beyond
+        # that, other names share the content
+        return 0 if st.st_nlink > 2 else st.st_size
+
+    def restore(self, filename: str) -> Optional[Path]:
+        """Copies a file back from the cold tier; None if it is not there."""
+        if self.cold_tier is None:
+            return None
+        path = self.path_for(filename)
+        if not self.cold_tier.get(filename, path):
+            return None
+        logger.info(f"Restored {filename} from the cold tier")
+        return path
+
+def _walk_files(root: Path, skip=frozenset()) -> Iterator[tuple]:
+    """Yields (path, stat) for every regular file below ``root``."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skip:
+                    stack.append(Path(entry.path))
+            elif entry.is_file(follow_symlinks=False):
+                try:
+                    yield Path(entry.path), entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    pass
@@ -1,12 +1,78 @@
+import json
+import os
+import random
 import sys
+from typing import TextIO
 from loguru import logger
 
-# Remove default handler
-logger.remove()
+# Minimum level written (TRACE, DEBUG, INFO, WARNING, ERROR)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
-# Add a standout sink with custom format
-logger.add(
-    sys.stdout,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-    level="INFO",
-)
+# "text" for the colorized console format, "json" for one object per line
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
+# Hand lines to a background thread instead of writing in the calling thread
+LOG_ENQUEUE = os.getenv("LOG_ENQUEUE", "false").lower() == "true"
+
+# Fraction of DEBUG and TRACE lines kept; higher levels are never sampled
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+TEXT_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+
+_DEBUG_LEVEL_NO = logger.level("DEBUG").no
+
+def _json_format(record) -> str:
+    """Renders a record as one JSON line; loguru expects a format string back."""
+    entry = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    if record["extra"]:
+        entry["extra"] = {k: v for k, v in record["extra"].items() if k != "_json"}
+    if record["exception"] is not None:
+        entry["exception"] = repr(record["exception"].value)
+    record["extra"]["_json"] = json.dumps(entry, default=str)
+    return "{extra[_json]}\n"
+
+def _sample_filter(rate: float):
+    def keep(record) -> bool:
+        return record["level"].no > _DEBUG_LEVEL_NO or random.random() < rate
+    return keep
+
+def configure_logging(
+    sink: TextIO = sys.stdout,
+    level: str = LOG_LEVEL,
+    json_format: bool = LOG_FORMAT == "json",
+    enqueue: bool = LOG_ENQUEUE,
+    debug_sample_rate: float = LOG_DEBUG_SAMPLE_RATE
+) -> int:
+    """
+    Replaces every logger sink with one configured sink.
+
+    With ``enqueue`` the calling thread only formats the line and queues it;
+    a background thread does the write, so a slow consumer of stdout (a
+    container log driver applying backpressure) no longer stalls requests.
+    Call shutdown_logging before exit to flush what is queued.
+
+    Returns:
+        The loguru handler id
+    """
+    logger.remove()
+    return logger.add(
+        sink,
+        level=level,
+        format=_json_format if json_format else TEXT_FORMAT,
+        colorize=False if json_format else None,
+        enqueue=enqueue,
+        filter=_sample_filter(debug_sample_rate) if debug_sample_rate < 1.0 else None,
+    )
+
+def shutdown_logging() -> None:
+    """Waits until queued lines are written."""
+    logger.complete()
+
+configure_logging()
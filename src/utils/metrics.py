@@ -0,0 +1,160 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Content type of the Prometheus text exposition format served at /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from a fast DB commit to a slow driver stop
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Payload buckets in bytes, 64 KiB to 4 GiB in powers of 4
+SIZE_BUCKETS = tuple(64 * 1024 * 4 ** i for i in range(9))
+
+_enabled = os.getenv("METRICS", "true").lower() == "true"
+
+def enabled() -> bool:
+    return _enabled
+
+def set_enabled(value: bool) -> None:
+    """Turns recording of observations on or off (METRICS=false starts it off)."""
+    global _enabled
+    _enabled = value
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """
+    Cumulative histogram in the Prometheus sense, optionally labelled.
+
+    An observation is one bisect and three additions under a lock, so it is
+    cheap enough for every request and every driver call. Buckets are stored
+    per bucket and only accumulated when rendered.
+    """
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not _enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observes the seconds the block took, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def snapshot(self, *labels: str) -> Tuple[int, float]:
+        """(count, sum) of one series; mainly for tests."""
+        with self._lock:
+            series = self._series.get(labels)
+            return (series[2], series[1]) if series else (0, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(series):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+class Gauge:
+    """A value set when it changes or just before a scrape."""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0.0
+        registry.register(self)
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.value)}",
+        ]
+
+class Registry:
+    """The metrics rendered at /metrics, in registration order."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+registry = Registry()
+
+DRIVER_START_SECONDS = Histogram(
+    "recorder_driver_start_seconds", "Latency of the driver's start_recording_screen call"
+)
+DRIVER_STOP_SECONDS = Histogram(
+    "recorder_driver_stop_seconds", "Latency of the driver's stop_recording_screen call"
+)
+BASE64_PAYLOAD_BYTES = Histogram(
+    "recorder_base64_payload_bytes", "Size of base64 video payloads returned by the driver", buckets=SIZE_BUCKETS
+)
+DECODE_SECONDS = Histogram(
+    "recorder_decode_seconds", "Time spent decoding base64 per saved video"
+)
+DISK_WRITE_SECONDS = Histogram(
+    "recorder_disk_write_seconds", "Time spent writing decoded video to disk per saved video"
+)
+DB_COMMIT_SECONDS = Histogram(
+    "recorder_db_commit_seconds", "Duration of database session commits"
+)
+REQUEST_SECONDS = Histogram(
+    "recorder_http_request_seconds", "Time from request to response start, per route",
+    labelnames=("method", "route", "status")
+)
+ACTIVE_RECORDINGS = Gauge("recorder_active_recordings", "Recordings currently in progress")
+DB_CONNECTIONS_IN_USE = Gauge("recorder_db_connections_in_use", "Connections checked out of the database pool")
+DISK_FREE_BYTES = Gauge("recorder_disk_free_bytes", "Free space on the recordings volume")
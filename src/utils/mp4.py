@@ -0,0 +1,153 @@
+import shutil
+import struct
+from pathlib import Path
+from typing import BinaryIO, List, NamedTuple
+from src.utils.file_utils import atomic_write
+from src.utils.logger import logger
+
+# Atoms on the path from moov to the chunk offset tables
+_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+class Atom(NamedTuple):
+    """A top-level MP4 box: its type, offset in the file and total size."""
+    kind: bytes
+    offset: int
+    size: int
+
+class Mp4Error(ValueError):
+    """Raised for files that are not well-formed MP4 containers."""
+
+def read_atoms(f: BinaryIO) -> List[Atom]:
+    """Lists the top-level atoms of an MP4 file without reading their payloads."""
+    f.seek(0, 2)
+    file_size = f.tell()
+    atoms = []
+    offset = 0
+    while offset < file_size:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            raise Mp4Error(f"Truncated atom header at offset {offset}")
+        size, kind = struct.unpack(">I4s", header)
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+        elif size == 0:
+            size = file_size - offset
+        if size < 8 or offset + size > file_size:
+            raise Mp4Error(f"Invalid size {size} for atom {kind!r} at offset {offset}")
+        atoms.append(Atom(kind, offset, size))
+        offset += size
+    return atoms
+
+def is_faststart(path: Path) -> bool:
+    """True if ``moov`` comes before the first ``mdat``, so playback can start at once."""
+    with open(path, "rb") as f:
+        kinds = [atom.kind for atom in read_atoms(f)]
+    if b"moov" not in kinds:
+        raise Mp4Error("No moov atom")
+    return b"mdat" not in kinds or kinds.index(b"moov") < kinds.index(b"mdat")
+
+def _shift_chunk_offsets(moov: bytearray, start: int, end: int, shift: int, below: int) -> None:
+    """
+    Adds ``shift`` to every stco/co64 entry inside ``moov[start:end]`` that
+    points below file offset ``below``, in place.
+    """
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", moov, offset)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", moov, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise Mp4Error(f"Invalid size {size} for atom {kind!r} inside moov")
+
+        body = offset + header_size
+        if kind in _CONTAINERS:
+            _shift_chunk_offsets(moov, body, offset + size, shift, below)
+        elif kind in (b"stco", b"co64"):
+            # version/flags (4 bytes), entry count (4 bytes), then the offsets
+            count = struct.unpack_from(">I", moov, body + 4)[0]
+            entries = body + 8
+            fmt = f">{count}I" if kind == b"stco" else f">{count}Q"
+            values = [v + shift if v < below else v for v in struct.unpack_from(fmt, moov, entries)]
+            if kind == b"stco" and values and max(values) > 0xFFFFFFFF:
+                # Would need an stco -> co64 upgrade, which changes moov's size
+                raise Mp4Error("Chunk offsets overflow 32 bits after the move")
+            struct.pack_into(fmt, moov, entries, *values)
+        offset += size
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, offset: int, size: int) -> None:
+    src.seek(offset)
+    remaining = size
+    while remaining:
+        chunk = src.read(min(_COPY_BUFFER_SIZE, remaining))
+        if not chunk:
+            raise Mp4Error("File shrank while copying")
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+def faststart(path: Path) -> bool:
+    """
+    Moves the ``moov`` atom in front of the media data, without re-encoding.
+
+    Chunk offsets into media that sat before the original ``moov`` are
+    shifted by its size so they keep pointing at the same bytes; media
+    after it, such as a second ``mdat``, does not move. The rewritten file replaces
+    the original atomically; only ``moov`` is held in memory.
+
+    Returns:
+        True if the file was rewritten, False if it already was faststart
+    """
+    with open(path, "rb") as src:
+        atoms = read_atoms(src)
+        kinds = [atom.kind for atom in atoms]
+        if b"moov" not in kinds:
+            raise Mp4Error("No moov atom")
+        if b"mdat" not in kinds or kinds.index(b"moov") < kinds.index(b"mdat"):
+            return False
+
+        moov_atom = atoms[kinds.index(b"moov")]
+        src.seek(moov_atom.offset)
+        moov = bytearray(src.read(moov_atom.size))
+        header_size = 16 if struct.unpack_from(">I", moov)[0] == 1 else 8
+        _shift_chunk_offsets(moov, header_size, len(moov), moov_atom.size, below=moov_atom.offset)
+
+        first_mdat = kinds.index(b"mdat")
+        with atomic_write(path) as dst:
+            for atom in atoms[:first_mdat]:
+                _copy_range(src, dst, atom.offset, atom.size)
+            dst.write(moov)
+            for atom in atoms[first_mdat:]:
+                if atom is not moov_atom:
+                    _copy_range(src, dst, atom.offset, atom.size)
+
+    logger.info(f"Moved moov atom to the front of {path}")
+    return True
+
+def extract_poster(path: Path, output_path: Path, width: int = 320) -> bool:
+    """
+    Saves the first frame of a video as a JPEG poster with ffmpeg.
+
+    Decoding H.264 needs a codec, so this is the one stage that shells out;
+    it is skipped when ffmpeg is not installed.
+
+    Returns:
+        True if the poster was written, False if ffmpeg is unavailable
+    """
+    import subprocess
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return False
+    with atomic_write(output_path) as f:
+        subprocess.run(
+            [ffmpeg, "-v", "error", "-i", str(path), "-frames:v", "1",
+             "-vf", f"scale={width}:-2", "-f", "mjpeg", "-"],
+            stdout=f, check=True, timeout=60
+        )
+    return True
@@ -0,0 +1,214 @@
+import cProfile
+import functools
+import io
+import itertools
+import marshal
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Honour the X-Profile request header. Off by default: a profile can hold
+# request paths and slows the request it covers.
+PROFILING = os.getenv("PROFILING", "false").lower() == "true"
+
+# Fraction of requests recorded as a span timeline without being asked to
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# Profiles kept for /admin/profiles; the oldest is dropped first
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+
+# When set, /admin/profiles requires it in the X-Admin-Token header
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+
+# Functions listed in the text report of a cProfile capture
+PROFILE_TOP_FUNCTIONS = 40
+
+# Request header that asks for a profile: "cprofile", or anything else for spans
+PROFILE_HEADER = "x-profile"
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+_ids = itertools.count(1)
+# cProfile cannot nest within one thread
+_profiling_thread = threading.local()
+
+@dataclass
+class Span:
+    """A timed section of a request, relative to when the request arrived."""
+    name: str
+    start: float
+    duration: float
+    thread: str
+
+class RequestProfile:
+    """
+    Spans, and with ``mode="cprofile"`` function statistics, of one request.
+
+    Spans come from ``span``/``traced`` anywhere in the request's context,
+    including work handed to the worker pool. cProfile covers the calls made
+    through ``run_blocking``, where the driver, decoding, disk and database
+    work of start and stop runs; the event loop serves other requests
+    meanwhile and is left out.
+    """
+
+    def __init__(self, method: str, path: str, mode: str = "spans"):
+        self.id = next(_ids)
+        self.method = method
+        self.path = path
+        self.mode = mode
+        self.started_at = time.time()
+        self.status: Optional[int] = None
+        self.duration: Optional[float] = None
+        self.spans: List[Span] = []
+        self._origin = time.perf_counter()
+        self._stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, started: float, duration: float) -> None:
+        span = Span(name, started - self._origin, duration, threading.current_thread().name)
+        with self._lock:
+            self.spans.append(span)
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Runs ``func``, under cProfile if this profile asked for it."""
+        if self.mode != "cprofile" or getattr(_profiling_thread, "active", False):
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        _profiling_thread.active = True
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            _profiling_thread.active = False
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profiler)
+                else:
+                    self._stats.add(profiler)
+
+    def finish(self, status: Optional[int]) -> None:
+        self.status = status
+        self.duration = time.perf_counter() - self._origin
+
+    def pstats_dump(self) -> Optional[bytes]:
+        """The cProfile statistics in the format ``pstats.Stats`` and snakeviz load."""
+        with self._lock:
+            if self._stats is None:
+                return None
+            return marshal.dumps(self._stats.stats)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration": self.duration,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        report = None
+        if self._stats is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(stream=stream)
+            with self._lock:
+                stats.add(self._stats)
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+            report = stream.getvalue()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return {
+            **self.summary(),
+            "spans": [vars(s) for s in spans],
+            "cprofile": report,
+        }
+
+class ProfileBuffer:
+    """The most recent request profiles, bounded to ``maxlen``."""
+
+    def __init__(self, maxlen: int = PROFILE_BUFFER_SIZE):
+        self._profiles: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[RequestProfile]:
+        """Profiles newest first."""
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+profile_buffer = ProfileBuffer()
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+@contextmanager
+def profile_request(method: str, path: str, mode: str = "spans") -> Iterator[RequestProfile]:
+    """Profiles the work done in this context; the profile is kept in profile_buffer."""
+    profile = RequestProfile(method, path, mode)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        profile_buffer.add(profile)
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Times the block as ``name`` when the current request is being profiled."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, started, time.perf_counter() - started)
+
+def record_span(name: str, duration: float) -> None:
+    """Adds a span measured elsewhere, such as time summed over a loop, ending now."""
+    profile = _current.get()
+    if profile is not None:
+        profile.add_span(name, time.perf_counter() - duration, duration)
+
+def traced(name: Optional[str] = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorator recording each call as a span, ``module.function`` by default.
+
+    Outside a profiled request the wrapper costs one context variable lookup.
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            profile = _current.get()
+            if profile is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add_span(span_name, started, time.perf_counter() - started)
+
+        return wrapper
+    return decorator
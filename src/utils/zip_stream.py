@@ -0,0 +1,64 @@
+import io
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+from src.utils.logger import logger
+
+# Bytes read from each file per chunk, which bounds the memory of a stream
+ZIP_CHUNK_SIZE = 1024 * 1024
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable buffer that hands out what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_zip(entries: Iterable[Tuple[str, Path]], chunk_size: int = ZIP_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Generates a store-only ZIP archive of files as it is read.
+
+    Files are copied into the archive without recompression and each chunk
+    is yielded as soon as it is written. Because the output is not seekable,
+    sizes and CRCs follow each file in a data descriptor, and ZIP64 records
+    are used for files over 4 GiB. Memory stays at about one chunk plus the
+    central directory (about 100 bytes per entry).
+
+    Args:
+        entries: (name in the archive, path on disk) pairs; consumed lazily.
+            Paths that disappeared by the time they are read are skipped.
+        chunk_size: Bytes read from a file at a time
+
+    Yields:
+        Consecutive pieces of the archive
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for name, path in entries:
+            try:
+                src = open(path, "rb")
+            except FileNotFoundError:
+                logger.warning(f"Skipping {name} in archive: {path} no longer exists")
+                continue
+            with src:
+                info = zipfile.ZipInfo.from_file(path, arcname=name, strict_timestamps=False)
+                with archive.open(info, mode="w", force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dst:
+                    while True:
+                        chunk = src.read(chunk_size)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import pytest
+
+# The API tests need a database; default to a throwaway SQLite file unless the
+# caller points DATABASE_URL somewhere else. Must run before src.database import.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test_recordings.db")
+
+@pytest.fixture
+def api_app(tmp_path, monkeypatch):
+    """FastAPI app wired to MockDriver devices and a temporary output directory."""
+    from src.api import routes
+    from src.api.dependencies import get_device_pool
+    from src.api.main import app
+    from src.core.device_pool import DevicePool
+    from src.database import init_db
+    from src.simulation.mock_driver import MockDriver
+
+    init_db()
+    monkeypatch.setattr(routes, "OUTPUT_DIR", tmp_path)
+
+    pool = DevicePool(driver_factory=lambda udid: MockDriver())
+    app.dependency_overrides[get_device_pool] = lambda: pool
+    app.state.device_pool = pool
+    yield app
+    app.dependency_overrides.clear()
+    pool.quit_all()
+
+@pytest.fixture
+def db():
+    """Database session on an emptied recordings table."""
+    from src.database import crud, init_db, Recording, RecordingSegment
+    from src.database.connection import SessionLocal
+
+    init_db()
+    session = SessionLocal()
+    session.query(RecordingSegment).delete()
+    session.query(Recording).delete()
+    session.commit()
+    crud.invalidate_cache()
+    yield session
+    session.close()
@@ -0,0 +1,299 @@
+import asyncio
+import time
+import httpx
+from src.core.device_pool import DEFAULT_DEVICE
+
+def test_health_responsive_during_stop(api_app):
+    """Verifies a slow stop does not stall /health on the event loop."""
+    driver = api_app.state.device_pool.get_device(DEFAULT_DEVICE).driver
+    original_stop = driver.stop_recording_screen
+
+    def slow_stop(**kwargs):
+        time.sleep(1.0)
+        return original_stop(**kwargs)
+
+    driver.stop_recording_screen = slow_stop
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/recording/start", json={"filename_prefix": "async"})
+            assert response.status_code == 200
+
+            stop = asyncio.create_task(client.post("/recording/stop"))
+            await asyncio.sleep(0.1)
+            started = time.perf_counter()
+            health = await client.get("/health")
+            health_latency = time.perf_counter() - started
+
+            assert health.status_code == 200
+            assert not stop.done()
+            # A blocked loop would hold /health behind the stop's 1.0 s sleep
+            assert health_latency < 1.0
+
+            response = await stop
+            assert response.status_code == 200
+            assert response.json()["size_bytes"] == driver.payload_size
+
+    asyncio.run(scenario())
+
+def test_concurrent_recordings_on_devices(api_app):
+    """Verifies devices record independently and in parallel."""
+    udids = [f"device-{i}" for i in range(4)]
+    start_spans = []
+    for udid in udids:
+        driver = api_app.state.device_pool.get_device(udid).driver
+
+        def timed_start(original=driver.start_recording_screen, **kwargs):
+            began = time.monotonic()
+            try:
+                return original(**kwargs)
+            finally:
+                start_spans.append((began, time.monotonic()))
+
+        driver.start_recording_screen = timed_start
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*(
+                client.post(f"/devices/{udid}/recording/start", json={"filename_prefix": "farm"})
+                for udid in udids
+            ))
+            # Every start began before any finished, so they ran in parallel
+            assert len(start_spans) == len(udids)
+            assert max(began for began, _ in start_spans) < min(ended for _, ended in start_spans)
+            assert [r.status_code for r in responses] == [200] * len(udids)
+
+            busy = await client.post(f"/devices/{udids[0]}/recording/start", json={})
+            assert busy.status_code == 400
+
+            devices = (await client.get("/devices")).json()
+            assert sorted(d["udid"] for d in devices if d["is_recording"]) == udids
+
+            responses = await asyncio.gather(*(
+                client.post(f"/devices/{udid}/recording/stop") for udid in udids
+            ))
+            assert [r.status_code for r in responses] == [200] * len(udids)
+            assert len({r.json()["filename"] for r in responses}) == len(udids)
+
+            idle = await client.post(f"/devices/{udids[0]}/recording/stop")
+            assert idle.status_code == 400
+
+    asyncio.run(scenario())
+
+def test_download_range_and_conditional_requests(api_app):
+    """Verifies Range, If-Range and If-None-Match handling on downloads."""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(api_app)
+    assert client.post("/recording/start", json={"filename_prefix": "range"}).status_code == 200
+    url = client.post("/recording/stop").json()["download_url"]
+    size = api_app.state.device_pool.get_device(DEFAULT_DEVICE).driver.payload_size
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.headers["accept-ranges"] == "bytes"
+    assert len(full.content) == size
+    etag = full.headers["etag"]
+
+    part = client.get(url, headers={"Range": "bytes=100-199"})
+    assert part.status_code == 206
+    assert part.headers["content-range"] == f"bytes 100-199/{size}"
+    assert part.content == full.content[100:200]
+
+    tail = client.get(url, headers={"Range": "bytes=-10", "If-Range": etag})
+    assert tail.status_code == 206
+    assert tail.content == full.content[-10:]
+
+    stale = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert stale.status_code == 200
+    assert len(stale.content) == size
+
+    multi = client.get(url, headers={"Range": "bytes=0-1,10-11"})
+    assert multi.status_code == 206
+    assert multi.headers["content-type"].startswith("multipart/byteranges")
+    assert int(multi.headers["content-length"]) == len(multi.content)
+
+    assert client.get(url, headers={"Range": f"bytes={size}-"}).status_code == 416
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+def test_stop_costs_one_sql_statement(api_app):
+    """Verifies the stop route updates the recording with a single statement."""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(api_app)
+    assert client.post("/recording/start", json={"filename_prefix": "sql"}).status_code == 200
+    response = client.post("/recording/stop")
+    assert response.status_code == 200
+    assert response.headers["x-sql-statements"] == "1"
+
+def test_segmented_recording(api_app):
+    """Verifies a segmented recording is rotated, saved per segment and listed in order."""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(api_app)
+    size = api_app.state.device_pool.get_device(DEFAULT_DEVICE).driver.payload_size
+    response = client.post("/recording/start", json={"filename_prefix": "segmented", "segment_seconds": 0.2})
+    assert response.status_code == 200
+    filename = response.json()["filename"]
+
+    time.sleep(0.75)
+    stopped = client.post("/recording/stop").json()
+
+    segments = client.get(f"/recordings/{filename}/segments").json()
+    assert len(segments) >= 3
+    assert [s["index"] for s in segments] == list(range(len(segments)))
+    assert all(s["size_bytes"] == size for s in segments)
+    assert stopped["size_bytes"] == size * len(segments)
+
+    download = client.get(segments[0]["download_url"])
+    assert download.status_code == 200
+    assert len(download.content) == size
+    assert client.get(f"/recordings/{filename}").status_code == 404
+
+    assert client.post("/recording/start", json={"segment_seconds": 0}).status_code == 422
+
+def test_failed_rotation_fails_the_recording(api_app, monkeypatch):
+    """Verifies a recording whose segment rotation failed is marked failed, not completed."""
+    from fastapi.testclient import TestClient
+    from src.core.recorder import ScreenRecorder
+    from src.database import crud, get_db_context, RecordingStatus
+
+    def broken_rotation(self, **start_kwargs):
+        raise RuntimeError("device disconnected")
+
+    monkeypatch.setattr(ScreenRecorder, "rotate_recording", broken_rotation)
+    client = TestClient(api_app)
+    filename = client.post("/recording/start", json={"filename_prefix": "rotfail", "segment_seconds": 0.1}).json()["filename"]
+    time.sleep(0.3)
+
+    assert client.post("/recording/stop").status_code == 500
+    with get_db_context() as db:
+        assert crud.get_recording_by_filename(db, filename).status == RecordingStatus.FAILED
+    assert api_app.state.device_pool.device_status(DEFAULT_DEVICE)["is_recording"] is False
+
+def test_stop_streams_upload_to_receiver(api_app):
+    """Verifies stop points the driver at /uploads and stores the uploaded body."""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(api_app)
+    device = api_app.state.device_pool.get_device(DEFAULT_DEVICE)
+    device.driver.upload = True
+    device.driver.http_client = client
+    device.recorder.upload_url = "http://testserver"
+
+    assert client.post("/recording/start", json={"filename_prefix": "upload"}).status_code == 200
+    stopped = client.post("/recording/stop").json()
+    assert stopped["size_bytes"] == device.driver.payload_size
+
+    download = client.get(stopped["download_url"])
+    assert download.content == b"0" * device.driver.payload_size
+    assert client.put("/uploads/unknown", content=b"x").status_code == 404
+
+    # A driver that ignores remotePath falls back to the base64 response
+    device.driver.upload = False
+    assert client.post("/recording/start", json={"filename_prefix": "inline"}).status_code == 200
+    assert client.post("/recording/stop").json()["size_bytes"] == device.driver.payload_size
+
+def test_batch_recording_archive_and_bulk_delete(api_app):
+    """Verifies batch start/stop results per device, the ZIP download and bulk delete by filter."""
+    import io
+    import zipfile
+    from fastapi.testclient import TestClient
+
+    client = TestClient(api_app)
+    udids = [f"batch-{i}" for i in range(3)]
+    assert client.post("/devices/batch-0/recording/start", json={}).status_code == 200
+
+    started = client.post("/devices/recording/start", json={"udids": udids, "filename_prefix": "batch"}).json()
+    assert [(r["udid"], r["status_code"]) for r in started] == [("batch-0", 400), ("batch-1", 200), ("batch-2", 200)]
+    assert started[1]["status"]["is_recording"]
+
+    stopped = client.post("/devices/recording/stop", json={"udids": udids}).json()
+    assert [r["status_code"] for r in stopped] == [200, 200, 200]
+    filenames = {r["recording"]["filename"] for r in stopped}
+    assert client.post("/devices/recording/stop", json={"udids": []}).status_code == 422
+
+    archive = client.get("/recordings/archive.zip", params={"filename": sorted(filenames)[:2]})
+    assert archive.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(archive.content)) as zf:
+        assert zf.testzip() is None
+        assert {info.compress_type for info in zf.infolist()} == {zipfile.ZIP_STORED}
+        assert sorted(zf.namelist()) == sorted(filenames)[:2]
+
+    assert client.delete("/recordings").status_code == 400
+    assert client.delete("/recordings", params={"device_name": "batch-1"}).json() == {"deleted": 1}
+    remaining = {name for name in filenames if client.get(f"/recordings/{name}").status_code == 200}
+    assert len(remaining) == 2
+
+def test_metrics_endpoint(api_app):
+    """Verifies /metrics exposes hot-path histograms per route and the gauges."""
+    from fastapi.testclient import TestClient
+    from src.utils import metrics
+
+    client = TestClient(api_app)
+    stops_before = metrics.DRIVER_STOP_SECONDS.snapshot()[0]
+    assert client.post("/recording/start", json={"filename_prefix": "metrics"}).status_code == 200
+    assert client.get("/metrics").text.count("\nrecorder_active_recordings 1\n") == 1
+    filename = client.post("/recording/stop").json()["filename"]
+    client.get(f"/recordings/{filename}")
+
+    assert metrics.DRIVER_STOP_SECONDS.snapshot()[0] == stops_before + 1
+    assert metrics.REQUEST_SECONDS.snapshot("GET", "/recordings/{filename}", "200")[0] >= 1
+    body = client.get("/metrics").text
+    for name in ("driver_start_seconds", "base64_payload_bytes", "decode_seconds", "disk_write_seconds", "db_commit_seconds"):
+        assert f"# TYPE recorder_{name} histogram" in body
+    assert 'recorder_http_request_seconds_bucket{method="POST",route="/recording/stop",status="200",le="+Inf"}' in body
+    assert "recorder_active_recordings 0" in body
+    assert "recorder_db_connections_in_use " in body
+
+    health_before = metrics.REQUEST_SECONDS.snapshot("GET", "/health", "200")[0]
+    metrics.set_enabled(False)
+    try:
+        client.get("/health")
+        assert metrics.REQUEST_SECONDS.snapshot("GET", "/health", "200")[0] == health_before
+    finally:
+        metrics.set_enabled(True)
+
+def test_profiling_header_and_admin_endpoints(api_app, monkeypatch):
+    """Verifies X-Profile captures spans or cProfile for a request, and the buffer is served, bounded and guarded."""
+    import marshal
+    from fastapi.testclient import TestClient
+    from src.utils import profiling
+
+    monkeypatch.setattr(profiling, "profile_buffer", profiling.ProfileBuffer(maxlen=2))
+    client = TestClient(api_app)
+    # Hidden while profiling is off
+    assert client.get("/admin/profiles").status_code == 404
+    monkeypatch.setattr(profiling, "PROFILING", True)
+
+    assert "X-Profile-Id" not in client.get("/health").headers
+    assert client.post("/recording/start", json={"filename_prefix": "profiled"}, headers={"X-Profile": "1"}).status_code == 200
+    response = client.post("/recording/stop", headers={"X-Profile": "spans"})
+    profile = client.get(f"/admin/profiles/{response.headers['X-Profile-Id']}").json()
+    assert (profile["method"], profile["path"], profile["status"], profile["cprofile"]) == ("POST", "/recording/stop", 200, None)
+    names = [s["name"] for s in profile["spans"]]
+    for name in ("pool.stop_recording", "recorder.stop_recording", "driver.stop_recording_screen",
+                 "save_video", "save_video.decode", "save_video.write", "crud.update_recording"):
+        assert name in names
+    assert client.get(f"/admin/profiles/{profile['id']}/pstats").status_code == 404
+
+    client.post("/recording/start", json={"filename_prefix": "cprofiled"})
+    response = client.post("/recording/stop", headers={"X-Profile": "cprofile"})
+    profile_id = response.headers["X-Profile-Id"]
+    assert "decode_base64_to_file" in client.get(f"/admin/profiles/{profile_id}").json()["cprofile"]
+    assert any("save_video" in func for _, _, func in marshal.loads(client.get(f"/admin/profiles/{profile_id}/pstats").content))
+
+    # Three profiled requests; the buffer keeps the newest two
+    assert [p["path"] for p in client.get("/admin/profiles").json()] == ["/recording/stop", "/recording/stop"]
+    assert client.delete("/admin/profiles").status_code == 204
+    assert client.get("/admin/profiles").json() == []
+
+    monkeypatch.setattr(profiling, "PROFILE_ADMIN_TOKEN", "s3cret")
+    assert client.get("/admin/profiles").status_code == 401
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "s3cret"}).status_code == 200
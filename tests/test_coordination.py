@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import update
+from src.core.coordination import DatabaseCoordinationStore, coordination_store_from_env
+from src.core.device_pool import DevicePool, DeviceStateError
+from src.database import DeviceLease, RecordingStatus, TaskLease, get_db_context, init_db
+from src.simulation.mock_driver import MockDriver
+
+def test_workers_share_device_leases(tmp_path):
+    """Verifies a second worker sees, refuses and stops the first worker's recording, and takes over expired leases."""
+    init_db()
+    with get_db_context() as db:
+        db.query(DeviceLease).delete()
+    store = DatabaseCoordinationStore(ttl=5)
+    owner = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=1024), coordination=store)
+    other = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=1024), coordination=store)
+    owner.start_coordination(tmp_path, poll_interval=0.02)
+    try:
+        with get_db_context() as db:
+            active = owner.start_recording(db, "lease-1", "lease")
+        with pytest.raises(DeviceStateError), get_db_context() as db:
+            other.start_recording(db, "lease-1", "lease")
+
+        status = other.device_status("lease-1")
+        assert status["is_recording"] and status["filename"] == active.filename
+        assert [s["udid"] for s in other.snapshot()] == ["lease-1"]
+
+        # The stop is carried out by the owner, which holds the driver
+        with get_db_context() as db:
+            row = other.stop_recording(db, "lease-1", tmp_path)
+        assert (row.filename, row.status) == (active.filename, RecordingStatus.COMPLETED)
+        assert owner.device_status("lease-1")["is_recording"] is False
+        assert store.get("lease-1") is None
+        with pytest.raises(DeviceStateError), get_db_context() as db:
+            other.stop_recording(db, "lease-1", tmp_path)
+
+        # A crashed owner stops renewing; once its lease expires the device is free
+        owner.stop_coordination()
+        with get_db_context() as db:
+            owner.start_recording(db, "lease-2", "lease")
+            db.execute(update(DeviceLease).values(expires_at=0))
+        assert other.device_status("lease-2")["is_recording"] is False
+        with get_db_context() as db:
+            assert other.start_recording(db, "lease-2", "takeover").filename
+        assert store.get("lease-2").owner == other.owner
+    finally:
+        owner.stop_coordination()
+        owner.quit_all()
+        other.quit_all()
+
+def test_workers_leave_sessions_of_leased_devices_alone():
+    """Verifies a worker skips warm-up and session repair on devices another worker records on."""
+    init_db()
+    with get_db_context() as db:
+        db.query(DeviceLease).delete()
+        db.query(TaskLease).delete()
+    store = DatabaseCoordinationStore(ttl=5)
+    created = []
+
+    def factory(udid):
+        created.append(udid)
+        return MockDriver(payload_size=1024)
+
+    owner = DevicePool(driver_factory=factory, coordination=store)
+    other = DevicePool(driver_factory=factory, coordination=store)
+    try:
+        with get_db_context() as db:
+            owner.start_recording(db, "busy-1", "lease")
+        created.clear()
+
+        # Only the elected worker warms up, and not the leased device
+        other.warm_up(["busy-1", "idle-1"])
+        owner.warm_up(["idle-2"])
+        assert created == ["idle-1"]
+
+        # A start refused for a leased device creates no session
+        with pytest.raises(DeviceStateError), get_db_context() as db:
+            other.start_recording(db, "busy-1", "lease")
+        assert created == ["idle-1"]
+
+        # A dead session is not recreated by the keepalive under coordination;
+        # the next start does it while holding the lease
+        idle = other.get_device("idle-1")
+        idle.driver.lose_session()
+        other.check_sessions()
+        assert created == ["idle-1"]
+        with get_db_context() as db:
+            other.start_recording(db, "idle-1", "lease")
+        assert created == ["idle-1", "idle-1"]
+    finally:
+        owner.quit_all()
+        other.quit_all()
+
+def test_uploads_refuse_several_workers(monkeypatch):
+    """Verifies RECORDING_UPLOAD_URL, whose tokens are per process, cannot be combined with coordination."""
+    monkeypatch.setenv("COORDINATION", "database")
+    assert isinstance(coordination_store_from_env(), DatabaseCoordinationStore)
+    monkeypatch.setenv("RECORDING_UPLOAD_URL", "http://10.0.0.5:8080")
+    with pytest.raises(ValueError):
+        coordination_store_from_env()
@@ -0,0 +1,190 @@
+from datetime import datetime
+from src.database import crud, Recording, RecordingStatus
+
+def test_keyset_pagination_walks_every_row_once(db):
+    """Verifies cursor paging is stable across rows sharing a created_at."""
+    created_at = datetime(2026, 1, 1, 12, 0, 0)
+    db.add_all(
+        Recording(
+            filename=f"page_{i}.mp4",
+            created_at=created_at if i % 2 else datetime(2026, 1, 1, 12, 0, i),
+            status=RecordingStatus.FAILED if i % 5 == 0 else RecordingStatus.COMPLETED
+        )
+        for i in range(25)
+    )
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page = crud.get_recordings_page(db, limit=10, after=cursor)
+        seen.extend(row.filename for row in page)
+        if len(page) < 10:
+            break
+        cursor = crud.decode_cursor(crud.encode_cursor(page[-1]))
+
+    expected = [r.filename for r in crud.get_recordings(db, limit=100)]
+    assert sorted(seen) == sorted(expected)
+    assert len(set(seen)) == 25
+
+    failed = crud.get_recordings_page(db, limit=100, status=RecordingStatus.FAILED)
+    assert {row.filename for row in failed} == {f"page_{i}.mp4" for i in range(0, 25, 5)}
+
+def test_cache_serves_polled_lookups_until_a_write(db):
+    """Verifies cached totals and lookups are invalidated by crud writes."""
+    stats = crud.recording_cache.stats()
+    assert crud.get_total_recordings_count(db) == 0
+    assert crud.get_recording_summary_by_filename(db, "cached.mp4") is None
+    assert crud.get_total_recordings_count(db) == 0
+    assert crud.recording_cache.stats()["hits"] == stats["hits"] + 1
+
+    recording = crud.create_recording(db, filename="cached.mp4")
+    assert crud.get_total_recordings_count(db) == 1
+    assert crud.get_recording_summary_by_filename(db, "cached.mp4").size_bytes == 0
+
+    crud.update_recording(db, str(recording.id), size_bytes=42)
+    assert crud.get_recording_summary_by_filename(db, "cached.mp4").size_bytes == 42
+    assert crud.get_total_size(db) == 42
+
+    crud.delete_recording(db, str(recording.id))
+    assert crud.get_recording_summary_by_filename(db, "cached.mp4") is None
+
+def test_update_recording_round_trips(db):
+    """Verifies update_recording takes one statement where SELECT + UPDATE + refresh took three."""
+    from src.database import count_statements
+
+    recordings = [crud.create_recording(db, filename=f"bench_{i}.mp4") for i in range(200)]
+    ids = [str(r.id) for r in recordings]
+
+    def legacy_update(recording_id, size_bytes):
+        recording = crud.get_recording_by_id(db, recording_id)
+        recording.size_bytes = size_bytes
+        db.commit()
+        db.refresh(recording)
+        return recording
+
+    with count_statements() as legacy_counter:
+        for i, recording_id in enumerate(ids):
+            legacy_update(recording_id, i)
+
+    with count_statements() as counter:
+        for i, recording_id in enumerate(ids):
+            row = crud.update_recording(db, recording_id, size_bytes=i + 1, status=RecordingStatus.COMPLETED)
+            assert row.size_bytes == i + 1
+
+    assert counter.count == len(ids)
+    assert legacy_counter.count >= 2 * len(ids)
+
+    with count_statements() as bulk_counter:
+        assert crud.update_recordings_status(db, ids, RecordingStatus.FAILED, batch_size=150) == len(ids)
+    assert bulk_counter.count == 2
+    assert {r.status for r in crud.get_recordings(db, limit=500)} == {RecordingStatus.FAILED}
+
+def test_bulk_delete_batches_and_keeps_in_progress(db):
+    """Verifies filtered bulk delete removes segments, reports files per batch and skips live recordings."""
+    from src.database import RecordingSegment
+
+    for i in range(5):
+        db.add(Recording(filename=f"bulk_{i}.mp4", device_name="farm", status=RecordingStatus.COMPLETED))
+    db.add(Recording(filename="bulk_live.mp4", device_name="farm", status=RecordingStatus.IN_PROGRESS))
+    db.add(Recording(filename="other.mp4", device_name="other", status=RecordingStatus.COMPLETED))
+    db.commit()
+    segmented = crud.get_recording_by_filename(db, "bulk_0.mp4")
+    crud.add_recording_segment(db, str(segmented.id), 0, "bulk_0.part000.mp4", 10)
+
+    batches = []
+    deleted = crud.delete_recordings(db, batch_size=2, on_deleted=batches.append, device_name="farm")
+    assert deleted == 5
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert (["bulk_0.mp4", "bulk_0.part000.mp4"], None) in batches[0] + batches[1] + batches[2]
+    assert db.query(RecordingSegment).count() == 0
+    assert sorted(r.filename for r in db.query(Recording)) == ["bulk_live.mp4", "other.mp4"]
+
+    # A single delete leaves the segments to ON DELETE CASCADE
+    other = crud.get_recording_by_filename(db, "other.mp4")
+    crud.add_recording_segment(db, str(other.id), 0, "other.part000.mp4", 10)
+    assert crud.delete_recording(db, str(other.id))
+    assert db.query(RecordingSegment).count() == 0
+
+def test_engine_options_per_backend():
+    """Verifies SQLite gets thread-shareable connections and servers a recycling LIFO pool."""
+    from sqlalchemy.pool import QueuePool, StaticPool
+    from src.database.connection import engine_options
+
+    memory = engine_options("sqlite://")
+    assert memory["poolclass"] is StaticPool
+    assert memory["connect_args"]["check_same_thread"] is False
+
+    sqlite_file = engine_options("sqlite:///./recordings.db")
+    assert sqlite_file["poolclass"] is QueuePool
+    assert "pool_recycle" not in sqlite_file
+
+    postgres = engine_options("postgresql://localhost/appium_recorder")
+    assert postgres["pool_use_lifo"] and postgres["pool_recycle"] > 0
+    assert postgres["pool_pre_ping"] is False
+
+def test_async_crud_matches_sync(db):
+    """Verifies the AsyncSession variants return the rows the sync functions do."""
+    import asyncio
+    from src.database import async_crud
+    from src.database.async_connection import AsyncSessionLocal, dispose_async_engine
+
+    for i in range(3):
+        crud.create_recording(db, filename=f"sync_{i}.mp4")
+    created = crud.create_recording(db, filename="async.mp4", device_name="farm")
+    crud.update_recording(db, str(created.id), size_bytes=42, status=RecordingStatus.COMPLETED)
+
+    async def scenario():
+        try:
+            async with AsyncSessionLocal() as adb:
+                assert await async_crud.get_total_recordings_count(adb) == 4
+                assert await async_crud.get_total_size(adb) == 42
+                page = await async_crud.get_recordings_page(adb, limit=2)
+                listed = await async_crud.get_recordings(adb, skip=0, limit=10, status=RecordingStatus.COMPLETED)
+                return page, listed
+        finally:
+            await dispose_async_engine()
+
+    page, listed = asyncio.run(scenario())
+    assert [r.filename for r in page] == [r.filename for r in crud.get_recordings_page(db, limit=2)]
+    assert [r.filename for r in listed] == ["async.mp4"]
+
+def test_recording_stats_follow_every_write_path(db):
+    """Verifies the trigger-maintained totals match a full scan after each kind of write."""
+    from sqlalchemy import update
+    from src.database import RecordingStats
+    from src.database.stats import get_recording_stats, reconcile_stats
+    from src.database.write_behind import WriteBehindQueue
+
+    farm = crud.create_recording(db, filename="stats_farm.mp4", device_name="farm")
+    loose = crud.create_recording(db, filename="stats_loose.mp4")
+    extra = crud.create_recording(db, filename="stats_extra.mp4", device_name="farm")
+    crud.update_recording(db, str(farm.id), size_bytes=100, duration_seconds=5, status=RecordingStatus.COMPLETED)
+    crud.add_recording_segment(db, str(loose.id), 0, "stats_loose.part000.mp4", 10)
+    crud.update_recordings_status(db, [str(loose.id)], RecordingStatus.FAILED)
+    queue = WriteBehindQueue()
+    queue.submit(extra.id, size_bytes=7, duration_seconds=2, status=RecordingStatus.COMPLETED)
+    queue.flush()
+    assert reconcile_stats(db, repair=False)["drifted"] == 0
+
+    stats = get_recording_stats(db)
+    assert (stats["count"], stats["size_bytes"], stats["duration_seconds"]) == (3, 117, 7)
+    assert stats["by_status"] == {
+        "completed": {"count": 2, "size_bytes": 107, "duration_seconds": 7},
+        "failed": {"count": 1, "size_bytes": 10, "duration_seconds": 0},
+    }
+    assert stats["by_device"]["farm"]["count"] == 2 and stats["by_device"][""]["size_bytes"] == 10
+    assert (crud.get_total_recordings_count(db), crud.get_total_size(db)) == (3, 117)
+
+    crud.delete_recording(db, str(farm.id))
+    crud.delete_recordings(db, device_name="farm")
+    assert reconcile_stats(db, repair=False)["drifted"] == 0
+    assert get_recording_stats(db)["by_device"] == {"": {"count": 1, "size_bytes": 10, "duration_seconds": 0}}
+
+    db.execute(
+        update(RecordingStats)
+        .where(RecordingStats.device_name == "", RecordingStats.status == RecordingStatus.FAILED)
+        .values(count=99)
+    )
+    db.commit()
+    assert reconcile_stats(db)["drifted"] == 1
+    assert get_recording_stats(db)["count"] == 1
@@ -0,0 +1,81 @@
+import time
+import pytest
+from src.core.device_pool import DEFAULT_DEVICE, DevicePool, DeviceStateError
+from src.database import get_db_context, init_db
+from src.simulation.mock_driver import MockDriver
+
+def test_warm_up_and_dead_session_recovery(tmp_path):
+    """Verifies warm-up pays session creation up front and dead sessions are replaced."""
+    init_db()
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=1024, create_delay=0.3))
+
+    started = time.perf_counter()
+    pool.warm_up([DEFAULT_DEVICE, "device-1", "device-2"])
+    # Sessions are created in parallel
+    assert time.perf_counter() - started < 0.8
+    stats = pool.session_stats()
+    assert stats["created"] == 3
+    assert stats["max_create_seconds"] >= 0.3
+
+    # The first start no longer waits for session creation
+    started = time.perf_counter()
+    with get_db_context() as db:
+        pool.start_recording(db, DEFAULT_DEVICE, "warm")
+    assert time.perf_counter() - started < 0.3
+    with get_db_context() as db:
+        pool.stop_recording(db, DEFAULT_DEVICE, tmp_path)
+
+    # The keepalive probe replaces a session the server dropped
+    idle = pool.get_device("device-1")
+    lost_session = idle.driver.session_id
+    idle.driver.lose_session()
+    pool.check_sessions()
+    assert idle.driver.session_id != lost_session
+    assert idle.recorder.driver is idle.driver
+    assert idle.recreations == 1
+
+    # A start re-checks a session not seen alive recently before using it
+    device = pool.get_device("device-2")
+    device.driver.lose_session()
+    device.checked_at -= 3600
+    with get_db_context() as db:
+        pool.start_recording(db, "device-2", "preflight")
+        pool.stop_recording(db, "device-2", tmp_path)
+    assert device.recreations == 1
+    assert pool.session_stats()["dead_detected"] == 2
+    pool.quit_all()
+
+def test_unknown_devices_and_session_cap():
+    """Verifies unlisted UDIDs are refused without leftovers and idle sessions make room for new ones."""
+    attempts = []
+
+    def factory(udid):
+        attempts.append(udid)
+        if udid == "broken":
+            raise RuntimeError("no such device")
+        return MockDriver(payload_size=1024)
+
+    pool = DevicePool(driver_factory=factory, allowed_udids=["a", "b", "c", "broken"], max_sessions=2)
+    with pytest.raises(DeviceStateError):
+        pool.get_device("unlisted")
+    with pytest.raises(RuntimeError):
+        pool.get_device("broken")
+    assert attempts == ["broken"]
+    assert pool._creation_locks == {}
+
+    pool.get_device("a")
+    pool.get_device("b")
+    pool.get_device("a")
+    # "b" is the least recently used idle session
+    pool.get_device("c")
+    assert sorted(device.udid for device in pool.devices()) == ["a", "c"]
+
+    for device in pool.devices():
+        device.lock.acquire()
+    try:
+        with pytest.raises(DeviceStateError):
+            pool.get_device(DEFAULT_DEVICE)
+    finally:
+        for device in pool.devices():
+            device.lock.release()
+    pool.quit_all()
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import tracemalloc
+from src.core.device_pool import DEFAULT_DEVICE, DevicePool
+from src.core.events import EventBroadcaster, RESYNC
+from src.database import get_db_context, init_db
+from src.simulation.mock_driver import MockDriver
+from src.utils.concurrency import run_blocking
+
+SUBSCRIBERS = 1000
+
+def _parse(message: bytes):
+    lines = dict(line.split(": ", 1) for line in message.decode().strip().splitlines() if ": " in line)
+    return lines.get("event"), json.loads(lines["data"]) if "data" in lines else None
+
+def test_events_fan_out_to_many_subscribers(tmp_path):
+    """Holds 1,000 subscribers through a start/stop and reports memory per subscriber."""
+    init_db()
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=1024))
+    pool.events.tick_seconds = 0.05
+
+    async def subscriber(ready: asyncio.Event, counter: list) -> list:
+        events = []
+        stream = pool.events.stream(max_seconds=30)
+        async for message in stream:
+            event, data = _parse(message)
+            events.append(event)
+            if event == "snapshot" and len(events) == 1:
+                counter[0] += 1
+                if counter[0] == SUBSCRIBERS:
+                    ready.set()
+            if event == "completed":
+                await stream.aclose()
+                break
+        return events
+
+    def start_stop() -> None:
+        import time
+        with get_db_context() as db:
+            pool.start_recording(db, DEFAULT_DEVICE, "events")
+        time.sleep(0.2)
+        with get_db_context() as db:
+            pool.stop_recording(db, DEFAULT_DEVICE, tmp_path)
+
+    async def scenario():
+        ready, counter = asyncio.Event(), [0]
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        tasks = [asyncio.create_task(subscriber(ready, counter)) for _ in range(SUBSCRIBERS)]
+        await asyncio.wait_for(ready.wait(), 10)
+        per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / SUBSCRIBERS
+        tracemalloc.stop()
+        assert pool.events.subscriber_count() == SUBSCRIBERS
+
+        await run_blocking(start_stop)
+        results = await asyncio.wait_for(asyncio.gather(*tasks), 10)
+        return per_subscriber, results
+
+    per_subscriber, results = asyncio.run(scenario())
+    assert per_subscriber < 64 * 1024
+    for events in results:
+        assert events[0] == "snapshot"
+        assert events.index("started") < events.index("stopping") < events.index("completed")
+        assert "duration" in events
+    assert pool.events.subscriber_count() == 0
+    pool.quit_all()
+
+def test_slow_subscriber_gets_resync_instead_of_backlog():
+    """Verifies a full subscriber queue collapses into one resync marker."""
+    async def scenario():
+        broadcaster = EventBroadcaster(snapshot=lambda: [], queue_size=3, tick_seconds=60)
+        subscription = broadcaster.subscribe()
+        for i in range(10):
+            broadcaster.publish("started", {"i": i})
+        assert subscription.resyncs >= 1
+        assert subscription.queue.qsize() <= 3
+        first = await subscription.get()
+        assert first == RESYNC
+        subscription.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,37 @@
+import base64
+import io
+import os
+import pytest
+from src.utils.file_utils import decode_base64_to_file, save_video
+
+def test_save_video_streams_across_windows(tmp_path):
+    """Verifies windowed decoding matches a whole-payload decode."""
+    payload = os.urandom(10_001)
+    encoded = base64.b64encode(payload).decode("ascii")
+
+    for window_size in (4, 16, 1024, 4 * 1024 * 1024):
+        out = io.BytesIO()
+        written = decode_base64_to_file(encoded, out, window_size=window_size)
+        assert written == len(payload)
+        assert out.getvalue() == payload
+
+    # Line-wrapped input read from a stream must decode the same way
+    wrapped = base64.encodebytes(payload)
+    out = io.BytesIO()
+    decode_base64_to_file(io.BytesIO(wrapped), out, window_size=64)
+    assert out.getvalue() == payload
+
+    output_path = tmp_path / "video.mp4"
+    save_video(encoded, output_path)
+    assert output_path.read_bytes() == payload
+    assert os.listdir(tmp_path) == ["video.mp4"]
+
+def test_save_video_truncated_payload_leaves_no_file(tmp_path):
+    """Verifies a corrupt payload neither creates the video nor leaves a temp file."""
+    encoded = base64.b64encode(b"some video bytes").decode("ascii")[:-1]
+    output_path = tmp_path / "video.mp4"
+
+    with pytest.raises(ValueError):
+        save_video(encoded, output_path)
+
+    assert os.listdir(tmp_path) == []
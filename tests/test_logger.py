@@ -0,0 +1,20 @@
+import io
+import json
+from src.utils.logger import configure_logging, logger, shutdown_logging
+
+def test_json_sink_samples_debug_and_flushes_queue():
+    """Verifies JSON lines, debug sampling and that queued lines are flushed."""
+    out = io.StringIO()
+    configure_logging(sink=out, level="DEBUG", json_format=True, enqueue=True, debug_sample_rate=0.0)
+    try:
+        for i in range(100):
+            logger.debug("noisy {}", i)
+        logger.bind(udid="device-1").info("Recording started")
+        shutdown_logging()
+    finally:
+        configure_logging()
+
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [entry["message"] for entry in lines] == ["Recording started"]
+    assert lines[0]["level"] == "INFO"
+    assert lines[0]["extra"] == {"udid": "device-1"}
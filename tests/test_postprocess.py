@@ -0,0 +1,94 @@
+import struct
+from src.core.postprocess import PostProcessor
+from src.database import crud
+from src.utils.mp4 import faststart, is_faststart, read_atoms
+
+def _box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+def _moov_last_mp4() -> bytes:
+    """A minimal MP4 laid out as iOS writes it: ftyp, mdat, then moov."""
+    ftyp = _box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2")
+    media = b"A" * 100 + b"B" * 100
+    first_chunk = len(ftyp) + 8
+    stco = _box(b"stco", struct.pack(">II2I", 0, 2, first_chunk, first_chunk + 100))
+    moov = _box(b"moov", _box(b"trak", _box(b"mdia", _box(b"minf", _box(b"stbl", stco)))))
+    return ftyp + _box(b"mdat", media) + moov
+
+def _chunk_offsets(data: bytes) -> tuple:
+    stco = data.index(b"stco")
+    count = struct.unpack_from(">I", data, stco + 8)[0]
+    return struct.unpack_from(f">{count}I", data, stco + 12)
+
+def test_faststart_moves_moov_and_keeps_chunk_offsets(tmp_path):
+    """Verifies the rewrite puts moov first and chunk offsets still hit the same media."""
+    path = tmp_path / "video.mp4"
+    original = _moov_last_mp4()
+    path.write_bytes(original)
+    assert not is_faststart(path)
+
+    assert faststart(path) is True
+    rewritten = path.read_bytes()
+    with open(path, "rb") as f:
+        assert [atom.kind for atom in read_atoms(f)] == [b"ftyp", b"moov", b"mdat"]
+    assert len(rewritten) == len(original)
+    assert [rewritten[o:o + 100] for o in _chunk_offsets(rewritten)] == [b"A" * 100, b"B" * 100]
+
+    # Already faststart: left untouched
+    assert faststart(path) is False
+    assert path.read_bytes() == rewritten
+
+def test_faststart_leaves_offsets_into_media_after_moov(tmp_path):
+    """Verifies only chunks before the original moov are shifted when an mdat follows it."""
+    ftyp = _box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2")
+    before = _box(b"mdat", b"A" * 100)
+    stco_size = 8 + 8 + 2 * 4
+    moov_size = 8 * 5 + stco_size
+    after_offset = len(ftyp) + len(before) + moov_size + 8
+    stco = _box(b"stco", struct.pack(">II2I", 0, 2, len(ftyp) + 8, after_offset))
+    moov = _box(b"moov", _box(b"trak", _box(b"mdia", _box(b"minf", _box(b"stbl", stco)))))
+    assert len(moov) == moov_size
+    path = tmp_path / "video.mp4"
+    path.write_bytes(ftyp + before + moov + _box(b"mdat", b"B" * 100))
+
+    assert faststart(path) is True
+    rewritten = path.read_bytes()
+    with open(path, "rb") as f:
+        assert [atom.kind for atom in read_atoms(f)] == [b"ftyp", b"moov", b"mdat", b"mdat"]
+    assert [rewritten[o:o + 100] for o in _chunk_offsets(rewritten)] == [b"A" * 100, b"B" * 100]
+
+def test_pipeline_deduplicates_retries_and_stores_results(db, tmp_path):
+    """Verifies jobs are deduplicated, failing ones retried unless the file is not an MP4, and results stored."""
+    processor = PostProcessor(stages=["faststart", "thumbnail"], workers=1, max_retries=2, retry_delay=0.05)
+    try:
+        good = crud.create_recording(db, filename="good.mp4")
+        good_path = tmp_path / "good.mp4"
+        good_path.write_bytes(_moov_last_mp4())
+        job = processor.submit(str(good.id), good_path)
+        assert processor.submit(str(good.id), good_path) is job
+
+        bad = crud.create_recording(db, filename="bad.mp4")
+        bad_path = tmp_path / "bad.mp4"
+        bad_path.write_bytes(b"not an mp4 file")
+        bad_job = processor.submit(str(bad.id), bad_path)
+
+        missing = crud.create_recording(db, filename="missing.mp4")
+        missing_job = processor.submit(str(missing.id), tmp_path / "missing.mp4")
+
+        assert job.done.wait(60) and bad_job.done.wait(60) and missing_job.done.wait(60)
+        assert job.attempts == 1
+        assert bad_job.attempts == 1
+        assert missing_job.attempts == 3
+        assert is_faststart(good_path)
+
+        db.expire_all()
+        stored = crud.get_recording_by_id(db, str(good.id))
+        assert stored.processing_status == "completed"
+        assert stored.faststart is True
+        assert set(stored.processing_timings) == {"faststart", "thumbnail"}
+        assert crud.get_recording_by_id(db, str(bad.id)).processing_status == "failed"
+
+        stats = processor.stats()
+        assert (stats["submitted"], stats["deduplicated"], stats["retried"]) == (3, 1, 2)
+    finally:
+        processor.shutdown()
@@ -0,0 +1,71 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+from src.core.coordination import DatabaseCoordinationStore
+from src.core.device_pool import DevicePool
+from src.core.recovery import RecordingSweeper
+from src.database import crud, get_db_context, DeviceLease, Recording, RecordingStatus
+from src.simulation.mock_driver import MockDriver
+
+def test_sweeper_resolves_100k_orphaned_recordings(db, tmp_path):
+    """Seeds 100k stale IN_PROGRESS rows and resolves them in one sweep; live and recent rows are left alone."""
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=1024))
+    stale_at = datetime.utcnow() - timedelta(hours=1)
+    rows = 100_000
+    db.execute(Recording.__table__.insert(), [
+        {
+            # A leading letter keeps SQLite from reading an all-digit hex as a number
+            "id": uuid.UUID(int=(0xa << 124) | i, version=4),
+            "filename": f"orphan_{i}.mp4",
+            "device_name": f"farm-{i % 4}",
+            "created_at": stale_at + timedelta(milliseconds=i),
+            # Every 1000th was segmented and has stored segments
+            "size_bytes": 0 if i % 1000 else 4096,
+            "status": RecordingStatus.IN_PROGRESS,
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    recent = crud.create_recording(db, filename="orphan_recent.mp4", device_name="farm-0")
+    with get_db_context() as live_db:
+        live = pool.start_recording(live_db, "farm-live", "live")
+    db.execute(Recording.__table__.update().where(Recording.filename == live.filename).values(created_at=stale_at))
+    db.commit()
+
+    sweeper = RecordingSweeper(pool, tmp_path, min_age=60, batch_size=1000)
+    report = sweeper.sweep()
+    assert report == {"stale": rows, "completed": 100, "salvaged": 4, "failed": rows - 104}
+    assert db.query(Recording).filter(Recording.status == RecordingStatus.IN_PROGRESS).count() == 2
+    assert crud.get_recording_by_filename(db, "orphan_99999.mp4").size_bytes == 1024
+    assert crud.get_recording_by_filename(db, recent.filename).status == RecordingStatus.IN_PROGRESS
+    assert crud.get_recording_by_filename(db, live.filename).status == RecordingStatus.IN_PROGRESS
+    assert sweeper.sweep()["stale"] == 0
+    pool.quit_all()
+
+class _LateLeases(DatabaseCoordinationStore):
+    """Leases taken after the sweep read them."""
+
+    def leases(self):
+        return []
+
+def test_sweeper_salvages_under_the_device_lease(db, tmp_path):
+    """Verifies a salvage holds the device's lease and skips devices another worker took."""
+    db.query(DeviceLease).delete()
+    db.commit()
+    store = _LateLeases(ttl=5)
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(payload_size=1024), coordination=store)
+    stale_at = datetime.utcnow() - timedelta(hours=1)
+    for udid in ("held-1", "free-1"):
+        crud.create_recording(db, filename=f"orphan_{udid}.mp4", device_name=udid)
+    db.execute(Recording.__table__.update().values(created_at=stale_at))
+    db.commit()
+    assert store.acquire("held-1", "other-worker", "other.mp4", time.time())
+
+    report = RecordingSweeper(pool, tmp_path, min_age=60).sweep()
+
+    assert report == {"stale": 1, "completed": 0, "salvaged": 1, "failed": 0}
+    assert crud.get_recording_by_filename(db, "orphan_held-1.mp4").status == RecordingStatus.IN_PROGRESS
+    assert [device.udid for device in pool.devices()] == ["free-1"]
+    assert store.get("free-1") is None
+    assert store.get("held-1").owner == "other-worker"
+    pool.quit_all()
@@ -0,0 +1,37 @@
+import time
+import pytest
+from selenium.common.exceptions import WebDriverException
+from src.core.device_pool import DevicePool
+from src.database import get_db_context, init_db
+from src.simulation.mock_driver import Latency, MockDriver, SimulationProfile
+
+def test_simulated_payload_latency_and_failures(tmp_path):
+    """Verifies payloads scale with recording time and quality, seeded runs repeat and failures are injected."""
+    init_db()
+    profile = SimulationProfile(start_latency=Latency(), payload="duration", seed=7)
+    pool = DevicePool(driver_factory=lambda udid: MockDriver(udid=udid, profile=profile))
+    sizes = {}
+    for quality in ("low", "high"):
+        with get_db_context() as db:
+            pool.start_recording(db, f"sim-{quality}", "sim", video_quality=quality)
+        time.sleep(0.2)
+        with get_db_context() as db:
+            sizes[quality] = pool.stop_recording(db, f"sim-{quality}", tmp_path).size_bytes
+    assert 0.2 * 62_500 <= sizes["low"] < 0.5 * 62_500
+    assert sizes["high"] >= 0.2 * 750_000
+
+    # The same seed and UDID give every run the same latencies
+    tail = SimulationProfile(start_latency=Latency.parse("lognormal:0.01,1"), seed=7)
+    samples = [
+        [driver.profile.start_latency.sample(driver.rng) for _ in range(5)]
+        for driver in (MockDriver(udid="a", profile=tail), MockDriver(udid="a", profile=tail))
+    ]
+    assert samples[0] == samples[1]
+    assert samples[0] != [tail.start_latency.sample(MockDriver(udid="b", profile=tail).rng) for _ in range(5)]
+
+    failing = DevicePool(driver_factory=lambda udid: MockDriver(profile=SimulationProfile(start_failure_rate=1.0)))
+    with pytest.raises(WebDriverException), get_db_context() as db:
+        failing.start_recording(db, "sim-fail", "sim")
+    assert failing.device_status("sim-fail")["is_recording"] is False
+    pool.quit_all()
+    failing.quit_all()
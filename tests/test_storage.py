@@ -0,0 +1,65 @@
+import os
+import time
+from datetime import datetime, timedelta
+from src.core.storage import StorageJanitor
+from src.database import crud, Recording, RecordingStatus
+from src.utils.file_utils import ContentAddressedStorage, LocalColdTier
+
+def _write(storage: ContentAddressedStorage, filename: str, content: bytes):
+    path = storage.path_for(filename)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+def test_identical_payloads_are_stored_once(tmp_path):
+    """Verifies hardlink dedup, shared-content accounting and garbage collection."""
+    storage = ContentAddressedStorage(tmp_path)
+    first = _write(storage, "a.mp4", b"0" * 4096)
+    second = _write(storage, "b.mp4", b"0" * 4096)
+    assert first.parent != second.parent
+    assert storage.usage_bytes() == 8192
+
+    assert storage.ingest(first) is not None
+    assert storage.ingest(second) is not None
+    assert os.path.samefile(first, second)
+    assert storage.usage_bytes() == 4096
+    assert storage.ingest(first) is None
+
+    assert storage.remove("a.mp4") == 0
+    assert storage.collect_garbage() == 0
+    assert storage.remove("b.mp4") == 4096
+    assert storage.collect_garbage() == 4096
+    assert storage.usage_bytes() == 0
+
+def test_janitor_evicts_lru_to_cold_tier_and_by_age(db, tmp_path):
+    """Verifies quota eviction archives least recently used recordings and age eviction deletes rows."""
+    storage = ContentAddressedStorage(tmp_path / "local", cold_tier=LocalColdTier(tmp_path / "cold"))
+    for i in range(3):
+        db.add(Recording(filename=f"lru_{i}.mp4", status=RecordingStatus.COMPLETED))
+        _write(storage, f"lru_{i}.mp4", bytes([i]) * 1000)
+        os.utime(storage.path_for(f"lru_{i}.mp4"), (time.time() - 100 + i, time.time() - 100))
+    db.commit()
+    storage.touch("lru_0.mp4")
+
+    janitor = StorageJanitor(storage, quota_bytes=2500, low_watermark=0.8, settle_seconds=0)
+    report = janitor.sweep()
+    assert report["ingested"] == 3
+    assert report["evicted"] == 1
+    assert not storage.path_for("lru_1.mp4").exists()
+    assert storage.path_for("lru_0.mp4").exists() and storage.path_for("lru_2.mp4").exists()
+
+    db.expire_all()
+    assert crud.get_recording_by_filename(db, "lru_1.mp4").archived_at is not None
+    assert storage.restore("lru_1.mp4").read_bytes() == bytes([1]) * 1000
+
+    local = ContentAddressedStorage(tmp_path / "aged")
+    db.add(Recording(filename="old.mp4", status=RecordingStatus.COMPLETED, created_at=datetime.utcnow() - timedelta(days=10)))
+    db.add(Recording(filename="new.mp4", status=RecordingStatus.COMPLETED))
+    db.commit()
+    _write(local, "old.mp4", b"old")
+    _write(local, "new.mp4", b"new")
+
+    StorageJanitor(local, max_age=timedelta(days=7)).sweep()
+    assert crud.get_recording_by_filename(db, "old.mp4") is None
+    assert not local.path_for("old.mp4").exists()
+    assert local.path_for("new.mp4").exists()
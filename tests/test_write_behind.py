@@ -0,0 +1,34 @@
+from src.database import crud, RecordingStatus
+from src.database.write_behind import WriteBehindQueue
+
+def test_write_behind_batches_and_recovers_spool(db, tmp_path):
+    """Verifies queued transitions are merged, spooled per worker when the DB is down, and replayed once."""
+    recordings = [crud.create_recording(db, filename=f"wb_{i}.mp4") for i in range(3)]
+    spool = tmp_path / "spool.jsonl"
+
+    def unavailable():
+        raise ConnectionError("database is down")
+
+    down = WriteBehindQueue(spool_path=spool, session_factory=unavailable)
+    for i, recording in enumerate(recordings):
+        down.submit(recording.id, size_bytes=100 + i)
+        down.submit(recording.id, duration_seconds=i, status=RecordingStatus.COMPLETED)
+    down.stop()
+    # A second worker spools to its own file
+    extra = crud.create_recording(db, filename="wb_extra.mp4")
+    other = WriteBehindQueue(spool_path=spool, session_factory=unavailable)
+    other.submit(extra.id, size_bytes=500)
+    other.stop()
+    assert len(list(tmp_path.glob("spool.*.jsonl"))) == 2
+    assert down.pending_count() == 0
+
+    queue = WriteBehindQueue(spool_path=spool)
+    assert queue.recover() == 7
+    assert list(tmp_path.iterdir()) == []
+    assert WriteBehindQueue(spool_path=spool).recover() == 0
+
+    db.expire_all()
+    for i, recording in enumerate(recordings):
+        row = crud.get_recording_by_id(db, str(recording.id))
+        assert (row.size_bytes, row.duration_seconds, row.status) == (100 + i, i, RecordingStatus.COMPLETED)
+    assert crud.get_recording_by_id(db, str(extra.id)).size_bytes == 500